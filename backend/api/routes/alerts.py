@@ -1,22 +1,82 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Union
+import asyncio
 
+import orjson
+
+from core.alert_stream import Subscription, alert_stream
+from core.clusters import fetch_clusters
+from core.config import settings
+from core.pagination import decode_distance_cursor, encode_distance_cursor
+from core.serialization import (
+    ALERT_MARKER_PROJECTION, ALERT_RESPONSE_PROJECTION, alert_list_response, alert_marker, alert_page_response,
+)
 from db.database import get_database
-from schemas.pet import AlertResponse
+from schemas.pet import AlertResponse, AlertPage
 
 router = APIRouter(prefix="/alerts", tags=["alerts"]) 
 
-@router.get("/near", response_model=List[AlertResponse])
+
+async def _alerts_near_page(db, lon: float, lat: float, radius_m: int, cursor: Optional[str], limit: int) -> ORJSONResponse:
+    """Keyset page of nearby alerts ordered by distance.
+
+    The cursor carries the last distance returned plus the ids already
+    returned at exactly that distance, so the next page resumes the geo walk
+    at ``minDistance`` instead of re-walking and skipping earlier results.
+    """
+    min_distance, seen_ids = decode_distance_cursor(cursor)
+    query = {"is_active": True, "alert_type": "missing"}
+    if seen_ids:
+        query["_id"] = {"$nin": seen_ids}
+
+    pipeline = [
+        {"$geoNear": {
+            "near": {"type": "Point", "coordinates": [lon, lat]},
+            "key": "location",
+            "distanceField": "distance",
+            "spherical": True,
+            "minDistance": min_distance,
+            "maxDistance": radius_m,
+            "query": query,
+        }},
+        {"$limit": limit + 1},
+        {"$project": {**ALERT_RESPONSE_PROJECTION, "distance": 1}},
+    ]
+    try:
+        alerts = await db.alerts.aggregate(pipeline).to_list(length=limit + 1)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Geospatial query failed: {e}")
+
+    next_cursor = None
+    if len(alerts) > limit:
+        alerts = alerts[:limit]
+        last_distance = alerts[-1]["distance"]
+        tied = [alert["_id"] for alert in alerts if alert["distance"] == last_distance]
+        if last_distance == min_distance:
+            tied = seen_ids + tied
+        next_cursor = encode_distance_cursor(last_distance, tied)
+
+    return alert_page_response(alerts, next_cursor)
+
+
+@router.get("/near", response_model=Union[List[AlertResponse], AlertPage])
 async def get_alerts_near(
     lon: float = Query(..., description="Longitude"),
     lat: float = Query(..., description="Latitude"),
     radius_m: int = Query(5000, description="Search radius in meters"),
     skip: int = 0,
     limit: int = 50,
+    paginate: str = Query("offset", pattern="^(offset|cursor)$", description="'cursor' returns {items, next_cursor}"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (paginate=cursor)"),
 ):
     """Return active missing pet alerts near the given point within the given radius (meters)."""
     db = get_database()
 
+    if paginate == "cursor":
+        return await _alerts_near_page(db, lon, lat, radius_m, cursor, limit)
+
     query = {
         "is_active": True,
         "alert_type": "missing",
@@ -28,29 +88,187 @@ async def get_alerts_near(
         },
     }
 
-    cursor = db.alerts.find(query).skip(skip).limit(limit)
+    cursor = db.alerts.find(query, ALERT_RESPONSE_PROJECTION).skip(skip).limit(limit)
     try:
         alerts = await cursor.to_list(length=limit)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Geospatial query failed: {e}")
 
-    results: List[AlertResponse] = []
-    for alert in alerts:
-        results.append(
-            AlertResponse(
-                id=str(alert["_id"]),
-                pet_id=str(alert["pet_id"]),
-                alert_type=alert["alert_type"],
-                title=alert["title"],
-                description=alert["description"],
-                location=str(alert.get("location")),  # Convert GeoJSON to string
-                contact_info=alert["contact_info"],
-                photos=alert.get("photos", []),
-                is_active=alert.get("is_active", True),
-                created_by=str(alert["created_by"]),
-                created_at=alert["created_at"],
-                updated_at=alert.get("updated_at"),
+    return alert_list_response(alerts)
+
+
+@router.get("/clusters")
+async def get_alert_clusters(
+    min_lon: float = Query(..., ge=-180, le=180, description="Bounding box west edge"),
+    min_lat: float = Query(..., ge=-90, le=90, description="Bounding box south edge"),
+    max_lon: float = Query(..., ge=-180, le=180, description="Bounding box east edge"),
+    max_lat: float = Query(..., ge=-90, le=90, description="Bounding box north edge"),
+    zoom: int = Query(..., ge=0, le=22, description="Map zoom level"),
+):
+    """Clusters of active missing alerts for a map view.
+
+    One entry per geohash cell with alerts: geohash, count, centroid
+    coordinates [lon, lat] and a per-species count. Cells are sized for the
+    zoom level and read from precomputed aggregates.
+    """
+    if min_lon >= max_lon or min_lat >= max_lat:
+        raise HTTPException(status_code=400, detail="min_lon/min_lat must be below max_lon/max_lat")
+
+    db = get_database()
+    return ORJSONResponse(await fetch_clusters(db, min_lon, min_lat, max_lon, max_lat, zoom))
+
+
+def _export_filter(bbox: Optional[List[float]], updated_since: Optional[datetime]) -> dict:
+    query = {"alert_type": "missing"}
+    if updated_since is None:
+        query["is_active"] = True
+    else:
+        # Incremental sync also returns alerts closed since then (active=false),
+        # so clients can drop their markers
+        query["$or"] = [
+            {"created_at": {"$gte": updated_since}},
+            {"updated_at": {"$gte": updated_since}},
+        ]
+    if bbox is not None:
+        min_lon, min_lat, max_lon, max_lat = bbox
+        query["location"] = {"$geoWithin": {"$geometry": {
+            "type": "Polygon",
+            "coordinates": [[
+                [min_lon, min_lat], [max_lon, min_lat], [max_lon, max_lat],
+                [min_lon, max_lat], [min_lon, min_lat],
+            ]],
+        }}}
+    return query
+
+
+async def _export_lines(cursor) -> AsyncIterator[bytes]:
+    """NDJSON chunks, one per Mongo batch; never holds more than a batch in memory."""
+    lines = []
+    try:
+        async for alert in cursor:
+            lines.append(orjson.dumps(alert_marker(alert)))
+            if len(lines) >= settings.EXPORT_BATCH_SIZE:
+                yield b"\n".join(lines) + b"\n"
+                lines = []
+        if lines:
+            yield b"\n".join(lines) + b"\n"
+    finally:
+        # Stop the server-side cursor if the client disconnects mid-stream
+        await cursor.close()
+
+
+@router.get("/export")
+async def export_alerts(
+    min_lon: Optional[float] = Query(None, ge=-180, le=180, description="Bounding box west edge"),
+    min_lat: Optional[float] = Query(None, ge=-90, le=90, description="Bounding box south edge"),
+    max_lon: Optional[float] = Query(None, ge=-180, le=180, description="Bounding box east edge"),
+    max_lat: Optional[float] = Query(None, ge=-90, le=90, description="Bounding box north edge"),
+    updated_since: Optional[datetime] = Query(
+        None, description="Only alerts created or changed since then (use X-Export-Timestamp of the last export)"
+    ),
+):
+    """Stream active missing alerts as NDJSON for map clients.
+
+    One line per alert: id, coordinates [lon, lat], species, title,
+    thumbnail, created_at and active. The X-Export-Timestamp header is the
+    time the export started; pass it as ``updated_since`` next time to fetch
+    only changes.
+    """
+    corners = [min_lon, min_lat, max_lon, max_lat]
+    bbox = None
+    if any(value is not None for value in corners):
+        if any(value is None for value in corners) or min_lon >= max_lon or min_lat >= max_lat:
+            raise HTTPException(
+                status_code=400,
+                detail="min_lon, min_lat, max_lon and max_lat must be given together and describe a box",
             )
-        )
+        bbox = corners
+
+    db = get_database()
+    started_at = datetime.now()
+    cursor = db.alerts.find(_export_filter(bbox, updated_since), ALERT_MARKER_PROJECTION).batch_size(
+        settings.EXPORT_BATCH_SIZE
+    )
+    return StreamingResponse(
+        _export_lines(cursor),
+        media_type="application/x-ndjson",
+        headers={"X-Export-Timestamp": started_at.isoformat()},
+    )
+
+
+async def _sse_events(lon: float, lat: float, radius_m: int) -> AsyncIterator[bytes]:
+    subscription = alert_stream.subscribe(lon, lat, radius_m)
+    try:
+        yield b": subscribed\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(), timeout=settings.ALERT_STREAM_KEEPALIVE_SECONDS
+                )
+            except asyncio.TimeoutError:
+                # Comment line keeps proxies from closing an idle connection
+                yield b": keepalive\n\n"
+                continue
+            yield b"event: " + event["event"].encode() + b"\ndata: " + orjson.dumps(event) + b"\n\n"
+    finally:
+        alert_stream.unsubscribe(subscription)
 
-    return results
+
+@router.get("/stream")
+async def stream_alerts(
+    lon: float = Query(..., ge=-180, le=180, description="Longitude"),
+    lat: float = Query(..., ge=-90, le=90, description="Latitude"),
+    radius_m: int = Query(5000, gt=0, le=settings.ALERT_STREAM_MAX_RADIUS_M, description="Radius in meters"),
+):
+    """Server-sent events for missing alerts reported or found within the radius.
+
+    Events are named ``reported`` or ``found``; the data is the alert's map
+    marker (the same fields as an /alerts/export line) plus ``event``.
+    """
+    return StreamingResponse(
+        _sse_events(lon, lat, radius_m),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _send_events(websocket: WebSocket, subscription: Subscription):
+    while True:
+        event = await subscription.queue.get()
+        await websocket.send_text(orjson.dumps(event).decode())
+
+
+@router.websocket("/ws")
+async def alerts_websocket(
+    websocket: WebSocket,
+    lon: float = Query(..., ge=-180, le=180),
+    lat: float = Query(..., ge=-90, le=90),
+    radius_m: int = Query(5000, gt=0, le=settings.ALERT_STREAM_MAX_RADIUS_M),
+):
+    """WebSocket variant of /alerts/stream.
+
+    Send ``{"lon": .., "lat": .., "radius_m": ..}`` to move the subscription
+    (e.g. when the map pans) without reconnecting.
+    """
+    await websocket.accept()
+    subscription = alert_stream.subscribe(lon, lat, radius_m)
+    sender = asyncio.create_task(_send_events(websocket, subscription))
+    try:
+        while True:
+            text = await websocket.receive_text()
+            try:
+                message = orjson.loads(text)
+                new_lon, new_lat = float(message["lon"]), float(message["lat"])
+                new_radius = float(message.get("radius_m", subscription.radius_m))
+                if not (-180 <= new_lon <= 180 and -90 <= new_lat <= 90
+                        and 0 < new_radius <= settings.ALERT_STREAM_MAX_RADIUS_M):
+                    raise ValueError("out of range")
+            except (KeyError, TypeError, ValueError, AttributeError):
+                await websocket.send_json({"error": "expected {lon, lat, radius_m} within range"})
+                continue
+            alert_stream.move(subscription, new_lon, new_lat, new_radius)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        alert_stream.unsubscribe(subscription)
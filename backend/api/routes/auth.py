@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from datetime import datetime, timedelta
+import time
 from typing import Optional
 from pydantic import BaseModel
-from jose import JWTError, jwt
 
-from core.security import verify_password, create_access_token, get_password_hash, verify_token
+from core.security import password_hasher, create_access_token, decode_access_token
+from core.principal_cache import principal_cache
 from core.config import settings
 from models.user import User
 from schemas.auth import Token, UserCreate, UserResponse
@@ -33,7 +34,7 @@ async def register(user_data: UserCreate):
         )
     
     # Hash password
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await password_hasher.hash(user_data.password)
     
     # Create user document
     user_doc = {
@@ -60,13 +61,20 @@ async def login(login_data: LoginRequest):
     
     # Find user by email
     user = await db.users.find_one({"email": login_data.email})
-    if not user or not verify_password(login_data.password, user["hashed_password"]):
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await password_hasher.verify_and_update(login_data.password, user["hashed_password"])
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    if new_hash:
+        # Stored hash uses an old bcrypt cost; upgrade it while we have the password
+        await db.users.update_one({"_id": user["_id"]}, {"$set": {"hashed_password": new_hash}})
+    
     if not user.get("is_active", True):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -76,7 +84,8 @@ async def login(login_data: LoginRequest):
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user["email"]}, expires_delta=access_token_expires
+        # uid lets get_current_user build the principal without a user lookup
+        data={"sub": user["email"], "uid": str(user["_id"])}, expires_delta=access_token_expires
     )
     
     return {"access_token": access_token, "token_type": "bearer"}
@@ -89,22 +98,42 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    token = credentials.credentials
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+    
     # Verify the JWT token
-    email = verify_token(credentials.credentials)
-    if email is None:
+    payload = decode_access_token(token)
+    if payload is None:
         raise credentials_exception
+    email = payload["sub"]
+    user_id = payload.get("uid")
     
+    if user_id is not None:
+        # Tokens carry the user id; login only issues them to active users
+        if principal_cache.is_revoked(user_id, payload.get("iat")):
+            raise credentials_exception
+        principal = UserResponse(id=user_id, email=email, is_active=True)
+        principal_cache.put(token, principal, payload.get("exp"))
+        return principal
+    
+    # Tokens issued before the uid claim: resolve the user by email
+    started = time.perf_counter()
     try:
         db = get_database()
         user = await db.users.find_one({"email": email})
+        principal_cache.record_lookup(time.perf_counter() - started)
         if user is None:
             raise credentials_exception
         
-        return UserResponse(
+        principal = UserResponse(
             id=str(user["_id"]),
             email=user["email"],
             is_active=user.get("is_active", True)
         )
+        principal_cache.put(token, principal, payload.get("exp"))
+        return principal
     except Exception as e:
         print(f"Database error in get_current_user: {e}")
         # For now, return a mock user response to allow testing
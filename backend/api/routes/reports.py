@@ -1,25 +1,98 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-import httpx
-from typing import List, Optional
-from datetime import datetime
-from pydantic import BaseModel
-import numpy as np
+from fastapi import APIRouter, Depends, File, Form, HTTPException, status, Query, UploadFile
+from fastapi.responses import ORJSONResponse
+from typing import List, Literal, Optional, Tuple, Union
+from datetime import datetime, timedelta
+from pydantic import BaseModel, ValidationError
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+import asyncio
+import hashlib
+import mimetypes
+import os
+
+import orjson
 
 from api.routes.auth import get_current_user
-from schemas.pet import PetBase, PetCreate, PetResponse, AlertCreate, AlertResponse
+from schemas.pet import PetBase, PetCreate, PetResponse, AlertCreate, AlertResponse, AlertPage
 from models.pet import Pet, Alert
 from db.database import get_database
-from core.embeddings import image_bytes_to_embedding, text_to_embedding
-import numpy as np
+from db.embedding_store import save_alert_embeddings, save_many_alert_embeddings
+from core.embeddings import embed_image_url, embed_image_urls, embed_images, embed_text, embed_texts
+from core.vector_index import (
+    INDEXED_REPORTS_QUERY, embedding_index, fetch_ranked_alerts, filtered_alert_ids, get_embedding_index,
+    get_report_index, report_index,
+)
+from core.report_jobs import report_jobs
+from core.config import settings
+from core.alert_matches import find_matches, save_matches
+from core.clusters import record_alert, record_alerts
+from core.alert_stream import EVENT_FOUND, EVENT_REPORTED, alert_stream
+from core.pagination import CREATED_SORT, created_cursor_filter, encode_created_cursor
+from core.search_terms import normalize_term, place_tokens
+from core.serialization import (
+    ALERT_MARKER_PROJECTION, ALERT_RESPONSE_PROJECTION, alert_list_response, alert_page_response, alert_response,
+    alert_to_dict,
+)
 
 router = APIRouter(prefix="/reports", tags=["missing pet reports"])
 
 class MissingPetReport(PetBase):
     contact_info: str
 
+class FoundPetReport(MissingPetReport):
+    """Found or sighting report; last_seen_* is where and when the animal was seen"""
+
 class ReportWithSimilarPets(BaseModel):
     report: AlertResponse
     similar_pets: List[AlertResponse]
+    # found/sighting reports matching a missing report, or missing alerts matching a found/sighting report
+    matches: List[AlertResponse] = []
+    job_id: Optional[str] = None   # set when matching runs in the background
+    status: str = "completed"
+
+class AlertMatch(BaseModel):
+    alert: AlertResponse
+    score: float
+
+class BulkIntakeRecord(MissingPetReport):
+    photo_url: Optional[str] = None    # either a URL ...
+    photo_file: Optional[str] = None   # ... or the file name of an upload in the same request
+    alert_type: Optional[Literal["missing", "found", "sighting"]] = None  # default: the request's alert_type
+
+class BulkIntakeItem(BaseModel):
+    index: int
+    status: str                        # created or failed
+    alert_id: Optional[str] = None
+    pet_id: Optional[str] = None
+    error: Optional[str] = None
+
+class BulkIntakeResponse(BaseModel):
+    created: int
+    failed: int
+    items: List[BulkIntakeItem]
+
+class ReportJobStatus(BaseModel):
+    job_id: str
+    alert_id: str
+    status: str                    # queued, running, completed, failed
+    attempts: int
+    similar_pets: List[AlertResponse] = []
+    matches: List[AlertResponse] = []
+    error: Optional[str] = None
+
+async def _match_similar_alerts(image_embedding: Optional[List[float]], text_embedding: Optional[List[float]],
+                                current_alert_id, image_weight: float = 0.7,
+                                text_weight: float = 0.3, similarity_threshold: float = 0.7,
+                                limit: int = 5) -> List[Tuple[ObjectId, float]]:
+    """Rank active missing alerts against a new report's embeddings"""
+    db = get_database()
+    
+    # Score every indexed alert with one matrix-vector product per modality
+    index = await get_embedding_index(db)
+    return index.search(
+        image_embedding, text_embedding, image_weight, text_weight,
+        similarity_threshold, limit, exclude_ids=[current_alert_id]
+    )
 
 async def _find_similar_pets_auto(image_embedding: List[float], text_embedding: List[float], 
                                  current_alert_id: str, image_weight: float = 0.7, 
@@ -27,96 +100,63 @@ async def _find_similar_pets_auto(image_embedding: List[float], text_embedding:
                                  limit: int = 5) -> List[AlertResponse]:
     """Automatically find similar pets for a new report"""
     db = get_database()
-    
-    # Get all active missing pet alerts with embeddings (excluding current one)
-    cursor = db.alerts.find({
-        "is_active": True,
-        "alert_type": "missing",
-        "_id": {"$ne": current_alert_id},  # Exclude current report
-        "$or": [
-            {"image_embedding": {"$exists": True, "$ne": None}},
-            {"text_embedding": {"$exists": True, "$ne": None}}
-        ]
-    })
-    
-    alerts_with_embeddings = await cursor.to_list(length=None)
-    
-    # Calculate combined similarity scores
-    similar_alerts = []
-    for alert in alerts_with_embeddings:
-        combined_similarity = 0.0
-        has_similarity = False
-        
-        # Image similarity
-        if image_embedding and alert.get("image_embedding"):
-            stored_image_embedding = np.array(alert["image_embedding"])
-            query_image_array = np.array(image_embedding)
-            
-            image_similarity = np.dot(query_image_array, stored_image_embedding) / (
-                np.linalg.norm(query_image_array) * np.linalg.norm(stored_image_embedding)
-            )
-            combined_similarity += image_weight * image_similarity
-            has_similarity = True
-        
-        # Text similarity
-        if text_embedding and alert.get("text_embedding"):
-            stored_text_embedding = np.array(alert["text_embedding"])
-            query_text_array = np.array(text_embedding)
-            
-            text_similarity = np.dot(query_text_array, stored_text_embedding) / (
-                np.linalg.norm(query_text_array) * np.linalg.norm(stored_text_embedding)
-            )
-            combined_similarity += text_weight * text_similarity
-            has_similarity = True
-        
-        if has_similarity and combined_similarity >= similarity_threshold:
-            similar_alerts.append((alert, combined_similarity))
-    
-    # Sort by combined similarity score (highest first) and limit results
-    similar_alerts.sort(key=lambda x: x[1], reverse=True)
-    similar_alerts = similar_alerts[:limit]
-    
-    # Convert to AlertResponse format
-    results = []
-    for alert, similarity_score in similar_alerts:
-        results.append(AlertResponse(
-            id=str(alert["_id"]),
-            pet_id=str(alert["pet_id"]),
-            alert_type=alert["alert_type"],
-            title=alert["title"],
-            description=alert["description"],
-            location=str(alert["location"]),
-            contact_info=alert["contact_info"],
-            photos=alert.get("photos", []),
-            is_active=alert["is_active"],
-            created_by=str(alert["created_by"]),
-            created_at=alert["created_at"],
-            updated_at=alert.get("updated_at")
-        ))
-    
-    return results
+    matches = await _match_similar_alerts(
+        image_embedding, text_embedding, current_alert_id,
+        image_weight, text_weight, similarity_threshold, limit
+    )
+    similar_alerts = await fetch_ranked_alerts(db, matches)
+    return [alert_response(alert) for alert, _ in similar_alerts]
 
+async def _recent_report_ids(db) -> List[ObjectId]:
+    cutoff = datetime.now() - timedelta(days=settings.MATCH_WINDOW_DAYS)
+    return await filtered_alert_ids(db, {**INDEXED_REPORTS_QUERY, "created_at": {"$gte": cutoff}})
 
-@router.post("/missing", response_model=ReportWithSimilarPets)
-async def report_missing_pet(
-    report: MissingPetReport,
-    current_user: dict = Depends(get_current_user)
-):
-    """Report a missing pet"""
+async def _match_recent_reports(image_embedding: Optional[List[float]], text_embedding: Optional[List[float]],
+                                current_alert_id, recent_ids: Optional[List[ObjectId]] = None
+                                ) -> List[Tuple[ObjectId, float]]:
+    """Rank found/sighting reports from the last MATCH_WINDOW_DAYS against a missing report"""
     db = get_database()
-    
-    # Get current user ID from the response
-    from bson import ObjectId
-    user_id = ObjectId(current_user.id)
-    
+    if recent_ids is None:
+        recent_ids = await _recent_report_ids(db)
+    index = await get_report_index(db)
+    return index.search(
+        image_embedding, text_embedding, 0.7, 0.3,
+        settings.MATCH_SIMILARITY_THRESHOLD, settings.MATCH_LIMIT,
+        exclude_ids=[current_alert_id], candidate_ids=recent_ids
+    )
+
+async def _index_report(db, alert_id, alert_type: str, image_embedding: Optional[List[float]],
+                        text_embedding: Optional[List[float]]):
+    """Store a report's embeddings and add it to the index its alert type is searched in"""
+    await save_alert_embeddings(db, alert_id, image_embedding, text_embedding)
+    index = embedding_index if alert_type == "missing" else report_index
+    index.add(alert_id, image_embedding, text_embedding)
+
+async def _match_and_persist(db, alert_id, alert_type: str, image_embedding: Optional[List[float]],
+                             text_embedding: Optional[List[float]],
+                             recent_ids: Optional[List[ObjectId]] = None) -> List[Tuple[ObjectId, float]]:
+    """Match a report against the other side (missing <-> found/sighting) and store the candidates"""
+    if alert_type == "missing":
+        matches = await _match_recent_reports(image_embedding, text_embedding, alert_id, recent_ids)
+        await save_matches(db, [(alert_id, match_id, score) for match_id, score in matches])
+    else:
+        matches = await _match_similar_alerts(
+            image_embedding, text_embedding, alert_id,
+            similarity_threshold=settings.MATCH_SIMILARITY_THRESHOLD, limit=settings.MATCH_LIMIT
+        )
+        await save_matches(db, [(match_id, alert_id, score) for match_id, score in matches])
+    return matches
+
+def _report_text(species: str, color: Optional[str], description: Optional[str]) -> str:
+    """Text that a report's text embedding is computed from"""
+    return f"{species} {color or ''} {description or ''}".strip()
+
+async def _embed_report(photo_url: str, text_description: str) -> Tuple[Optional[List[float]], Optional[List[float]]]:
+    """Compute image and text embeddings for a report, tolerating failures of either"""
     # Download the photo and compute CLIP embedding
     image_embedding = None
     try:
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            resp = await client.get(report.photo_url)
-            resp.raise_for_status()
-            image_bytes = resp.content
-        image_embedding = image_bytes_to_embedding(image_bytes)
+        image_embedding = await embed_image_url(photo_url)
     except Exception as e:
         # Continue even if embedding fails; log warning
         print(f"Warning: failed to generate image embedding: {e}")
@@ -124,17 +164,17 @@ async def report_missing_pet(
     # Generate text embedding from description
     text_embedding = None
     try:
-        # Create text description from available fields
-        text_description = f"{report.species} {report.color or ''} {report.description or ''}".strip()
         if text_description:
-            text_embedding = text_to_embedding(text_description)
+            text_embedding = await embed_text(text_description)
     except Exception as e:
         print(f"Warning: failed to generate text embedding: {e}")
+    
+    return image_embedding, text_embedding
 
-    # Create pet record
-    # Validate and normalize to GeoJSON point for geospatial queries
-    lon = report.last_seen_location.get("lon") or report.last_seen_location.get("lng")
-    lat = report.last_seen_location.get("lat")
+def _geo_point(location: dict) -> dict:
+    """Validate a {lon|lng, lat} location and normalize it to a GeoJSON point for geospatial queries"""
+    lon = location.get("lon") or location.get("lng")
+    lat = location.get("lat")
     
     if lon is None or lat is None:
         raise HTTPException(
@@ -151,69 +191,132 @@ async def report_missing_pet(
             detail="lon and lat must be valid numbers"
         )
     
-    geo_point = {
+    return {
         "type": "Point",
         "coordinates": [lon_float, lat_float],
     }
 
-    pet_doc = {
+def _pet_document(report: MissingPetReport, geo_point: dict, user_id: ObjectId, is_missing: bool = True) -> dict:
+    return {
         "name": report.name,
         "species": report.species,
         "color": report.color,
         "description": report.description,
         "photo_url": report.photo_url,
         "last_seen_location": geo_point,
+        "last_seen_place": report.last_seen_place,
         "last_seen_date": report.last_seen_date,
         "owner_id": user_id,
-        "is_missing": True,
+        "is_missing": is_missing,
         "created_at": datetime.now(),
         "updated_at": None
     }
-    
-    # Insert pet into database
-    pet_result = await db.pets.insert_one(pet_doc)
-    pet_doc["_id"] = pet_result.inserted_id
-    
-    # Create alert record
+
+_TITLE_PREFIXES = {"missing": "Missing", "found": "Found", "sighting": "Sighted"}
+
+def _alert_document(report: MissingPetReport, geo_point: dict, user_id: ObjectId, pet_id: ObjectId,
+                    alert_type: str = "missing") -> dict:
     pet_name = report.name or "Unknown"
-    alert_doc = {
-        "pet_id": pet_result.inserted_id,
-        "alert_type": "missing",
-        "title": f"Missing {report.species}: {pet_name}",
-        "description": report.description or f"Missing {report.species} named {pet_name}",
+    prefix = _TITLE_PREFIXES[alert_type]
+    # Finders often do not know the name
+    default_description = f"{prefix} {report.species} named {pet_name}" if report.name or alert_type == "missing" \
+        else f"{prefix} {report.species}"
+    return {
+        "pet_id": pet_id,
+        "alert_type": alert_type,
+        "title": f"{prefix} {report.species}: {pet_name}",
+        "description": report.description or default_description,
         "location": geo_point,
         "contact_info": report.contact_info,
         "photos": [report.photo_url],
-        "image_embedding": image_embedding,
-        "text_embedding": text_embedding,
+        # Normalized, indexed copies for list filters and similarity prefilters
+        "species": normalize_term(report.species),
+        "color": normalize_term(report.color),
+        "place_name": report.last_seen_place,
+        "place_tokens": place_tokens(report.last_seen_place),
+        "last_seen_date": report.last_seen_date,
         "is_active": True,
         "created_by": user_id,
         "created_at": datetime.now(),
         "updated_at": None
     }
+
+async def process_report_job(db, job: dict) -> dict:
+    """Background half of a report: embed, index and match it against other alerts"""
+    alert_id = job["alert_id"]
+    alert_type = job.get("alert_type", "missing")
+    image_embedding, text_embedding = await _embed_report(job["photo_url"], job["text_description"])
+    if image_embedding is None and text_embedding is None:
+        raise RuntimeError("Could not compute any embedding for the report")
+    
+    await _index_report(db, alert_id, alert_type, image_embedding, text_embedding)
+    similar = []
+    if alert_type == "missing":
+        similar = await _match_similar_alerts(image_embedding, text_embedding, alert_id)
+    matches = await _match_and_persist(db, alert_id, alert_type, image_embedding, text_embedding)
+    return {
+        "similar": [{"alert_id": match_id, "score": score} for match_id, score in similar],
+        "matches": [{"alert_id": match_id, "score": score} for match_id, score in matches],
+    }
+
+
+@router.post("/missing", response_model=ReportWithSimilarPets)
+async def report_missing_pet(
+    report: MissingPetReport,
+    background: Optional[bool] = Query(
+        None, description="Return immediately and match in the background (default: REPORT_PROCESSING_MODE)"
+    ),
+    current_user: dict = Depends(get_current_user)
+):
+    """Report a missing pet"""
+    db = get_database()
+    
+    # Get current user ID from the response
+    user_id = ObjectId(current_user.id)
+    if background is None:
+        background = settings.REPORT_PROCESSING_MODE == "background"
+    
+    geo_point = _geo_point(report.last_seen_location)
+    
+    text_description = _report_text(report.species, report.color, report.description)
+    image_embedding = text_embedding = None
+    if not background:
+        image_embedding, text_embedding = await _embed_report(report.photo_url, text_description)
+
+    # Insert pet into database
+    pet_doc = _pet_document(report, geo_point, user_id)
+    pet_result = await db.pets.insert_one(pet_doc)
+    pet_doc["_id"] = pet_result.inserted_id
     
     # Insert alert into database
+    alert_doc = _alert_document(report, geo_point, user_id, pet_result.inserted_id)
     alert_result = await db.alerts.insert_one(alert_doc)
     alert_doc["_id"] = alert_result.inserted_id
+    await record_alert(db, alert_doc, 1)
+    alert_stream.notify(alert_doc, EVENT_REPORTED)
     
     # Create the main report response
-    created_report = AlertResponse(
-        id=str(alert_doc["_id"]),
-        pet_id=str(alert_doc["pet_id"]),
-        alert_type=alert_doc["alert_type"],
-        title=alert_doc["title"],
-        description=alert_doc["description"],
-        location=str(alert_doc["location"]),  # Convert GeoJSON to string
-        contact_info=alert_doc["contact_info"],
-        photos=alert_doc["photos"],
-        is_active=alert_doc["is_active"],
-        created_by=str(alert_doc["created_by"]),
-        created_at=alert_doc["created_at"],
-        updated_at=alert_doc["updated_at"]
-    )
+    created_report = alert_response(alert_doc)
+    
+    if background:
+        job_id = await report_jobs.enqueue(db, {
+            "alert_id": alert_doc["_id"],
+            "photo_url": report.photo_url,
+            "text_description": text_description,
+            "created_by": user_id,
+        })
+        return ReportWithSimilarPets(
+            report=created_report,
+            similar_pets=[],
+            job_id=str(job_id),
+            status="queued"
+        )
+    
+    await _index_report(db, alert_doc["_id"], "missing", image_embedding, text_embedding)
     
-    # Automatically find similar pets
+    # Automatically find similar pets, and found/sighting reports that may be this pet
     similar_pets = []
+    matches = []
     if image_embedding or text_embedding:
         try:
             similar_pets = await _find_similar_pets_auto(
@@ -222,18 +325,367 @@ async def report_missing_pet(
             )
         except Exception as e:
             print(f"Warning: failed to find similar pets: {e}")
+        try:
+            matches = await _match_and_persist(db, alert_doc["_id"], "missing", image_embedding, text_embedding)
+        except Exception as e:
+            print(f"Warning: failed to match found/sighting reports: {e}")
+    
+    return ReportWithSimilarPets(
+        report=created_report,
+        similar_pets=similar_pets,
+        matches=[alert_response(alert) for alert, _ in await fetch_ranked_alerts(db, matches)]
+    )
+
+async def _report_seen_pet(report: FoundPetReport, alert_type: str, background: Optional[bool],
+                           current_user) -> ReportWithSimilarPets:
+    """Shared body of the found and sighting endpoints"""
+    db = get_database()
+    user_id = ObjectId(current_user.id)
+    if background is None:
+        background = settings.REPORT_PROCESSING_MODE == "background"
+    
+    geo_point = _geo_point(report.last_seen_location)
+    text_description = _report_text(report.species, report.color, report.description)
+    image_embedding = text_embedding = None
+    if not background:
+        image_embedding, text_embedding = await _embed_report(report.photo_url, text_description)
+    
+    pet_doc = _pet_document(report, geo_point, user_id, is_missing=False)
+    pet_result = await db.pets.insert_one(pet_doc)
+    alert_doc = _alert_document(report, geo_point, user_id, pet_result.inserted_id, alert_type)
+    alert_result = await db.alerts.insert_one(alert_doc)
+    alert_doc["_id"] = alert_result.inserted_id
+    created_report = alert_response(alert_doc)
+    
+    if background:
+        job_id = await report_jobs.enqueue(db, {
+            "alert_id": alert_doc["_id"],
+            "alert_type": alert_type,
+            "photo_url": report.photo_url,
+            "text_description": text_description,
+            "created_by": user_id,
+        })
+        return ReportWithSimilarPets(report=created_report, similar_pets=[], job_id=str(job_id), status="queued")
+    
+    await _index_report(db, alert_doc["_id"], alert_type, image_embedding, text_embedding)
+    matches = []
+    if image_embedding or text_embedding:
+        try:
+            matches = await _match_and_persist(db, alert_doc["_id"], alert_type, image_embedding, text_embedding)
+        except Exception as e:
+            print(f"Warning: failed to match missing pets: {e}")
     
     return ReportWithSimilarPets(
         report=created_report,
-        similar_pets=similar_pets
+        similar_pets=[],
+        matches=[alert_response(alert) for alert, _ in await fetch_ranked_alerts(db, matches)]
     )
 
-@router.get("/missing", response_model=List[AlertResponse])
+@router.post("/found", response_model=ReportWithSimilarPets)
+async def report_found_pet(
+    report: FoundPetReport,
+    background: Optional[bool] = Query(
+        None, description="Return immediately and match in the background (default: REPORT_PROCESSING_MODE)"
+    ),
+    current_user: dict = Depends(get_current_user)
+):
+    """Report a pet you found; it is matched against active missing alerts"""
+    return await _report_seen_pet(report, "found", background, current_user)
+
+@router.post("/sightings", response_model=ReportWithSimilarPets)
+async def report_sighting(
+    report: FoundPetReport,
+    background: Optional[bool] = Query(
+        None, description="Return immediately and match in the background (default: REPORT_PROCESSING_MODE)"
+    ),
+    current_user: dict = Depends(get_current_user)
+):
+    """Report a pet you saw but could not catch; it is matched against active missing alerts"""
+    return await _report_seen_pet(report, "sighting", background, current_user)
+
+@router.get("/{alert_id}/matches", response_model=List[AlertMatch])
+async def get_alert_matches(
+    alert_id: str,
+    limit: int = Query(10, ge=1, le=50),
+    current_user: dict = Depends(get_current_user)
+):
+    """Stored match candidates for an alert, best first.
+
+    For a missing alert these are found/sighting reports, for a found or
+    sighting report the missing alerts it may belong to. Candidates are
+    computed when either side is reported; closed alerts are left out.
+    """
+    db = get_database()
+    try:
+        alert = await db.alerts.find_one({"_id": ObjectId(alert_id)}, {"alert_type": 1})
+    except Exception:
+        alert = None
+    if not alert:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Alert not found"
+        )
+    
+    matches = await find_matches(db, alert["_id"], alert["alert_type"], limit)
+    ranked = await fetch_ranked_alerts(db, matches)
+    return ORJSONResponse([{"alert": alert_to_dict(match), "score": score} for match, score in ranked])
+
+async def _read_uploads(files: List[UploadFile]) -> dict:
+    """Upload file name -> image bytes, or the reason it was rejected.
+
+    Raises 413 when the request has more than BULK_INTAKE_MAX_FILES files or
+    more than BULK_INTAKE_MAX_UPLOAD_BYTES of images in total.
+    """
+    if len(files) > settings.BULK_INTAKE_MAX_FILES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.BULK_INTAKE_MAX_FILES} files per request"
+        )
+    uploads = {}
+    total_bytes = 0
+    for upload in files:
+        if upload.content_type not in settings.ALLOWED_IMAGE_TYPES:
+            uploads[upload.filename] = ValueError(f"Unsupported content type: {upload.content_type or 'unknown'}")
+            continue
+        data = await upload.read(settings.MAX_FILE_SIZE + 1)
+        if len(data) > settings.MAX_FILE_SIZE:
+            uploads[upload.filename] = ValueError(f"Image larger than {settings.MAX_FILE_SIZE} bytes")
+            continue
+        total_bytes += len(data)
+        if total_bytes > settings.BULK_INTAKE_MAX_UPLOAD_BYTES:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Uploads exceed {settings.BULK_INTAKE_MAX_UPLOAD_BYTES} bytes in total"
+            )
+        uploads[upload.filename] = (upload.content_type, data)
+    return uploads
+
+def _store_upload(content_type: str, data: bytes) -> str:
+    """Write an uploaded photo under UPLOAD_DIR (content-addressed) and return its public URL"""
+    name = hashlib.sha256(data).hexdigest() + (mimetypes.guess_extension(content_type) or "")
+    path = os.path.join(settings.UPLOAD_DIR, name)
+    if not os.path.exists(path):
+        with open(path, "wb") as f:
+            f.write(data)
+    return f"{settings.PUBLIC_BASE_URL.rstrip('/')}/uploads/{name}"
+
+async def _insert_unordered(collection, documents: List[dict]) -> dict:
+    """insert_many(ordered=False); returns position -> error message for the documents that failed"""
+    if not documents:
+        return {}
+    try:
+        await collection.insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        return {error["index"]: error.get("errmsg", "insert failed") for error in e.details.get("writeErrors", [])}
+    return {}
+
+@router.post("/bulk", response_model=BulkIntakeResponse)
+async def bulk_intake(
+    records: str = Form(..., description="JSON array of reports; each has photo_url or photo_file"),
+    files: List[UploadFile] = File(default=[], description="Photos referenced by photo_file"),
+    alert_type: Literal["missing", "found", "sighting"] = Form(
+        "missing", description="Type of records that do not set their own alert_type"
+    ),
+    current_user: dict = Depends(get_current_user)
+):
+    """Create many reports at once (shelter intake).
+
+    Each record has the fields of POST /reports/missing, with the photo given
+    either as ``photo_url`` or as ``photo_file`` naming one of the uploaded
+    files, and optionally its own ``alert_type``. Photos are downloaded
+    concurrently, embedded in large batches and the pets and alerts written
+    with unordered bulk inserts; one bad record does not fail the others.
+    Records are matched missing <-> found/sighting like single reports (the
+    similar-missing-pets suggestion is skipped). Returns a status per record,
+    in input order.
+    """
+    db = get_database()
+    user_id = ObjectId(current_user.id)
+
+    try:
+        raw_records = orjson.loads(records)
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="records must be a JSON array")
+    if not isinstance(raw_records, list):
+        raise HTTPException(status_code=400, detail="records must be a JSON array")
+    if len(raw_records) > settings.BULK_INTAKE_MAX_RECORDS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.BULK_INTAKE_MAX_RECORDS} records per request"
+        )
+
+    items = [BulkIntakeItem(index=i, status="failed") for i in range(len(raw_records))]
+    uploads = await _read_uploads(files)
+
+    # Validate records; pending maps record index -> (report, geo point)
+    pending = {}
+    for i, raw in enumerate(raw_records):
+        try:
+            report = BulkIntakeRecord.model_validate(raw)
+            geo_point = _geo_point(report.last_seen_location)
+        except ValidationError as e:
+            error = e.errors()[0]
+            items[i].error = f"Invalid {'.'.join(map(str, error['loc'])) or 'record'}: {error['msg']}"
+            continue
+        except HTTPException as e:
+            items[i].error = e.detail
+            continue
+        if (report.photo_url is None) == (report.photo_file is None):
+            items[i].error = "Give exactly one of photo_url and photo_file"
+        elif report.photo_file is not None and report.photo_file not in uploads:
+            items[i].error = f"No uploaded file named {report.photo_file}"
+        elif isinstance(uploads.get(report.photo_file), Exception):
+            items[i].error = str(uploads[report.photo_file])
+        else:
+            pending[i] = (report, geo_point)
+
+    # Image embeddings: uploads in batches, URLs downloaded concurrently then batched
+    image_embeddings = {}
+    file_indexes = [i for i, (report, _) in pending.items() if report.photo_file is not None]
+    url_indexes = [i for i, (report, _) in pending.items() if report.photo_url is not None]
+    file_results = await embed_images([uploads[pending[i][0].photo_file][1] for i in file_indexes])
+    url_results = await embed_image_urls(
+        [pending[i][0].photo_url for i in url_indexes], settings.BULK_INTAKE_DOWNLOAD_CONCURRENCY
+    )
+    for i, result in zip(file_indexes + url_indexes, file_results + url_results):
+        if isinstance(result, Exception):
+            items[i].error = f"Photo could not be processed: {result}"
+            del pending[i]
+        else:
+            image_embeddings[i] = result
+
+    text_embeddings = {}
+    indexes = list(pending)
+    try:
+        texts = [_report_text(pending[i][0].species, pending[i][0].color, pending[i][0].description) for i in indexes]
+        text_embeddings = dict(zip(indexes, await embed_texts(texts)))
+    except Exception as e:
+        print(f"Warning: failed to generate text embeddings: {e}")
+
+    # Store uploaded photos that made it this far and link them from the records
+    stored = {}
+    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+    for i in indexes:
+        report = pending[i][0]
+        if report.photo_file is not None:
+            if report.photo_file not in stored:
+                stored[report.photo_file] = await asyncio.to_thread(_store_upload, *uploads[report.photo_file])
+            report.photo_url = stored[report.photo_file]
+
+    record_types = {i: pending[i][0].alert_type or alert_type for i in indexes}
+    pet_docs = []
+    for i in indexes:
+        report, geo_point = pending[i]
+        pet_docs.append({
+            "_id": ObjectId(), **_pet_document(report, geo_point, user_id, is_missing=record_types[i] == "missing")
+        })
+    for position, error in (await _insert_unordered(db.pets, pet_docs)).items():
+        items[indexes[position]].error = error
+    inserted = [(i, pet) for i, pet in zip(indexes, pet_docs) if items[i].error is None]
+
+    alert_docs = []
+    for i, pet in inserted:
+        report, geo_point = pending[i]
+        alert_docs.append({
+            "_id": ObjectId(), **_alert_document(report, geo_point, user_id, pet["_id"], record_types[i])
+        })
+    alert_errors = await _insert_unordered(db.alerts, alert_docs)
+    for position, error in alert_errors.items():
+        items[inserted[position][0]].error = error
+    if alert_errors:
+        # Do not leave pets behind without an alert
+        await db.pets.delete_many({"_id": {"$in": [inserted[position][1]["_id"] for position in alert_errors]}})
+
+    created = [(i, alert) for (i, _), alert in zip(inserted, alert_docs) if items[i].error is None]
+    await save_many_alert_embeddings(db, [
+        (alert["_id"], image_embeddings.get(i), text_embeddings.get(i)) for i, alert in created
+    ])
+    for i, alert in created:
+        index = embedding_index if alert["alert_type"] == "missing" else report_index
+        index.add(alert["_id"], image_embeddings.get(i), text_embeddings.get(i))
+        alert_stream.notify(alert, EVENT_REPORTED)
+        items[i].status = "created"
+        items[i].alert_id = str(alert["_id"])
+        items[i].pet_id = str(alert["pet_id"])
+    await record_alerts(db, [alert for _, alert in created], 1)
+
+    # Match after indexing the whole batch, so records also match each other
+    recent_ids = None
+    for i, alert in created:
+        if image_embeddings.get(i) is None and text_embeddings.get(i) is None:
+            continue
+        try:
+            if alert["alert_type"] == "missing" and recent_ids is None:
+                recent_ids = await _recent_report_ids(db)
+            await _match_and_persist(
+                db, alert["_id"], alert["alert_type"], image_embeddings.get(i), text_embeddings.get(i), recent_ids
+            )
+        except Exception as e:
+            print(f"Warning: failed to match bulk record {i}: {e}")
+
+    return BulkIntakeResponse(created=len(created), failed=len(items) - len(created), items=items)
+
+@router.get("/jobs/{job_id}", response_model=ReportJobStatus)
+async def get_report_job(
+    job_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Poll a background report job; similar_pets and matches are filled in once it completes"""
+    db = get_database()
+    
+    try:
+        job = await report_jobs.get(db, ObjectId(job_id))
+    except Exception:
+        job = None
+    
+    if not job or str(job.get("created_by")) != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    similar_pets = []
+    matches = []
+    if job["status"] == "completed" and job.get("result"):
+        similar = [(match["alert_id"], match["score"]) for match in job["result"].get("similar", [])]
+        similar_pets = [alert_response(alert) for alert, _ in await fetch_ranked_alerts(db, similar)]
+        candidates = [(match["alert_id"], match["score"]) for match in job["result"].get("matches", [])]
+        matches = [alert_response(alert) for alert, _ in await fetch_ranked_alerts(db, candidates)]
+    
+    return ReportJobStatus(
+        job_id=str(job["_id"]),
+        alert_id=str(job["alert_id"]),
+        status=job["status"],
+        attempts=job.get("attempts", 0),
+        similar_pets=similar_pets,
+        matches=matches,
+        error=job.get("error")
+    )
+
+async def _alert_page(collection, filter_query: dict, cursor: Optional[str], limit: int) -> ORJSONResponse:
+    """One keyset page of alerts, newest first"""
+    keyset = created_cursor_filter(cursor)
+    if keyset:
+        filter_query = {"$and": [filter_query, keyset]}
+    
+    # Fetch one extra document to learn whether another page exists
+    alerts = await collection.find(filter_query, ALERT_RESPONSE_PROJECTION).sort(CREATED_SORT).limit(limit + 1).to_list(length=limit + 1)
+    next_cursor = None
+    if len(alerts) > limit:
+        alerts = alerts[:limit]
+        next_cursor = encode_created_cursor(alerts[-1]["created_at"], alerts[-1]["_id"])
+    
+    return alert_page_response(alerts, next_cursor)
+
+@router.get("/missing", response_model=Union[List[AlertResponse], AlertPage])
 async def get_missing_pets(
     skip: int = 0,
     limit: int = 20,
     species: Optional[str] = None,
-    location: Optional[str] = None
+    color: Optional[str] = None,
+    location: Optional[str] = Query(None, description="Place name words, all of which must match"),
+    paginate: str = Query("offset", pattern="^(offset|cursor)$", description="'cursor' returns {items, next_cursor}"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (paginate=cursor)")
 ):
     """Get list of missing pets with optional filters"""
     db = get_database()
@@ -241,33 +693,27 @@ async def get_missing_pets(
     # Build filter query
     filter_query = {"alert_type": "missing", "is_active": True}
     
+    # Exact matches on normalized fields, so each filter is an index range scan
+    species = normalize_term(species)
     if species:
-        filter_query["species"] = {"$regex": species, "$options": "i"}
+        filter_query["species"] = species
+    
+    color = normalize_term(color)
+    if color:
+        filter_query["color"] = color
+    
+    tokens = place_tokens(location)
+    if tokens:
+        filter_query["place_tokens"] = {"$all": tokens}
     
-    if location:
-        filter_query["location"] = {"$regex": location, "$options": "i"}
+    if paginate == "cursor":
+        return await _alert_page(db.alerts, filter_query, cursor, limit)
     
     # Get alerts with pagination
-    cursor = db.alerts.find(filter_query).skip(skip).limit(limit).sort("created_at", -1)
+    cursor = db.alerts.find(filter_query, ALERT_RESPONSE_PROJECTION).skip(skip).limit(limit).sort("created_at", -1)
     alerts = await cursor.to_list(length=limit)
     
-    return [
-        AlertResponse(
-            id=str(alert["_id"]),
-            pet_id=str(alert["pet_id"]),
-            alert_type=alert["alert_type"],
-            title=alert["title"],
-            description=alert["description"],
-            location=str(alert["location"]),  # Convert GeoJSON to string
-            contact_info=alert["contact_info"],
-            photos=alert.get("photos", []),
-            is_active=alert["is_active"],
-            created_by=str(alert["created_by"]),
-            created_at=alert["created_at"],
-            updated_at=alert.get("updated_at")
-        )
-        for alert in alerts
-    ]
+    return alert_list_response(alerts)
 
 @router.get("/missing/{alert_id}", response_model=AlertResponse)
 async def get_missing_pet_details(alert_id: str):
@@ -276,7 +722,7 @@ async def get_missing_pet_details(alert_id: str):
     
     from bson import ObjectId
     try:
-        alert = await db.alerts.find_one({"_id": ObjectId(alert_id)})
+        alert = await db.alerts.find_one({"_id": ObjectId(alert_id)}, ALERT_RESPONSE_PROJECTION)
     except:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -289,20 +735,7 @@ async def get_missing_pet_details(alert_id: str):
             detail="Alert not found"
         )
     
-    return AlertResponse(
-        id=str(alert["_id"]),
-        pet_id=str(alert["pet_id"]),
-        alert_type=alert["alert_type"],
-        title=alert["title"],
-        description=alert["description"],
-        location=alert["location"],
-        contact_info=alert["contact_info"],
-        photos=alert.get("photos", []),
-        is_active=alert["is_active"],
-        created_by=str(alert["created_by"]),
-        created_at=alert["created_at"],
-        updated_at=alert.get("updated_at")
-    )
+    return alert_response(alert)
 
 @router.post("/found/{alert_id}")
 async def mark_pet_found(
@@ -314,7 +747,9 @@ async def mark_pet_found(
     
     from bson import ObjectId
     try:
-        alert = await db.alerts.find_one({"_id": ObjectId(alert_id)})
+        alert = await db.alerts.find_one(
+            {"_id": ObjectId(alert_id)}, {**ALERT_MARKER_PROJECTION, "pet_id": 1, "alert_type": 1}
+        )
     except:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -327,11 +762,16 @@ async def mark_pet_found(
             detail="Alert not found"
         )
     
-    # Update alert to inactive
-    await db.alerts.update_one(
-        {"_id": ObjectId(alert_id)},
+    # Update alert to inactive; only the call that deactivates it updates the clusters
+    result = await db.alerts.update_one(
+        {"_id": ObjectId(alert_id), "is_active": True},
         {"$set": {"is_active": False, "updated_at": datetime.now()}}
     )
+    if result.modified_count:
+        await record_alert(db, alert, -1)
+        alert_stream.notify({**alert, "is_active": False}, EVENT_FOUND)
+    embedding_index.remove(alert["_id"])
+    report_index.remove(alert["_id"])
     
     # Update pet to not missing
     await db.pets.update_one(
@@ -341,11 +781,13 @@ async def mark_pet_found(
     
     return {"message": "Pet marked as found successfully"}
 
-@router.get("/my-reports", response_model=List[AlertResponse])
+@router.get("/my-reports", response_model=Union[List[AlertResponse], AlertPage])
 async def get_my_reports(
     current_user: dict = Depends(get_current_user),
     skip: int = 0,
-    limit: int = 20
+    limit: int = 20,
+    paginate: str = Query("offset", pattern="^(offset|cursor)$", description="'cursor' returns {items, next_cursor}"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (paginate=cursor)")
 ):
     """Get current user's missing pet reports"""
     db = get_database()
@@ -354,27 +796,14 @@ async def get_my_reports(
     from bson import ObjectId
     user_id = ObjectId(current_user.id)
     
+    if paginate == "cursor":
+        return await _alert_page(db.alerts, {"created_by": user_id}, cursor, limit)
+    
     # Get user's alerts
     cursor = db.alerts.find(
-        {"created_by": user_id}
+        {"created_by": user_id}, ALERT_RESPONSE_PROJECTION
     ).skip(skip).limit(limit).sort("created_at", -1)
     
     alerts = await cursor.to_list(length=limit)
     
-    return [
-        AlertResponse(
-            id=str(alert["_id"]),
-            pet_id=str(alert["pet_id"]),
-            alert_type=alert["alert_type"],
-            title=alert["title"],
-            description=alert["description"],
-            location=str(alert["location"]),  # Convert GeoJSON to string
-            contact_info=alert["contact_info"],
-            photos=alert.get("photos", []),
-            is_active=alert["is_active"],
-            created_by=str(alert["created_by"]),
-            created_at=alert["created_at"],
-            updated_at=alert.get("updated_at")
-        )
-        for alert in alerts
-    ]
+    return alert_list_response(alerts)
@@ -0,0 +1,346 @@
+"""Load benchmark for every API route against a local mongod, fully offline.
+
+Seeds a scratch database (see ``benchmarks.seed``), starts the app with
+uvicorn on it using the stub embedding model (``EMBEDDING_BACKEND=stub``),
+and drives each endpoint in turn at the given concurrency. Report photos are
+the images in ``static/images``, fetched from the app itself. Usage (from
+backend/):
+
+    python -m benchmarks.load --users 100 --alerts 5000 --requests 200 --concurrency 16
+
+Writes p50/p95/p99 latency, error count and throughput per endpoint as JSON
+(``--output``, default ``benchmark-results/load-<timestamp>.json``) so runs can
+be diffed. ``--base-url`` benchmarks an already running server instead; it
+must use the same database (``--database``) and should run the stub model.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import httpx
+import numpy as np
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from benchmarks.seed import (
+    CITIES, PASSWORD, SPECIES, STATIC_IMAGES_DIR, random_point, seed, static_image_names, user_email,
+)
+from core.config import settings
+
+API = settings.API_V1_STR
+
+
+class BenchContext:
+    """State shared by request builders: tokens, ids to hit, photo URLs."""
+
+    def __init__(self, base_url: str, photo_urls: List[str], user_count: int):
+        self.base_url = base_url
+        self.photo_urls = photo_urls
+        self.user_count = user_count
+        self.tokens: List[str] = []
+        self.alert_ids: List[str] = []
+        self.found_ids: List[str] = []   # consumed by POST /reports/found
+        self.job_ids: List[str] = []     # owned by tokens[0]
+
+    def auth(self, rng: random.Random, index: Optional[int] = None) -> dict:
+        token = self.tokens[index] if index is not None else rng.choice(self.tokens)
+        return {"Authorization": f"Bearer {token}"}
+
+
+class Endpoint(NamedTuple):
+    name: str
+    method: str
+    build: Callable[[BenchContext, random.Random], dict]  # -> httpx request kwargs (url, params, json, data, files, headers)
+    max_requests: Optional[int] = None  # cap for expensive endpoints
+
+
+def _report(ctx: BenchContext, rng: random.Random) -> dict:
+    city = rng.choice(CITIES)
+    lon, lat = random_point(rng, city)
+    return {
+        "name": "Benchmark pet",
+        "species": rng.choice(SPECIES),
+        "color": "brown",
+        "description": "benchmark report",
+        "photo_url": rng.choice(ctx.photo_urls),
+        "last_seen_location": {"lon": lon, "lat": lat},
+        "last_seen_place": f"{rng.choice(city.places)}, {city.name}",
+        "last_seen_date": (datetime.now() - timedelta(hours=rng.randint(0, 48))).isoformat(),
+        "contact_info": "bench@example.com",
+    }
+
+
+BULK_RECORDS = 20  # records per POST /reports/bulk, half of them uploaded
+
+
+def _bulk_intake(ctx: BenchContext, rng: random.Random, alert_type: str) -> dict:
+    name = rng.choice(static_image_names())
+    with open(os.path.join(STATIC_IMAGES_DIR, name), "rb") as f:
+        photo = f.read()
+    records = []
+    for i in range(BULK_RECORDS):
+        record = _report(ctx, rng)
+        if i % 2:
+            del record["photo_url"]
+            record["photo_file"] = name
+        records.append(record)
+    content_type = "image/png" if name.endswith(".png") else "image/jpeg"
+    return {
+        "url": f"{API}/reports/bulk", "headers": ctx.auth(rng),
+        "data": {"records": json.dumps(records), "alert_type": alert_type},
+        "files": [("files", (name, photo, content_type))],
+    }
+
+
+def _near(rng: random.Random) -> dict:
+    lon, lat = random_point(rng, rng.choice(CITIES))
+    return {"lon": lon, "lat": lat, "radius_m": 5000}
+
+
+def _map_box(rng: random.Random) -> dict:
+    """A map viewport of roughly 10 x 10 km in one of the seeded cities."""
+    lon, lat = random_point(rng, rng.choice(CITIES))
+    return {"min_lon": lon - 0.05, "min_lat": lat - 0.05, "max_lon": lon + 0.05, "max_lat": lat + 0.05}
+
+
+ENDPOINTS: List[Endpoint] = [
+    Endpoint("GET /", "GET", lambda ctx, rng: {"url": "/"}),
+    Endpoint("GET /health", "GET", lambda ctx, rng: {"url": "/health"}),
+    Endpoint("GET /metrics", "GET", lambda ctx, rng: {"url": "/metrics"}),
+    Endpoint("GET /auth/me", "GET", lambda ctx, rng: {"url": f"{API}/auth/me", "headers": ctx.auth(rng)}),
+    Endpoint("GET /reports/missing", "GET", lambda ctx, rng: {"url": f"{API}/reports/missing"}),
+    Endpoint("GET /reports/missing?species", "GET", lambda ctx, rng: {
+        "url": f"{API}/reports/missing", "params": {"species": rng.choice(SPECIES)}}),
+    Endpoint("GET /reports/missing?location", "GET", lambda ctx, rng: {
+        "url": f"{API}/reports/missing", "params": {"location": rng.choice(rng.choice(CITIES).places)}}),
+    Endpoint("GET /reports/missing?paginate=cursor", "GET", lambda ctx, rng: {
+        "url": f"{API}/reports/missing", "params": {"paginate": "cursor", "limit": 50}}),
+    Endpoint("GET /reports/missing/{id}", "GET", lambda ctx, rng: {
+        "url": f"{API}/reports/missing/{rng.choice(ctx.alert_ids)}"}),
+    Endpoint("GET /reports/my-reports", "GET", lambda ctx, rng: {
+        "url": f"{API}/reports/my-reports", "headers": ctx.auth(rng)}),
+    Endpoint("GET /reports/jobs/{id}", "GET", lambda ctx, rng: {
+        "url": f"{API}/reports/jobs/{rng.choice(ctx.job_ids)}", "headers": ctx.auth(rng, 0)}),
+    Endpoint("GET /alerts/near", "GET", lambda ctx, rng: {"url": f"{API}/alerts/near", "params": _near(rng)}),
+    Endpoint("GET /alerts/near?paginate=cursor", "GET", lambda ctx, rng: {
+        "url": f"{API}/alerts/near", "params": {**_near(rng), "paginate": "cursor"}}),
+    Endpoint("GET /alerts/clusters", "GET", lambda ctx, rng: {
+        "url": f"{API}/alerts/clusters", "params": {**_map_box(rng), "zoom": 12}}),
+    Endpoint("GET /alerts/export?bbox", "GET", lambda ctx, rng: {
+        "url": f"{API}/alerts/export", "params": _map_box(rng)}),
+    Endpoint("GET /alerts/export?updated_since", "GET", lambda ctx, rng: {
+        "url": f"{API}/alerts/export",
+        "params": {"updated_since": (datetime.now() - timedelta(days=1)).isoformat()}}),
+    Endpoint("GET /similarity/find", "GET", lambda ctx, rng: {
+        "url": f"{API}/similarity/find", "headers": ctx.auth(rng), "params": {
+            "photo_url": rng.choice(ctx.photo_urls), "text_description": "brown dog",
+            "similarity_threshold": 0.0, "limit": 10}}),
+    Endpoint("GET /similarity/find?filtered", "GET", lambda ctx, rng: {
+        "url": f"{API}/similarity/find", "headers": ctx.auth(rng), "params": {
+            "photo_url": rng.choice(ctx.photo_urls), "text_description": "brown dog",
+            "similarity_threshold": 0.0, "limit": 10, "species": rng.choice(SPECIES), **_near(rng)}}),
+    Endpoint("POST /auth/login", "POST", lambda ctx, rng: {
+        "url": f"{API}/auth/login",
+        "json": {"email": user_email(rng.randrange(ctx.user_count)), "password": PASSWORD}}),
+    Endpoint("POST /auth/register", "POST", lambda ctx, rng: {
+        "url": f"{API}/auth/register",
+        "json": {"email": f"bench-new-{uuid.uuid4().hex}@example.com", "password": PASSWORD}}),
+    Endpoint("POST /reports/missing", "POST", lambda ctx, rng: {
+        "url": f"{API}/reports/missing", "headers": ctx.auth(rng), "json": _report(ctx, rng)}),
+    Endpoint("POST /reports/missing?background", "POST", lambda ctx, rng: {
+        "url": f"{API}/reports/missing", "params": {"background": True},
+        "headers": ctx.auth(rng), "json": _report(ctx, rng)}),
+    Endpoint("POST /reports/found", "POST", lambda ctx, rng: {
+        "url": f"{API}/reports/found", "headers": ctx.auth(rng), "json": _report(ctx, rng)}),
+    Endpoint("POST /reports/sightings", "POST", lambda ctx, rng: {
+        "url": f"{API}/reports/sightings", "headers": ctx.auth(rng), "json": _report(ctx, rng)}),
+    Endpoint("GET /reports/{id}/matches", "GET", lambda ctx, rng: {
+        "url": f"{API}/reports/{rng.choice(ctx.alert_ids)}/matches", "headers": ctx.auth(rng)}),
+    Endpoint(f"POST /reports/bulk ({BULK_RECORDS} missing)", "POST",
+             lambda ctx, rng: _bulk_intake(ctx, rng, "missing"), max_requests=20),
+    Endpoint(f"POST /reports/bulk ({BULK_RECORDS} found)", "POST",
+             lambda ctx, rng: _bulk_intake(ctx, rng, "found"), max_requests=20),
+    Endpoint("POST /reports/found/{id}", "POST", lambda ctx, rng: {
+        "url": f"{API}/reports/found/{ctx.found_ids.pop()}", "headers": ctx.auth(rng)}),
+]
+
+
+def summarize(latencies: List[float], errors: int, statuses: Counter, elapsed: float) -> dict:
+    ms = np.asarray(latencies) * 1000 if latencies else np.zeros(1)
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "status_codes": {str(code): count for code, count in sorted(statuses.items(), key=lambda item: str(item[0]))},
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "mean_ms": round(float(ms.mean()), 2),
+        "max_ms": round(float(ms.max()), 2),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+async def drive(client: httpx.AsyncClient, ctx: BenchContext, endpoint: Endpoint, total: int,
+                concurrency: int, rng: random.Random) -> dict:
+    """Send ``total`` requests to one endpoint from ``concurrency`` workers."""
+    if endpoint.max_requests is not None:
+        total = min(total, endpoint.max_requests)
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    errors = 0
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            request = endpoint.build(ctx, rng)
+            started = time.perf_counter()
+            try:
+                response = await client.request(endpoint.method, **request)
+                statuses[response.status_code] += 1
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                statuses["transport_error"] += 1
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return summarize(latencies, errors, statuses, time.perf_counter() - started)
+
+
+async def prepare(client: httpx.AsyncClient, db, ctx: BenchContext, found_reserve: int, token_count: int):
+    """Log in, pick target alerts and queue a few background jobs to poll."""
+    for i in range(min(token_count, ctx.user_count)):
+        response = await client.post(f"{API}/auth/login", json={"email": user_email(i), "password": PASSWORD})
+        response.raise_for_status()
+        ctx.tokens.append(response.json()["access_token"])
+
+    active = await db.alerts.find({"is_active": True}, {"_id": 1}).to_list(length=None)
+    ids = [str(alert["_id"]) for alert in active]
+    random.Random(1).shuffle(ids)
+    # Alerts marked found are set aside so reads keep hitting active alerts
+    ctx.found_ids = ids[:found_reserve]
+    ctx.alert_ids = ids[found_reserve:] or ids
+
+    rng = random.Random(2)
+    for _ in range(10):
+        response = await client.post(f"{API}/reports/missing", params={"background": True},
+                                     headers=ctx.auth(rng, 0), json=_report(ctx, rng))
+        response.raise_for_status()
+        ctx.job_ids.append(response.json()["job_id"])
+
+
+def start_server(port: int, database: str) -> subprocess.Popen:
+    env = {**os.environ, "DATABASE_NAME": database, "EMBEDDING_BACKEND": "stub"}
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        env=env,
+    )
+
+
+async def wait_until_ready(base_url: str, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"Server at {base_url} did not become ready within {timeout}s")
+
+
+async def run(args) -> dict:
+    base_url = args.base_url or f"http://127.0.0.1:{args.port}"
+    photo_urls = [f"{base_url}/images/{name}" for name in static_image_names()]
+
+    mongo = AsyncIOMotorClient(settings.MONGODB_URL)
+    server = None
+    try:
+        db = mongo[args.database]
+        if not args.skip_seed:
+            await mongo.drop_database(args.database)
+            await seed(db, args.users, args.alerts, photo_urls)
+        if not args.base_url:
+            server = start_server(args.port, args.database)
+        await wait_until_ready(base_url)
+
+        ctx = BenchContext(base_url, photo_urls, args.users)
+        results: Dict[str, dict] = {}
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+            await prepare(client, db, ctx, args.requests + args.warmup, args.tokens)
+            rng = random.Random(args.seed)
+            selected = [e for e in ENDPOINTS if not args.only or any(o in e.name for o in args.only)]
+            for endpoint in selected:
+                # Warm caches and lazy loads (e.g. the embedding index) outside the measurement
+                await drive(client, ctx, endpoint, args.warmup, 1, rng)
+                results[endpoint.name] = await drive(client, ctx, endpoint, args.requests, args.concurrency, rng)
+                summary = results[endpoint.name]
+                print(f"{endpoint.name:<40} p50 {summary['p50_ms']:>8.1f} ms  p95 {summary['p95_ms']:>8.1f} ms  "
+                      f"p99 {summary['p99_ms']:>8.1f} ms  {summary['throughput_rps']:>7.1f} req/s  "
+                      f"errors {summary['errors']}")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+        if not args.keep and not args.skip_seed:
+            await mongo.drop_database(args.database)
+        mongo.close()
+
+    return {
+        "started_at": datetime.now().isoformat(),
+        "config": {
+            "users": args.users, "alerts": args.alerts, "requests": args.requests,
+            "concurrency": args.concurrency, "warmup": args.warmup, "base_url": base_url,
+            "similarity_backend": settings.SIMILARITY_BACKEND,
+            "embedding_storage_format": settings.EMBEDDING_STORAGE_FORMAT,
+        },
+        "endpoints": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--alerts", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=3, help="Unmeasured requests per endpoint")
+    parser.add_argument("--tokens", type=int, default=20, help="Users logged in for authenticated routes")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--database", default=f"{settings.DATABASE_NAME}_bench")
+    parser.add_argument("--base-url", help="Benchmark a running server instead of starting one")
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse the data already in --database")
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded database afterwards")
+    parser.add_argument("--only", nargs="*", help="Only endpoints whose name contains one of these")
+    parser.add_argument("--output", help="Result file (default benchmark-results/load-<timestamp>.json)")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    output = args.output or os.path.join(
+        "benchmark-results", f"load-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
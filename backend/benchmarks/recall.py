@@ -0,0 +1,103 @@
+"""Recall@k of the configured similarity backend against exact search.
+
+Loads the embedding index from the configured database (SIMILARITY_BACKEND,
+IVF_* / HNSW_* as for the API), samples stored alerts and uses each one's own
+vectors as a query: recall@k is the fraction of the exact top-k that the ANN
+backend also returns. Usage (from backend/):
+
+    python -m benchmarks.recall [--k 10] [--sample-size 100] [--nprobe 16] [--ef-search 128]
+
+Prints a JSON report. This scans every indexed alert once per sampled query,
+which is why it runs offline rather than behind an API route.
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Optional
+
+import numpy as np
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from core.config import settings
+from core.vector_index import INDEXED_ALERTS_QUERY, EmbeddingIndex, embedding_index
+from db.embedding_store import find_alert_embeddings
+
+
+async def evaluate_recall(db, index: EmbeddingIndex, k: int = 10, sample_size: int = 100,
+                          image_weight: float = 0.7, text_weight: float = 0.3,
+                          search_params: Optional[dict] = None) -> dict:
+    """Compare the index's ANN ranking with its exact ranking on sampled stored alerts."""
+    sampled = await db.alerts.aggregate([
+        {"$match": INDEXED_ALERTS_QUERY}, {"$sample": {"size": sample_size}}, {"$project": {"_id": 1}},
+    ]).to_list(length=None)
+    queries = [
+        query for query in await find_alert_embeddings(db, [alert["_id"] for alert in sampled])
+        if query["_id"] in index
+    ]
+
+    recalls = []
+    exact_seconds = 0.0
+    ann_seconds = 0.0
+    for query in queries:
+        query_image = query.get("image_embedding")
+        query_text = query.get("text_embedding")
+
+        started = time.perf_counter()
+        expected = index.search(
+            query_image, query_text, image_weight, text_weight, -1.0, k, exclude_ids=[query["_id"]], exact=True
+        )
+        exact_seconds += time.perf_counter() - started
+
+        started = time.perf_counter()
+        found = index.search(
+            query_image, query_text, image_weight, text_weight, -1.0, k,
+            exclude_ids=[query["_id"]], search_params=search_params
+        )
+        ann_seconds += time.perf_counter() - started
+
+        if expected:
+            expected_ids = {alert_id for alert_id, _ in expected}
+            recalls.append(len(expected_ids & {alert_id for alert_id, _ in found}) / len(expected_ids))
+
+    backend = index.backend
+    return {
+        "backend": backend.name if backend is not None else "exact",
+        "params": {**(backend.params() if backend is not None else {}), **(search_params or {})},
+        "k": k,
+        "alerts": len(index),
+        "queries": len(recalls),
+        "recall_at_k": float(np.mean(recalls)) if recalls else None,
+        "exact_ms_per_query": 1000 * exact_seconds / max(len(queries), 1),
+        "index_ms_per_query": 1000 * ann_seconds / max(len(queries), 1),
+    }
+
+
+async def run(k: int, sample_size: int, search_params: dict) -> dict:
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    try:
+        db = client[settings.DATABASE_NAME]
+        await embedding_index.load(db)
+        return await evaluate_recall(db, embedding_index, k=k, sample_size=sample_size, search_params=search_params)
+    finally:
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, default=10, help="Neighbours compared per query")
+    parser.add_argument("--sample-size", type=int, default=100, help="Stored alerts used as queries")
+    parser.add_argument("--nprobe", type=int, help="IVF cells probed (overrides IVF_NPROBE)")
+    parser.add_argument("--ef-search", type=int, help="HNSW beam width (overrides HNSW_EF_SEARCH)")
+    args = parser.parse_args()
+
+    search_params = {}
+    if args.nprobe is not None:
+        search_params["nprobe"] = args.nprobe
+    if args.ef_search is not None:
+        search_params["ef_search"] = args.ef_search
+    print(json.dumps(asyncio.run(run(args.k, args.sample_size, search_params)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Synthetic users, pets, alerts and embeddings for benchmarks.
+
+Alerts are spread around a handful of city centres (Gaussian, a few km wide)
+with the same fields ``POST /reports/missing`` writes, and get random unit
+embeddings in the configured storage format. Usage (from backend/):
+
+    python -m benchmarks.seed --database pet_alert_db_bench --users 100 --alerts 5000
+
+The target database is dropped first.
+"""
+import argparse
+import asyncio
+import os
+import random
+from datetime import datetime, timedelta
+from typing import List, NamedTuple
+
+import numpy as np
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from core.config import settings
+from core.embeddings import pack_embedding
+from core.search_terms import normalize_term, place_tokens
+from core.security import pwd_context
+from db.embedding_store import EMBEDDINGS_COLLECTION
+from db.indexes import apply_index_migrations
+from db.migrations.rebuild_alert_clusters import rebuild
+
+STATIC_IMAGES_DIR = os.path.join("static", "images")  # served by the app under /images
+PASSWORD = "benchmark-password"
+SPECIES = ["dog", "cat", "bird", "rabbit"]
+COLORS = ["brown", "black", "white", "golden", "grey", "orange", None]
+
+
+class City(NamedTuple):
+    name: str
+    lon: float
+    lat: float
+    places: List[str]
+
+
+CITIES = [
+    City("San Francisco", -122.4194, 37.7749, ["Mission District", "Sunset", "Noe Valley", "Richmond"]),
+    City("Oakland", -122.2711, 37.8044, ["Temescal", "Lake Merritt", "Fruitvale"]),
+    City("San Jose", -121.8863, 37.3382, ["Willow Glen", "Japantown", "Almaden"]),
+    City("Seattle", -122.3321, 47.6062, ["Capitol Hill", "Ballard", "Fremont"]),
+    City("Portland", -122.6765, 45.5152, ["Pearl District", "Alberta", "Sellwood"]),
+]
+
+# ~1 degree of latitude is 111 km; spread points a few km around each centre
+_SPREAD_DEGREES = 0.03
+
+
+def static_image_names() -> List[str]:
+    return sorted(os.listdir(STATIC_IMAGES_DIR))
+
+
+def user_email(index: int) -> str:
+    return f"bench-user-{index}@example.com"
+
+
+def random_point(rng: random.Random, city: City) -> List[float]:
+    return [city.lon + rng.gauss(0, _SPREAD_DEGREES), city.lat + rng.gauss(0, _SPREAD_DEGREES)]
+
+
+def _unit_vectors(rng: np.random.Generator, count: int, dim: int) -> np.ndarray:
+    vectors = rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+async def seed(db, users: int, alerts: int, photo_urls: List[str], seed_value: int = 0,
+               batch_size: int = 1000) -> dict:
+    """Insert the synthetic data set; returns counts and the seeded user ids."""
+    rng = random.Random(seed_value)
+    np_rng = np.random.default_rng(seed_value)
+    now = datetime.now()
+
+    await apply_index_migrations(db)
+
+    # One bcrypt hash shared by every benchmark user
+    hashed_password = pwd_context.hash(PASSWORD)
+    user_docs = [
+        {"email": user_email(i), "hashed_password": hashed_password,
+         "created_at": now - timedelta(days=rng.randint(0, 365)), "is_active": True}
+        for i in range(users)
+    ]
+    user_ids = (await db.users.insert_many(user_docs)).inserted_ids
+
+    for start in range(0, alerts, batch_size):
+        count = min(batch_size, alerts - start)
+        pets, alert_docs = [], []
+        for i in range(start, start + count):
+            city = rng.choice(CITIES)
+            place = f"{rng.choice(city.places)}, {city.name}"
+            point = {"type": "Point", "coordinates": random_point(rng, city)}
+            species = rng.choice(SPECIES)
+            color = rng.choice(COLORS)
+            owner = rng.choice(user_ids)
+            created_at = now - timedelta(minutes=rng.randint(0, 60 * 24 * 60))
+            last_seen = created_at - timedelta(hours=rng.randint(0, 72))
+            active = rng.random() < 0.9
+            photo_url = rng.choice(photo_urls)
+            pet_id = ObjectId()
+            pets.append({
+                "_id": pet_id, "name": f"Pet {i}", "species": species, "color": color,
+                "description": f"{color or ''} {species} last seen near {place}".strip(),
+                "photo_url": photo_url, "last_seen_location": point, "last_seen_place": place,
+                "last_seen_date": last_seen, "owner_id": owner, "is_missing": active,
+                "created_at": created_at, "updated_at": None,
+            })
+            alert_docs.append({
+                "pet_id": pet_id, "alert_type": "missing",
+                "title": f"Missing {species}: Pet {i}",
+                "description": f"{color or ''} {species} last seen near {place}".strip(),
+                "location": point, "contact_info": user_email(0), "photos": [photo_url],
+                "species": normalize_term(species), "color": normalize_term(color),
+                "place_name": place, "place_tokens": place_tokens(place),
+                "last_seen_date": last_seen, "is_active": active, "created_by": owner,
+                "created_at": created_at, "updated_at": None if active else now,
+            })
+        await db.pets.insert_many(pets)
+        alert_ids = (await db.alerts.insert_many(alert_docs)).inserted_ids
+
+        image_vectors = _unit_vectors(np_rng, count, 512)
+        text_vectors = _unit_vectors(np_rng, count, 384)
+        storage_format = settings.EMBEDDING_STORAGE_FORMAT
+        await db[EMBEDDINGS_COLLECTION].insert_many([
+            {
+                "_id": alert_id,
+                "image_embedding": pack_embedding(image_vectors[row].tolist(), storage_format),
+                "text_embedding": pack_embedding(text_vectors[row].tolist(), storage_format),
+                "created_at": now,
+            }
+            for row, alert_id in enumerate(alert_ids)
+        ])
+
+    await rebuild(db)
+    return {"users": users, "alerts": alerts, "user_ids": user_ids}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", default=f"{settings.DATABASE_NAME}_bench")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--alerts", type=int, default=5000)
+    parser.add_argument("--photo-base-url", default="http://127.0.0.1:8765/images")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    try:
+        await client.drop_database(args.database)
+        photo_urls = [f"{args.photo_base_url}/{name}" for name in static_image_names()]
+        result = await seed(client[args.database], args.users, args.alerts, photo_urls)
+    finally:
+        client.close()
+    print(f"✅ Seeded {result['users']} users and {result['alerts']} alerts into {args.database}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,118 @@
+"""Per-item cost of serializing alert lists, before and after core.serialization.
+
+"before" is the old route path: build an AlertResponse per document, let
+FastAPI validate the list against ``response_model`` again, run
+``jsonable_encoder`` and render with the stdlib json encoder. "after" is
+``alert_list_response``: plain dicts rendered by orjson. Usage (from backend/):
+
+    python -m benchmarks.serialization [--items 50] [--rounds 200]
+
+Prints a JSON report with microseconds per item for both paths.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from core.serialization import alert_list_response
+from schemas.pet import AlertResponse
+
+
+def synthetic_alerts(count: int, seed: int = 0) -> List[dict]:
+    """Alert documents as returned by ALERT_RESPONSE_PROJECTION."""
+    rng = random.Random(seed)
+    now = datetime.now().replace(microsecond=0)
+    return [
+        {
+            "_id": ObjectId(),
+            "pet_id": ObjectId(),
+            "alert_type": "missing",
+            "title": f"Missing dog: Pet {i}",
+            "description": "Friendly golden retriever with a white patch on the chest, answers to her name",
+            "location": {"type": "Point", "coordinates": [-122.42 + rng.uniform(-0.1, 0.1),
+                                                          37.77 + rng.uniform(-0.1, 0.1)]},
+            "contact_info": "owner@example.com",
+            "photos": [f"http://localhost:8000/static/images/pet{i}.jpg"],
+            "is_active": True,
+            "created_by": ObjectId(),
+            "created_at": now - timedelta(minutes=i, milliseconds=rng.randint(0, 999)),
+            "updated_at": None,
+        }
+        for i in range(count)
+    ]
+
+
+def _legacy_models(alerts: List[dict]) -> List[AlertResponse]:
+    return [
+        AlertResponse(
+            id=str(alert["_id"]),
+            pet_id=str(alert["pet_id"]),
+            alert_type=alert["alert_type"],
+            title=alert["title"],
+            description=alert["description"],
+            location=str(alert["location"]),
+            contact_info=alert["contact_info"],
+            photos=alert.get("photos", []),
+            is_active=alert["is_active"],
+            created_by=str(alert["created_by"]),
+            created_at=alert["created_at"],
+            updated_at=alert.get("updated_at"),
+        )
+        for alert in alerts
+    ]
+
+
+async def legacy_body(field, alerts: List[dict]) -> bytes:
+    content = await serialize_response(field=field, response_content=_legacy_models(alerts))
+    return JSONResponse(content).body
+
+
+def fast_body(alerts: List[dict]) -> bytes:
+    return alert_list_response(alerts).body
+
+
+async def run(items: int, rounds: int) -> dict:
+    alerts = synthetic_alerts(items)
+    field = create_response_field(name="Response_alerts", type_=List[AlertResponse])
+
+    # Both paths must produce the same document
+    if json.loads(await legacy_body(field, alerts)) != json.loads(fast_body(alerts)):
+        raise AssertionError("fast alert serialization differs from the response_model output")
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        await legacy_body(field, alerts)
+    before = (time.perf_counter() - started) / (rounds * items)
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fast_body(alerts)
+    after = (time.perf_counter() - started) / (rounds * items)
+
+    return {
+        "items": items,
+        "rounds": rounds,
+        "before_us_per_item": round(before * 1e6, 2),
+        "after_us_per_item": round(after * 1e6, 2),
+        "speedup": round(before / after, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=50, help="Alerts per response")
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.items, args.rounds)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import Any, List, Tuple
+
+from pymongo import UpdateOne
+
+# Match candidates between missing alerts and found/sighting reports,
+# computed once when either side is reported and read back by
+# GET /reports/{alert_id}/matches.
+
+ALERT_MATCHES_COLLECTION = "alert_matches"
+
+
+async def save_matches(db, pairs: List[Tuple[Any, Any, float]]):
+    """Upsert ``(missing_alert_id, report_alert_id, score)`` candidates."""
+    if not pairs:
+        return
+    now = datetime.now()
+    await db[ALERT_MATCHES_COLLECTION].bulk_write([
+        UpdateOne(
+            {"missing_alert_id": missing_id, "report_alert_id": report_id},
+            {"$set": {"score": score, "updated_at": now}, "$setOnInsert": {"created_at": now}},
+            upsert=True,
+        )
+        for missing_id, report_id, score in pairs
+    ], ordered=False)
+
+
+async def find_matches(db, alert_id: Any, alert_type: str, limit: int) -> List[Tuple[Any, float]]:
+    """Best-first ``(other_alert_id, score)`` candidates stored for an alert."""
+    own, other = ("missing_alert_id", "report_alert_id") if alert_type == "missing" else \
+        ("report_alert_id", "missing_alert_id")
+    cursor = db[ALERT_MATCHES_COLLECTION].find({own: alert_id}, {other: 1, "score": 1}).sort("score", -1).limit(limit)
+    return [(match[other], match["score"]) async for match in cursor]
@@ -0,0 +1,190 @@
+import asyncio
+import math
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+
+from core import geohash
+from core.config import settings
+from core.metrics import ALERT_STREAM_DROPPED, ALERT_STREAM_SUBSCRIBERS
+from core.serialization import alert_marker
+from core.vector_index import EARTH_RADIUS_M
+
+# Live alert push. Clients subscribe with a point and radius (GET
+# /alerts/stream or the /alerts/ws WebSocket); each subscription is filed
+# under the geohash cells its circle overlaps, so an event only checks the
+# subscribers of the one cell it falls in.
+#
+# With ALERT_STREAM_FANOUT=local the routes deliver their own events, which
+# only reaches clients connected to the same worker. With "changestream"
+# every worker watches the alerts collection (needs a replica set, e.g. a
+# single-node "mongod --replSet rs0") and delivers whatever any worker wrote.
+
+EVENT_REPORTED = "reported"
+EVENT_FOUND = "found"
+
+# Change stream events that add or close a missing alert
+_CHANGE_PIPELINE = [
+    {"$match": {
+        "fullDocument.alert_type": "missing",
+        "$or": [
+            {"operationType": "insert"},
+            {"operationType": "update", "updateDescription.updatedFields.is_active": False},
+        ],
+    }},
+]
+
+
+def _distance_m(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
+    lon1, lat1, lon2, lat2 = map(math.radians, (lon1, lat1, lon2, lat2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _circle_box(lon: float, lat: float, radius_m: float) -> List[float]:
+    """[min_lon, min_lat, max_lon, max_lat] enclosing the circle (clamped, no antimeridian wrap)."""
+    dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+    cos_lat = math.cos(math.radians(lat))
+    dlon = 180.0 if cos_lat < 1e-6 else min(180.0, dlat / cos_lat)
+    return [max(-180.0, lon - dlon), max(-90.0, lat - dlat), min(180.0, lon + dlon), min(90.0, lat + dlat)]
+
+
+class Subscription:
+    """One connected client: its region and a bounded queue of pending events."""
+
+    def __init__(self, lon: float, lat: float, radius_m: float):
+        self.lon = lon
+        self.lat = lat
+        self.radius_m = radius_m
+        self.cells: List[str] = []
+        self.queue: "asyncio.Queue[dict]" = asyncio.Queue(maxsize=settings.ALERT_STREAM_QUEUE_SIZE)
+
+    def covers(self, lon: float, lat: float) -> bool:
+        return _distance_m(self.lon, self.lat, lon, lat) <= self.radius_m
+
+    def offer(self, event: dict):
+        """Queue an event without blocking; a client that stopped reading loses its oldest event."""
+        if self.queue.full():
+            self.queue.get_nowait()
+            ALERT_STREAM_DROPPED.inc()
+        self.queue.put_nowait(event)
+
+
+class AlertStream:
+    """Per-process subscriber index plus the optional change stream watcher."""
+
+    def __init__(self, precision: int):
+        self.precision = precision
+        self._cells: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._count = 0
+        self._watcher: Optional[asyncio.Task] = None
+        self.fanout = "local"
+        self.delivered = 0
+
+    def _file(self, subscription: Subscription):
+        subscription.cells = geohash.covering_cells(
+            *_circle_box(subscription.lon, subscription.lat, subscription.radius_m), self.precision
+        )
+        for cell in subscription.cells:
+            self._cells[cell].add(subscription)
+
+    def _unfile(self, subscription: Subscription):
+        for cell in subscription.cells:
+            members = self._cells.get(cell)
+            if members is not None:
+                members.discard(subscription)
+                if not members:
+                    del self._cells[cell]
+        subscription.cells = []
+
+    def subscribe(self, lon: float, lat: float, radius_m: float) -> Subscription:
+        subscription = Subscription(lon, lat, radius_m)
+        self._file(subscription)
+        self._count += 1
+        ALERT_STREAM_SUBSCRIBERS.inc()
+        return subscription
+
+    def move(self, subscription: Subscription, lon: float, lat: float, radius_m: float):
+        """Change a subscription's region, keeping its queue."""
+        self._unfile(subscription)
+        subscription.lon, subscription.lat, subscription.radius_m = lon, lat, radius_m
+        self._file(subscription)
+
+    def unsubscribe(self, subscription: Subscription):
+        self._unfile(subscription)
+        self._count -= 1
+        ALERT_STREAM_SUBSCRIBERS.dec()
+
+    def deliver(self, event: dict):
+        """Hand an event to every subscriber whose circle contains it."""
+        lon, lat = event["coordinates"]
+        for subscription in list(self._cells.get(geohash.encode(lat, lon, self.precision), ())):
+            if subscription.covers(lon, lat):
+                subscription.offer(event)
+                self.delivered += 1
+
+    def notify(self, alert: dict, event_type: str):
+        """Called by the routes after an alert is reported or closed."""
+        if self.fanout == "changestream":
+            return  # every worker's watcher sees the write
+        if alert.get("alert_type", "missing") != "missing" or not alert.get("location"):
+            return
+        self.deliver({"event": event_type, **alert_marker(alert)})
+
+    async def _watch(self, db):
+        resume_token = None
+        while True:
+            try:
+                async with db.alerts.watch(
+                    _CHANGE_PIPELINE, full_document="updateLookup", resume_after=resume_token
+                ) as stream:
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        alert = change.get("fullDocument")
+                        if not alert or not alert.get("location"):
+                            continue
+                        event_type = EVENT_REPORTED if change["operationType"] == "insert" else EVENT_FOUND
+                        self.deliver({"event": event_type, **alert_marker(alert)})
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Warning: alert change stream failed, reconnecting: {e}")
+                if getattr(e, "code", None) == 286:  # ChangeStreamHistoryLost: the token fell off the oplog
+                    resume_token = None
+                await asyncio.sleep(settings.ALERT_STREAM_RETRY_SECONDS)
+
+    async def start(self, db):
+        if settings.ALERT_STREAM_FANOUT != "changestream":
+            return
+        try:
+            # Change streams need a replica set; check once up front
+            hello = await db.command("hello")
+        except Exception as e:
+            print(f"❌ Alert change stream unavailable ({e}); live alerts stay per-worker")
+            return
+        if "setName" not in hello:
+            print("❌ Alert change streams need a MongoDB replica set; live alerts stay per-worker")
+            return
+        self.fanout = "changestream"
+        self._watcher = asyncio.create_task(self._watch(db))
+        print("✅ Watching alert changes for live subscribers")
+
+    async def stop(self):
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+            self._watcher = None
+        self.fanout = "local"
+
+    def stats(self) -> dict:
+        return {
+            "fanout": self.fanout,
+            "subscribers": self._count,
+            "cells": len(self._cells),
+            "delivered": self.delivered,
+        }
+
+
+alert_stream = AlertStream(settings.ALERT_STREAM_CELL_PRECISION)
@@ -0,0 +1,233 @@
+import math
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from core.config import settings
+
+# Approximate-nearest-neighbour backends for the embedding index.
+#
+# Backends index the concatenation [image_vector, text_vector] of every alert.
+# Because the combined similarity is w_i * (q_i . x_i) + w_t * (q_t . x_t), a
+# query vector of [w_i * q_i, w_t * q_t] turns it into a plain maximum
+# inner-product search, so a single ANN structure serves any weighting.
+# Backends only propose candidate alert ids; the index rescores them exactly.
+
+
+class ANNBackend(ABC):
+    """Base class for candidate generators plugged into EmbeddingIndex."""
+
+    name = "exact"
+
+    @abstractmethod
+    def rebuild(self, alert_ids: List[Any], vectors: np.ndarray):
+        """Replace the whole structure with the given rows."""
+
+    @abstractmethod
+    def add(self, alert_id: Any, vector: np.ndarray):
+        pass
+
+    @abstractmethod
+    def remove(self, alert_id: Any):
+        pass
+
+    def needs_rebuild(self, size: int) -> bool:
+        """Whether the structure has drifted far enough from ``size`` rows to retrain."""
+        return False
+
+    @abstractmethod
+    def candidates(self, query: np.ndarray, k: int, **search_params) -> Optional[List[Any]]:
+        """Alert ids worth scoring exactly, or None to fall back to a full scan."""
+
+    def params(self) -> Dict[str, Any]:
+        return {}
+
+
+def _kmeans(vectors: np.ndarray, n_clusters: int, iterations: int, rng: np.random.Generator) -> np.ndarray:
+    """Spherical k-means: centroids are unit vectors, assignment is by inner product."""
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        for cluster in range(n_clusters):
+            members = vectors[assignment == cluster]
+            if len(members):
+                centroids[cluster] = members.sum(axis=0)
+            else:
+                # Re-seed empty clusters so nlist stays meaningful
+                centroids[cluster] = vectors[rng.integers(len(vectors))]
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids /= norms
+    return centroids.astype(np.float32)
+
+
+class IVFBackend(ANNBackend):
+    """Inverted-file index over k-means cells.
+
+    ``nlist`` cells are trained on the stored vectors (``0`` means roughly
+    ``sqrt(n)``); a query scores every alert in its ``nprobe`` closest cells.
+    Raising ``nprobe`` trades latency for recall.
+    """
+
+    name = "ivf"
+
+    def __init__(self, nlist: int = 0, nprobe: int = 8, train_iterations: int = 10,
+                 train_sample_per_list: int = 64, seed: int = 0):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_iterations = train_iterations
+        self.train_sample_per_list = train_sample_per_list
+        self._rng = np.random.default_rng(seed)
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[set] = []
+        self._assignment: Dict[Any, int] = {}
+        self._trained_size = 0
+
+    def rebuild(self, alert_ids: List[Any], vectors: np.ndarray):
+        self._centroids = None
+        self._lists = []
+        self._assignment = {}
+        self._trained_size = len(alert_ids)
+        if not alert_ids:
+            return
+
+        n_lists = self.nlist or int(math.sqrt(len(alert_ids)))
+        n_lists = max(1, min(n_lists, len(alert_ids)))
+        sample_size = min(len(alert_ids), n_lists * self.train_sample_per_list)
+        sample = vectors[self._rng.choice(len(alert_ids), sample_size, replace=False)]
+        self._centroids = _kmeans(sample, n_lists, self.train_iterations, self._rng)
+        self._lists = [set() for _ in range(n_lists)]
+
+        # Assign in chunks to keep the n x nlist score matrix small
+        for start in range(0, len(alert_ids), 8192):
+            chunk = vectors[start:start + 8192]
+            cells = np.argmax(chunk @ self._centroids.T, axis=1)
+            for alert_id, cell in zip(alert_ids[start:start + 8192], cells):
+                self._lists[cell].add(alert_id)
+                self._assignment[alert_id] = int(cell)
+
+    def add(self, alert_id: Any, vector: np.ndarray):
+        if self._centroids is None:
+            return
+        self.remove(alert_id)
+        cell = int(np.argmax(self._centroids @ vector))
+        self._lists[cell].add(alert_id)
+        self._assignment[alert_id] = cell
+
+    def remove(self, alert_id: Any):
+        cell = self._assignment.pop(alert_id, None)
+        if cell is not None:
+            self._lists[cell].discard(alert_id)
+
+    def needs_rebuild(self, size: int) -> bool:
+        if self._centroids is None:
+            return size > 0
+        return size > 2 * self._trained_size or size < self._trained_size // 2
+
+    def candidates(self, query: np.ndarray, k: int, nprobe: Optional[int] = None, **search_params) -> Optional[List[Any]]:
+        if self._centroids is None:
+            return None
+        nprobe = max(1, min(nprobe or self.nprobe, len(self._lists)))
+        cell_scores = self._centroids @ query
+        if nprobe < len(cell_scores):
+            cells = np.argpartition(-cell_scores, nprobe - 1)[:nprobe]
+        else:
+            cells = range(len(cell_scores))
+        result: List[Any] = []
+        for cell in cells:
+            result.extend(self._lists[cell])
+        return result
+
+    def params(self) -> Dict[str, Any]:
+        return {"nlist": len(self._lists), "nprobe": self.nprobe, "trained_size": self._trained_size}
+
+
+class HNSWBackend(ANNBackend):
+    """Hierarchical navigable small-world graph backed by ``hnswlib``.
+
+    ``m`` and ``ef_construction`` control graph quality at build time;
+    ``ef_search`` is the query-time beam width (higher = better recall, slower).
+    """
+
+    name = "hnsw"
+
+    def __init__(self, dim: int, m: int = 16, ef_construction: int = 200, ef_search: int = 64):
+        self.dim = dim
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self._index = None
+        self._labels: Dict[Any, int] = {}
+        self._ids: Dict[int, Any] = {}
+        self._next_label = 0
+
+    def _create(self, capacity: int):
+        # Lazy import: hnswlib is only needed when this backend is selected
+        import hnswlib
+
+        self._index = hnswlib.Index(space="ip", dim=self.dim)
+        self._index.init_index(
+            max_elements=max(capacity, 1024), ef_construction=self.ef_construction,
+            M=self.m, allow_replace_deleted=True
+        )
+        self._labels = {}
+        self._ids = {}
+        self._next_label = 0
+
+    def rebuild(self, alert_ids: List[Any], vectors: np.ndarray):
+        self._create(len(alert_ids) * 2)
+        if not alert_ids:
+            return
+        labels = np.arange(len(alert_ids))
+        self._index.add_items(vectors, labels)
+        for alert_id, label in zip(alert_ids, labels.tolist()):
+            self._labels[alert_id] = label
+            self._ids[label] = alert_id
+        self._next_label = len(alert_ids)
+
+    def add(self, alert_id: Any, vector: np.ndarray):
+        if self._index is None:
+            self._create(1024)
+        self.remove(alert_id)
+        if self._index.get_current_count() >= self._index.get_max_elements():
+            self._index.resize_index(self._index.get_max_elements() * 2)
+        label = self._next_label
+        self._next_label += 1
+        self._index.add_items(vector.reshape(1, -1), [label], replace_deleted=True)
+        self._labels[alert_id] = label
+        self._ids[label] = alert_id
+
+    def remove(self, alert_id: Any):
+        label = self._labels.pop(alert_id, None)
+        if label is not None:
+            self._index.mark_deleted(label)
+            del self._ids[label]
+
+    def candidates(self, query: np.ndarray, k: int, ef_search: Optional[int] = None, **search_params) -> Optional[List[Any]]:
+        if self._index is None:
+            return None
+        k = min(k, len(self._labels))
+        if k <= 0:
+            return []
+        self._index.set_ef(max(ef_search or self.ef_search, k))
+        labels, _ = self._index.knn_query(query.reshape(1, -1), k=k)
+        return [self._ids[label] for label in labels[0].tolist() if label in self._ids]
+
+    def params(self) -> Dict[str, Any]:
+        return {"m": self.m, "ef_construction": self.ef_construction, "ef_search": self.ef_search}
+
+
+def create_ann_backend(mode: str, dim: int) -> Optional[ANNBackend]:
+    """Build the backend named by ``SIMILARITY_BACKEND``; None means exact search."""
+    mode = (mode or "exact").lower()
+    if mode == "exact":
+        return None
+    if mode == "ivf":
+        return IVFBackend(nlist=settings.IVF_NLIST, nprobe=settings.IVF_NPROBE)
+    if mode == "hnsw":
+        return HNSWBackend(
+            dim, m=settings.HNSW_M, ef_construction=settings.HNSW_EF_CONSTRUCTION,
+            ef_search=settings.HNSW_EF_SEARCH
+        )
+    raise ValueError(f"Unknown similarity backend: {mode}")
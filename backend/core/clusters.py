@@ -0,0 +1,94 @@
+from typing import List, Optional
+
+from pymongo import UpdateOne
+
+from core import geohash
+from core.config import settings
+
+# Precomputed map clusters. Every active missing alert is counted in one
+# geohash cell per precision (1..CLUSTER_MAX_PRECISION); a cell document keeps
+# the alert count, coordinate sums (for the centroid) and per-species counts.
+# Reports increment their cells and marking a pet found decrements them, so a
+# cluster request reads the few cells covering the map instead of the alerts.
+
+ALERT_CLUSTERS_COLLECTION = "alert_clusters"
+
+# Web map zoom level -> geohash precision giving a few dozen cells per screen
+_ZOOM_PRECISION = [(3, 1), (5, 2), (8, 3), (10, 4), (13, 5), (15, 6)]
+
+
+def precision_for_zoom(zoom: int) -> int:
+    for max_zoom, precision in _ZOOM_PRECISION:
+        if zoom <= max_zoom:
+            return min(precision, settings.CLUSTER_MAX_PRECISION)
+    return settings.CLUSTER_MAX_PRECISION
+
+
+def species_key(species: Optional[str]) -> str:
+    # Keys are used in $inc paths; dots would nest and a leading $ is invalid
+    return (species or "unknown").replace(".", " ").lstrip("$") or "unknown"
+
+
+def cluster_updates(alert: dict, delta: int) -> List[UpdateOne]:
+    """Upserts adding ``delta`` (+1 or -1) of ``alert`` to its cell at every precision."""
+    lon, lat = alert["location"]["coordinates"]
+    inc = {
+        "count": delta,
+        "lon_sum": delta * lon,
+        "lat_sum": delta * lat,
+        f"species.{species_key(alert.get('species'))}": delta,
+    }
+    cell = geohash.encode(lat, lon, settings.CLUSTER_MAX_PRECISION)
+    return [
+        UpdateOne({"_id": cell[:precision]}, {"$inc": inc}, upsert=True)
+        for precision in range(1, settings.CLUSTER_MAX_PRECISION + 1)
+    ]
+
+
+async def record_alerts(db, alerts: List[dict], delta: int) -> None:
+    """Apply alerts entering (+1) or leaving (-1) the active missing set.
+
+    Failures are logged, not raised: clusters are a map overview and can be
+    rebuilt with ``python -m db.migrations.rebuild_alert_clusters``.
+    """
+    updates = [
+        update
+        for alert in alerts
+        if alert.get("alert_type", "missing") == "missing" and alert.get("location")
+        for update in cluster_updates(alert, delta)
+    ]
+    if not updates:
+        return
+    try:
+        await db[ALERT_CLUSTERS_COLLECTION].bulk_write(updates, ordered=False)
+    except Exception as e:
+        print(f"Warning: failed to update alert clusters: {e}")
+
+
+async def record_alert(db, alert: dict, delta: int) -> None:
+    await record_alerts(db, [alert], delta)
+
+
+async def fetch_clusters(db, min_lon: float, min_lat: float, max_lon: float, max_lat: float,
+                         zoom: int) -> List[dict]:
+    """Clusters of active missing alerts in the box at the given zoom level."""
+    precision = precision_for_zoom(zoom)
+    # Zoomed-in precision on a huge box would mean thousands of reads; coarsen instead
+    while precision > 1 and geohash.count_cells(min_lon, min_lat, max_lon, max_lat, precision) > settings.CLUSTER_MAX_CELLS:
+        precision -= 1
+    cells = geohash.covering_cells(min_lon, min_lat, max_lon, max_lat, precision)
+
+    documents = await db[ALERT_CLUSTERS_COLLECTION].find(
+        {"_id": {"$in": cells}, "count": {"$gt": 0}}
+    ).to_list(length=len(cells))
+
+    clusters = []
+    for cell in documents:
+        count = cell["count"]
+        clusters.append({
+            "geohash": cell["_id"],
+            "count": count,
+            "coordinates": [cell["lon_sum"] / count, cell["lat_sum"] / count],
+            "species": {name: n for name, n in cell.get("species", {}).items() if n > 0},
+        })
+    return clusters
@@ -16,6 +16,16 @@ class Settings:
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here-change-in-production")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    # Verified token -> user cache used by get_current_user
+    AUTH_CACHE_MAX_ENTRIES: int = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+    AUTH_CACHE_TTL_SECONDS: float = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+    # How often each worker picks up revoked and deactivated users
+    AUTH_REVOCATION_SYNC_SECONDS: float = float(os.getenv("AUTH_REVOCATION_SYNC_SECONDS", "10"))
+    # Password hashing: stored hashes with a different cost are rehashed on login
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    # Hash requests allowed to wait for a worker before new ones get 429
+    PASSWORD_HASH_MAX_QUEUE: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "32"))
     
     # API
     API_V1_STR: str = "/api/v1"
@@ -31,5 +41,85 @@ class Settings:
     # File upload
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
     ALLOWED_IMAGE_TYPES: list = ["image/jpeg", "image/png", "image/gif", "image/webp"]
+    # Bulk intake uploads are stored here, served at /uploads and linked as PUBLIC_BASE_URL/uploads/<name>
+    UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", os.path.join("static", "uploads"))
+    PUBLIC_BASE_URL: str = os.getenv("PUBLIC_BASE_URL", "http://localhost:8000")
+
+    # Bulk intake (POST /reports/bulk)
+    BULK_INTAKE_MAX_RECORDS: int = int(os.getenv("BULK_INTAKE_MAX_RECORDS", "500"))
+    BULK_INTAKE_MAX_FILES: int = int(os.getenv("BULK_INTAKE_MAX_FILES", "500"))
+    BULK_INTAKE_MAX_UPLOAD_BYTES: int = int(os.getenv("BULK_INTAKE_MAX_UPLOAD_BYTES", str(200 * 1024 * 1024)))
+    BULK_INTAKE_DOWNLOAD_CONCURRENCY: int = int(os.getenv("BULK_INTAKE_DOWNLOAD_CONCURRENCY", "16"))
+    BULK_ENCODE_BATCH_SIZE: int = int(os.getenv("BULK_ENCODE_BATCH_SIZE", "64"))  # items per model call
+
+    # Outbound HTTP (photo downloads)
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    HTTP_PER_HOST_CONCURRENCY: int = int(os.getenv("HTTP_PER_HOST_CONCURRENCY", "8"))
+    HTTP_CONNECT_TIMEOUT: float = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+    HTTP_READ_TIMEOUT: float = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+    PHOTO_DOWNLOAD_TIMEOUT: float = float(os.getenv("PHOTO_DOWNLOAD_TIMEOUT", "20"))
+
+    # Metrics: shared sample directory for multi-worker deployments (see core.metrics);
+    # prometheus_client reads the same variable when the metrics are created
+    PROMETHEUS_MULTIPROC_DIR: str = os.getenv("PROMETHEUS_MULTIPROC_DIR", "")
+
+    # Model inference
+    EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "torch")  # torch, onnx or stub (benchmarks only)
+    ONNX_MODEL_DIR: str = os.getenv("ONNX_MODEL_DIR", "onnx_models")
+    ONNX_QUANTIZED: bool = os.getenv("ONNX_QUANTIZED", "false").lower() in ("1", "true", "yes")
+    ONNX_INTRA_OP_THREADS: int = int(os.getenv("ONNX_INTRA_OP_THREADS", "0"))  # 0 = onnxruntime default
+    # thread or process (models loaded per API worker), or sidecar (one shared
+    # process owns the models; see core.inference_sidecar)
+    INFERENCE_EXECUTOR: str = os.getenv("INFERENCE_EXECUTOR", "thread")
+    INFERENCE_SOCKET_PATH: str = os.getenv("INFERENCE_SOCKET_PATH", "/tmp/pet-alert-inference.sock")
+    # Upper bound on one sidecar request (connect, send, encode, reply)
+    INFERENCE_SIDECAR_TIMEOUT: float = float(os.getenv("INFERENCE_SIDECAR_TIMEOUT", "30"))
+    INFERENCE_WORKERS: int = int(os.getenv("INFERENCE_WORKERS", "2"))
+    # Concurrent encode requests are batched up to this size / wait (1 disables batching)
+    EMBEDDING_BATCH_MAX_SIZE: int = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "16"))
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "5"))
+    EMBEDDING_CACHE_MAX_ENTRIES: int = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "10000"))
+    EMBEDDING_CACHE_TTL_SECONDS: int = int(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+    # Map export (GET /alerts/export): documents per Mongo batch / streamed chunk
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+    # Map clusters (GET /alerts/clusters): finest geohash precision kept (7 ~ 150 m cells)
+    # and the most cells one request may read before falling back to coarser cells
+    CLUSTER_MAX_PRECISION: int = int(os.getenv("CLUSTER_MAX_PRECISION", "7"))
+    CLUSTER_MAX_CELLS: int = int(os.getenv("CLUSTER_MAX_CELLS", "256"))
+
+    # Live alerts (GET /alerts/stream, /alerts/ws): "local" delivers within the worker
+    # that handled the write, "changestream" fans out across workers (needs a replica set)
+    ALERT_STREAM_FANOUT: str = os.getenv("ALERT_STREAM_FANOUT", "local")
+    ALERT_STREAM_MAX_RADIUS_M: int = int(os.getenv("ALERT_STREAM_MAX_RADIUS_M", "50000"))
+    ALERT_STREAM_CELL_PRECISION: int = int(os.getenv("ALERT_STREAM_CELL_PRECISION", "4"))  # ~20-40 km cells
+    ALERT_STREAM_QUEUE_SIZE: int = int(os.getenv("ALERT_STREAM_QUEUE_SIZE", "100"))
+    ALERT_STREAM_KEEPALIVE_SECONDS: float = float(os.getenv("ALERT_STREAM_KEEPALIVE_SECONDS", "15"))
+    ALERT_STREAM_RETRY_SECONDS: float = float(os.getenv("ALERT_STREAM_RETRY_SECONDS", "5"))
+
+    # Found/sighting matching: missing reports are matched against found/sighting
+    # reports from the last MATCH_WINDOW_DAYS; candidates are stored in alert_matches
+    MATCH_WINDOW_DAYS: int = int(os.getenv("MATCH_WINDOW_DAYS", "30"))
+    MATCH_SIMILARITY_THRESHOLD: float = float(os.getenv("MATCH_SIMILARITY_THRESHOLD", "0.7"))
+    MATCH_LIMIT: int = int(os.getenv("MATCH_LIMIT", "10"))
+
+    # Report processing: "inline" matches before responding, "background" queues a job
+    REPORT_PROCESSING_MODE: str = os.getenv("REPORT_PROCESSING_MODE", "inline")
+    REPORT_JOB_WORKERS: int = int(os.getenv("REPORT_JOB_WORKERS", "2"))
+    REPORT_JOB_POLL_SECONDS: float = float(os.getenv("REPORT_JOB_POLL_SECONDS", "2"))
+    REPORT_JOB_LEASE_SECONDS: int = int(os.getenv("REPORT_JOB_LEASE_SECONDS", "120"))
+    REPORT_JOB_MAX_ATTEMPTS: int = int(os.getenv("REPORT_JOB_MAX_ATTEMPTS", "3"))
+    REPORT_JOB_RETRY_BACKOFF_SECONDS: float = float(os.getenv("REPORT_JOB_RETRY_BACKOFF_SECONDS", "10"))
+
+    # Similarity search
+    EMBEDDING_STORAGE_FORMAT: str = os.getenv("EMBEDDING_STORAGE_FORMAT", "float16")  # float16, int8 or list
+    EMBEDDING_INDEX_SYNC_SECONDS: float = float(os.getenv("EMBEDDING_INDEX_SYNC_SECONDS", "30"))
+    SIMILARITY_BACKEND: str = os.getenv("SIMILARITY_BACKEND", "exact")  # exact, ivf or hnsw
+    IVF_NLIST: int = int(os.getenv("IVF_NLIST", "0"))  # 0 = sqrt(number of alerts)
+    IVF_NPROBE: int = int(os.getenv("IVF_NPROBE", "8"))
+    HNSW_M: int = int(os.getenv("HNSW_M", "16"))
+    HNSW_EF_CONSTRUCTION: int = int(os.getenv("HNSW_EF_CONSTRUCTION", "200"))
+    HNSW_EF_SEARCH: int = int(os.getenv("HNSW_EF_SEARCH", "64"))
 
 settings = Settings()
@@ -1,10 +1,28 @@
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
 from io import BytesIO
+import asyncio
+import hashlib
+import time
 
+import numpy as np
+from bson.binary import Binary
 from PIL import Image
+from pymongo import ReplaceOne
+
+from core.config import settings
+from core.http_client import download_image
+from core.metrics import IMAGE_DECODE_SECONDS, MODEL_ENCODE_BATCH_SIZE, MODEL_ENCODE_SECONDS
+from db.database import get_database
+
+IMAGE_MODEL_NAME = "clip-ViT-B-32"
+TEXT_MODEL_NAME = "all-MiniLM-L6-v2"
 
 _image_model = None
 _text_model = None
+_onnx_encoders = None
 
 
 def _load_image_model():
@@ -14,7 +32,7 @@ def _load_image_model():
         from sentence_transformers import SentenceTransformer
 
         # CLIP image-text model; supports image embeddings via PIL Images
-        _image_model = SentenceTransformer("clip-ViT-B-32")
+        _image_model = SentenceTransformer(IMAGE_MODEL_NAME)
     return _image_model
 
 
@@ -25,27 +43,617 @@ def _load_text_model():
         from sentence_transformers import SentenceTransformer
 
         # Text model optimized for semantic similarity
-        _text_model = SentenceTransformer("all-MiniLM-L6-v2")
+        _text_model = SentenceTransformer(TEXT_MODEL_NAME)
     return _text_model
 
 
-def image_bytes_to_embedding(image_bytes: bytes) -> List[float]:
-    """Convert raw image bytes into a CLIP embedding (list[float])."""
-    model = _load_image_model()
+def _load_onnx_encoders():
+    global _onnx_encoders
+    if _onnx_encoders is None:
+        # Lazy import: onnxruntime/transformers are only needed for this backend
+        from core.onnx_backend import OnnxEncoders
+
+        _onnx_encoders = OnnxEncoders(
+            settings.ONNX_MODEL_DIR, settings.ONNX_QUANTIZED, settings.ONNX_INTRA_OP_THREADS
+        )
+    return _onnx_encoders
+
+
+def _model_tag(model_name: str) -> str:
+    """Model identity used in cache keys; differs per inference backend."""
+    if settings.EMBEDDING_BACKEND == "onnx":
+        return f"{model_name}:onnx{'-int8' if settings.ONNX_QUANTIZED else ''}"
+    if settings.EMBEDDING_BACKEND == "stub":
+        return f"{model_name}:stub"
+    return model_name
 
-    img = Image.open(BytesIO(image_bytes)).convert("RGB")
 
+def _stub_embeddings(payloads: List[bytes], dim: int) -> np.ndarray:
+    """Deterministic unit vectors seeded by content, for offline benchmarks.
+
+    Selected with ``EMBEDDING_BACKEND=stub``; identical inputs map to
+    identical vectors, but the vectors carry no meaning.
+    """
+    rows = []
+    for payload in payloads:
+        seed = int.from_bytes(hashlib.sha256(payload).digest()[:8], "little")
+        rows.append(np.random.default_rng(seed).standard_normal(dim).astype(np.float32))
+    embeddings = np.stack(rows)
+    return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+
+def _run_image_encoder(images: list) -> np.ndarray:
+    if settings.EMBEDDING_BACKEND == "onnx":
+        return _load_onnx_encoders().encode_images(images)
+    if settings.EMBEDDING_BACKEND == "stub":
+        return _stub_embeddings([image.tobytes() for image in images], 512)
     # sentence-transformers encode handles list of PIL images
-    emb = model.encode([img], convert_to_numpy=True, normalize_embeddings=True)[0]
+    return _load_image_model().encode(
+        images, batch_size=len(images), convert_to_numpy=True, normalize_embeddings=True
+    )
+
+
+def _run_text_encoder(texts: List[str]) -> np.ndarray:
+    if settings.EMBEDDING_BACKEND == "onnx":
+        return _load_onnx_encoders().encode_texts(texts)
+    if settings.EMBEDDING_BACKEND == "stub":
+        return _stub_embeddings([text.encode() for text in texts], 384)
+    return _load_text_model().encode(
+        texts, batch_size=len(texts), convert_to_numpy=True, normalize_embeddings=True
+    )
+
+
+def _encode_images(images: list) -> np.ndarray:
+    """Normalized CLIP embeddings for RGB PIL images, using the configured backend."""
+    started = time.perf_counter()
+    embeddings = _run_image_encoder(images)
+    MODEL_ENCODE_SECONDS.labels("image", settings.EMBEDDING_BACKEND).observe(time.perf_counter() - started)
+    MODEL_ENCODE_BATCH_SIZE.labels("image").observe(len(images))
+    return embeddings
+
+
+def _encode_texts(texts: List[str]) -> np.ndarray:
+    """Normalized sentence embeddings for texts, using the configured backend."""
+    started = time.perf_counter()
+    embeddings = _run_text_encoder(texts)
+    MODEL_ENCODE_SECONDS.labels("text", settings.EMBEDDING_BACKEND).observe(time.perf_counter() - started)
+    MODEL_ENCODE_BATCH_SIZE.labels("text").observe(len(texts))
+    return embeddings
+
+
+def _decode_image(image_bytes: bytes) -> Image.Image:
+    started = time.perf_counter()
+    image = Image.open(BytesIO(image_bytes)).convert("RGB")
+    IMAGE_DECODE_SECONDS.observe(time.perf_counter() - started)
+    return image
+
+
+def image_bytes_to_embedding(image_bytes: bytes) -> List[float]:
+    """Convert raw image bytes into a CLIP embedding (list[float])."""
+    img = _decode_image(image_bytes)
+    emb = _encode_images([img])[0]
     return emb.astype(float).tolist()
 
 
 def text_to_embedding(text: str) -> List[float]:
     """Convert text into a sentence transformer embedding (list[float])."""
-    model = _load_text_model()
-    
-    # Encode text and normalize
-    emb = model.encode([text], convert_to_numpy=True, normalize_embeddings=True)[0]
+    emb = _encode_texts([text])[0]
     return emb.astype(float).tolist()
 
 
+def image_batch_to_embeddings(images: List[bytes]) -> List[Union[List[float], Exception]]:
+    """Encode many images with one model call.
+
+    Images that fail to decode get their exception in place of an embedding,
+    so one bad upload does not fail the rest of the batch.
+    """
+    results: List[Union[List[float], Exception]] = []
+    decoded = []
+    for image_bytes in images:
+        try:
+            decoded.append(_decode_image(image_bytes))
+            results.append(None)
+        except Exception as e:
+            results.append(e)
+
+    if decoded:
+        embs = iter(_encode_images(decoded))
+        results = [r if isinstance(r, Exception) else next(embs).astype(float).tolist() for r in results]
+    return results
+
+
+def text_batch_to_embeddings(texts: List[str]) -> List[List[float]]:
+    """Encode many texts with one model call."""
+    return [emb.astype(float).tolist() for emb in _encode_texts(texts)]
+
+
+class InferenceExecutor:
+    """Bounded worker pool that keeps model inference off the event loop.
+
+    At most ``max_workers`` encodes run at once; further callers wait their
+    turn, and that wait is recorded so queueing is visible in ``stats()``.
+    With ``kind="sidecar"`` the encodes run in the shared inference sidecar
+    process (see ``core.inference_sidecar``) and no model is loaded here.
+    """
+
+    def __init__(self, max_workers: int, kind: str = "thread"):
+        if kind not in ("thread", "process", "sidecar"):
+            raise ValueError(f"Unknown inference executor kind: {kind}")
+        self.max_workers = max_workers
+        self.kind = kind
+        self._pool: Optional[Executor] = None
+        self._sidecar = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        return self._pool
+
+    def _get_sidecar(self):
+        if self._sidecar is None:
+            # Lazy import: the sidecar module imports this one to serve requests
+            from core.inference_sidecar import SidecarClient
+
+            self._sidecar = SidecarClient(settings.INFERENCE_SOCKET_PATH)
+        return self._sidecar
+
+    async def run(self, fn: Callable, *args):
+        """Run ``fn(*args)`` in the pool once a worker slot is free."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+
+        enqueued = time.perf_counter()
+        self._queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._queued -= 1
+
+        try:
+            waited = time.perf_counter() - enqueued
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+            self._running += 1
+            if self.kind == "sidecar":
+                return await self._get_sidecar().call(fn, *args)
+            return await asyncio.get_running_loop().run_in_executor(self._get_pool(), fn, *args)
+        finally:
+            self._running -= 1
+            self._completed += 1
+            self._slots.release()
+
+    def stats(self) -> dict:
+        stats = {
+            "kind": self.kind,
+            "workers": self.max_workers,
+            "queued": self._queued,
+            "running": self._running,
+            "completed": self._completed,
+            "avg_wait_ms": 1000 * self._total_wait / self._completed if self._completed else 0.0,
+            "max_wait_ms": 1000 * self._max_wait,
+        }
+        if self._sidecar is not None:
+            stats["sidecar"] = self._sidecar.stats()
+        return stats
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._sidecar is not None:
+            self._sidecar.close()
+            self._sidecar = None
+
+
+class MicroBatcher:
+    """Coalesce concurrent encode requests into one batched model call.
+
+    A batch is flushed when it reaches ``max_batch_size`` or ``max_wait_ms``
+    after its first item arrived, whichever comes first. Each caller's
+    future resolves with its own row of the result.
+    """
+
+    def __init__(self, encode_batch: Callable[[List[Any]], List[Any]], executor: InferenceExecutor,
+                 max_batch_size: int, max_wait_ms: float):
+        self.encode_batch = encode_batch
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        self._batches = 0
+        self._items = 0
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]):
+        self._batches += 1
+        self._items += len(batch)
+        try:
+            results = await self.executor.run(self.encode_batch, [item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if future.done():  # caller went away
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self._batches,
+            "items": self._items,
+            "avg_batch_size": self._items / self._batches if self._batches else 0.0,
+            "pending": len(self._pending),
+        }
+
+
+inference_executor = InferenceExecutor(settings.INFERENCE_WORKERS, settings.INFERENCE_EXECUTOR)
+
+_image_batcher = MicroBatcher(
+    image_batch_to_embeddings, inference_executor,
+    settings.EMBEDDING_BATCH_MAX_SIZE, settings.EMBEDDING_BATCH_MAX_WAIT_MS
+)
+_text_batcher = MicroBatcher(
+    text_batch_to_embeddings, inference_executor,
+    settings.EMBEDDING_BATCH_MAX_SIZE, settings.EMBEDDING_BATCH_MAX_WAIT_MS
+)
+
+
+async def _encode_image(image_bytes: bytes) -> List[float]:
+    if settings.EMBEDDING_BATCH_MAX_SIZE > 1:
+        return await _image_batcher.submit(image_bytes)
+    return await inference_executor.run(image_bytes_to_embedding, image_bytes)
+
+
+async def _encode_text(text: str) -> List[float]:
+    if settings.EMBEDDING_BATCH_MAX_SIZE > 1:
+        return await _text_batcher.submit(text)
+    return await inference_executor.run(text_to_embedding, text)
+
+
+# Packed storage formats. Vectors are stored as BSON Binary with a
+# user-defined subtype naming the layout, instead of arrays of doubles.
+FLOAT16_SUBTYPE = 0x80  # little-endian float16 values
+INT8_SUBTYPE = 0x81     # little-endian float32 scale, then int8 values
+
+StoredEmbedding = Union[Binary, List[float]]
+
+
+def pack_embedding(embedding: Optional[Sequence[float]], storage_format: str = "float16") -> Optional[StoredEmbedding]:
+    """Encode an embedding for storage: ``float16``, ``int8`` (scale-quantized) or ``list`` (legacy doubles)."""
+    if embedding is None:
+        return None
+    if storage_format == "list":
+        return np.asarray(embedding, dtype=float).tolist()
+
+    values = np.asarray(embedding, dtype=np.float32)
+    if storage_format == "float16":
+        return Binary(values.astype("<f2").tobytes(), FLOAT16_SUBTYPE)
+    if storage_format == "int8":
+        peak = float(np.max(np.abs(values))) if values.size else 0.0
+        scale = peak / 127.0 if peak > 0 else 1.0
+        quantized = np.clip(np.rint(values / scale), -127, 127).astype(np.int8)
+        return Binary(np.float32(scale).astype("<f4").tobytes() + quantized.tobytes(), INT8_SUBTYPE)
+    raise ValueError(f"Unknown embedding storage format: {storage_format}")
+
+
+def unpack_embedding(stored: Optional[StoredEmbedding]) -> Optional[np.ndarray]:
+    """Decode a stored embedding (packed Binary or legacy list) into a float32 array."""
+    if stored is None:
+        return None
+    if isinstance(stored, Binary):
+        if stored.subtype == FLOAT16_SUBTYPE:
+            return np.frombuffer(stored, dtype="<f2").astype(np.float32)
+        if stored.subtype == INT8_SUBTYPE:
+            scale = np.frombuffer(stored, dtype="<f4", count=1)[0]
+            return np.frombuffer(stored, dtype=np.int8, offset=4).astype(np.float32) * scale
+        raise ValueError(f"Unknown embedding binary subtype: {stored.subtype}")
+    return np.asarray(stored, dtype=np.float32)
+
+
+EMBEDDING_CACHE_COLLECTION = "embedding_cache"
+
+
+class EmbeddingCache:
+    """Two-tier embedding cache: an in-process LRU in front of a Mongo collection.
+
+    Keys include the model name, so switching models never serves stale
+    vectors. The Mongo tier expires entries through a TTL index on
+    ``created_at`` (see ``create_indexes``) and is skipped when no database
+    is connected.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.memory_hits = 0
+        self.store_hits = 0
+        self.misses = 0
+
+    def _collection(self):
+        db = get_database()
+        return db[EMBEDDING_CACHE_COLLECTION] if db is not None else None
+
+    def _remember(self, key: str, embedding: np.ndarray):
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[List[float]]:
+        embedding = self._entries.get(key)
+        if embedding is not None:
+            self._entries.move_to_end(key)
+            self.memory_hits += 1
+            return embedding.tolist()
+
+        collection = self._collection()
+        if collection is not None:
+            try:
+                doc = await collection.find_one({"_id": key}, {"embedding": 1})
+            except Exception as e:
+                print(f"Warning: embedding cache lookup failed: {e}")
+                doc = None
+            if doc is not None and doc.get("embedding") is not None:
+                embedding = unpack_embedding(doc["embedding"])
+                self._remember(key, embedding)
+                self.store_hits += 1
+                return embedding.tolist()
+
+        self.misses += 1
+        return None
+
+    async def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Cached embeddings for the keys that have one, in one store round-trip."""
+        found: Dict[str, List[float]] = {}
+        remaining = []
+        for key in dict.fromkeys(keys):
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                found[key] = embedding.tolist()
+            else:
+                remaining.append(key)
+
+        store_hits = 0
+        collection = self._collection()
+        if remaining and collection is not None:
+            try:
+                docs = await collection.find({"_id": {"$in": remaining}}, {"embedding": 1}).to_list(length=None)
+            except Exception as e:
+                print(f"Warning: embedding cache lookup failed: {e}")
+                docs = []
+            for doc in docs:
+                if doc.get("embedding") is not None:
+                    embedding = unpack_embedding(doc["embedding"])
+                    self._remember(doc["_id"], embedding)
+                    found[doc["_id"]] = embedding.tolist()
+                    store_hits += 1
+
+        self.store_hits += store_hits
+        self.misses += len(remaining) - store_hits
+        return found
+
+    async def put_many(self, model_name: str, embeddings: Dict[str, List[float]]):
+        """Store several embeddings with one bulk write."""
+        if not embeddings:
+            return
+        for key, embedding in embeddings.items():
+            self._remember(key, np.asarray(embedding, dtype=np.float32))
+        collection = self._collection()
+        if collection is None:
+            return
+        now = datetime.now()
+        try:
+            await collection.bulk_write([
+                ReplaceOne({"_id": key}, {
+                    "_id": key,
+                    "model": model_name,
+                    "embedding": pack_embedding(embedding, settings.EMBEDDING_STORAGE_FORMAT),
+                    "created_at": now,
+                }, upsert=True)
+                for key, embedding in embeddings.items()
+            ], ordered=False)
+        except Exception as e:
+            print(f"Warning: embedding cache write failed: {e}")
+
+    async def put(self, key: str, model_name: str, embedding: List[float]):
+        self._remember(key, np.asarray(embedding, dtype=np.float32))
+        collection = self._collection()
+        if collection is None:
+            return
+        try:
+            await collection.replace_one(
+                {"_id": key},
+                {
+                    "_id": key,
+                    "model": model_name,
+                    "embedding": pack_embedding(embedding, settings.EMBEDDING_STORAGE_FORMAT),
+                    "created_at": datetime.now(),
+                },
+                upsert=True,
+            )
+        except Exception as e:
+            print(f"Warning: embedding cache write failed: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.store_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "memory_hits": self.memory_hits,
+            "store_hits": self.store_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.store_hits) / lookups if lookups else 0.0,
+        }
+
+
+embedding_cache = EmbeddingCache(settings.EMBEDDING_CACHE_MAX_ENTRIES)
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace and case; the MiniLM text model is uncased."""
+    return " ".join(text.split()).lower()
+
+
+def _image_key(image_bytes: bytes) -> str:
+    return f"image:{_model_tag(IMAGE_MODEL_NAME)}:sha256:{hashlib.sha256(image_bytes).hexdigest()}"
+
+
+def _image_url_key(url: str) -> str:
+    return f"image:{_model_tag(IMAGE_MODEL_NAME)}:url:{url}"
+
+
+def _text_key(normalized_text: str) -> str:
+    return f"text:{_model_tag(TEXT_MODEL_NAME)}:sha256:{hashlib.sha256(normalized_text.encode()).hexdigest()}"
+
+
+async def embed_image(image_bytes: bytes) -> List[float]:
+    """Async CLIP embedding of raw image bytes, cached by content hash."""
+    key = _image_key(image_bytes)
+    embedding = await embedding_cache.get(key)
+    if embedding is None:
+        embedding = await _encode_image(image_bytes)
+        await embedding_cache.put(key, _model_tag(IMAGE_MODEL_NAME), embedding)
+    return embedding
+
+
+async def embed_image_url(url: str) -> List[float]:
+    """Async CLIP embedding of the photo at url, cached by URL and by content hash."""
+    url_key = _image_url_key(url)
+    embedding = await embedding_cache.get(url_key)
+    if embedding is None:
+        embedding = await embed_image(await download_image(url))
+        await embedding_cache.put(url_key, _model_tag(IMAGE_MODEL_NAME), embedding)
+    return embedding
+
+
+async def embed_text(text: str) -> List[float]:
+    """Async sentence embedding of text, cached by its normalized form."""
+    normalized = normalize_text(text)
+    key = _text_key(normalized)
+    embedding = await embedding_cache.get(key)
+    if embedding is None:
+        embedding = await _encode_text(normalized)
+        await embedding_cache.put(key, _model_tag(TEXT_MODEL_NAME), embedding)
+    return embedding
+
+
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+async def embed_images(images: List[bytes]) -> List[Union[List[float], Exception]]:
+    """Embeddings for many images, encoding cache misses BULK_ENCODE_BATCH_SIZE per model call.
+
+    Bypasses the micro-batcher, which is tuned for small concurrent requests.
+    Images that cannot be decoded get their exception in place of an embedding.
+    """
+    keys = [_image_key(image_bytes) for image_bytes in images]
+    found: Dict[str, Union[List[float], Exception]] = dict(await embedding_cache.get_many(keys))
+    pending = list({key: image_bytes for key, image_bytes in zip(keys, images) if key not in found}.items())
+
+    for chunk in _chunks(pending, settings.BULK_ENCODE_BATCH_SIZE):
+        results = await inference_executor.run(image_batch_to_embeddings, [image_bytes for _, image_bytes in chunk])
+        encoded = {key: result for (key, _), result in zip(chunk, results)}
+        found.update(encoded)
+        await embedding_cache.put_many(_model_tag(IMAGE_MODEL_NAME), {
+            key: result for key, result in encoded.items() if not isinstance(result, Exception)
+        })
+    return [found[key] for key in keys]
+
+
+async def embed_image_urls(urls: List[str], concurrency: int) -> List[Union[List[float], Exception]]:
+    """Embeddings for many photo URLs: cached URLs are skipped, the rest downloaded
+    at most ``concurrency`` at a time and encoded through ``embed_images``."""
+    url_keys = [_image_url_key(url) for url in urls]
+    cached = await embedding_cache.get_many(url_keys)
+    missing = list(dict.fromkeys(url for url, key in zip(urls, url_keys) if key not in cached))
+
+    slots = asyncio.Semaphore(concurrency)
+
+    async def fetch(url: str) -> Union[bytes, Exception]:
+        async with slots:
+            try:
+                return await download_image(url)
+            except Exception as e:
+                return e
+
+    downloads = dict(zip(missing, await asyncio.gather(*(fetch(url) for url in missing))))
+    fetched = [url for url in missing if not isinstance(downloads[url], Exception)]
+    embeddings = dict(zip(fetched, await embed_images([downloads[url] for url in fetched])))
+    await embedding_cache.put_many(_model_tag(IMAGE_MODEL_NAME), {
+        _image_url_key(url): embedding for url, embedding in embeddings.items()
+        if not isinstance(embedding, Exception)
+    })
+
+    results: List[Union[List[float], Exception]] = []
+    for url, key in zip(urls, url_keys):
+        if key in cached:
+            results.append(cached[key])
+        elif url in embeddings:
+            results.append(embeddings[url])
+        else:
+            results.append(downloads[url])
+    return results
+
+
+async def embed_texts(texts: List[str]) -> List[List[float]]:
+    """Embeddings for many texts, encoding cache misses BULK_ENCODE_BATCH_SIZE per model call."""
+    normalized = [normalize_text(text) for text in texts]
+    keys = [_text_key(text) for text in normalized]
+    found = await embedding_cache.get_many(keys)
+    pending = list({key: text for key, text in zip(keys, normalized) if key not in found}.items())
+
+    for chunk in _chunks(pending, settings.BULK_ENCODE_BATCH_SIZE):
+        results = await inference_executor.run(text_batch_to_embeddings, [text for _, text in chunk])
+        encoded = {key: result for (key, _), result in zip(chunk, results)}
+        found.update(encoded)
+        await embedding_cache.put_many(_model_tag(TEXT_MODEL_NAME), encoded)
+    return [found[key] for key in keys]
+
+
+def inference_stats() -> dict:
+    return {
+        **inference_executor.stats(),
+        "image_batches": _image_batcher.stats(),
+        "text_batches": _text_batcher.stats(),
+        "cache": embedding_cache.stats(),
+    }
@@ -0,0 +1,63 @@
+import math
+from typing import List, Tuple
+
+# Minimal geohash helpers for the map cluster aggregates.
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def encode(lat: float, lon: float, precision: int) -> str:
+    """Geohash of a point with ``precision`` characters."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True  # bits alternate lon, lat, lon, ...
+    while len(chars) < precision:
+        rng, coord = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        value <<= 1
+        if coord >= mid:
+            value |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """(width in degrees of longitude, height in degrees of latitude) of a cell."""
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 360.0 / (1 << lon_bits), 180.0 / (1 << lat_bits)
+
+
+def count_cells(min_lon: float, min_lat: float, max_lon: float, max_lat: float, precision: int) -> int:
+    width, height = cell_size(precision)
+    columns = math.floor((max_lon + 180) / width) - math.floor((min_lon + 180) / width) + 1
+    rows = math.floor((max_lat + 90) / height) - math.floor((min_lat + 90) / height) + 1
+    return columns * rows
+
+
+def covering_cells(min_lon: float, min_lat: float, max_lon: float, max_lat: float, precision: int) -> List[str]:
+    """Geohashes of every cell intersecting the bounding box."""
+    width, height = cell_size(precision)
+    first_column = math.floor((min_lon + 180) / width)
+    last_column = math.floor((max_lon + 180) / width)
+    first_row = math.floor((min_lat + 90) / height)
+    last_row = math.floor((max_lat + 90) / height)
+    cells = []
+    for row in range(first_row, last_row + 1):
+        lat = min(-90 + (row + 0.5) * height, 90.0)
+        for column in range(first_column, last_column + 1):
+            lon = min(-180 + (column + 0.5) * width, 180.0)
+            cells.append(encode(lat, lon, precision))
+    return cells
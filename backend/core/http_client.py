@@ -0,0 +1,125 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+import httpx
+
+from core.config import settings
+from core.metrics import PHOTO_DOWNLOAD_SECONDS
+
+_client: Optional[httpx.AsyncClient] = None
+_host_slots: Dict[str, asyncio.Semaphore] = {}
+_host_users: Dict[str, int] = {}
+
+
+class PhotoDownloadError(Exception):
+    """Raised when a photo URL cannot be fetched or is not an acceptable image."""
+
+
+def _create_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(settings.HTTP_READ_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        ),
+        follow_redirects=True,
+    )
+
+
+async def start_http_client():
+    """Create the app-lifetime HTTP client"""
+    global _client
+    if _client is None:
+        _client = _create_client()
+
+
+async def close_http_client():
+    """Close the app-lifetime HTTP client"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client, creating it if the app lifespan has not"""
+    global _client
+    if _client is None:
+        _client = _create_client()
+    return _client
+
+
+@asynccontextmanager
+async def _host_slot(host: str):
+    """Cap concurrent downloads per host so one slow host cannot take every connection."""
+    slot = _host_slots.get(host)
+    if slot is None:
+        slot = _host_slots[host] = asyncio.Semaphore(settings.HTTP_PER_HOST_CONCURRENCY)
+    _host_users[host] = _host_users.get(host, 0) + 1
+    try:
+        async with slot:
+            yield
+    finally:
+        _host_users[host] -= 1
+        if _host_users[host] == 0:
+            del _host_users[host]
+            del _host_slots[host]
+
+
+async def _stream_image(url: str) -> bytes:
+    client = get_http_client()
+    async with client.stream("GET", url) as response:
+        response.raise_for_status()
+
+        content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+        if content_type not in settings.ALLOWED_IMAGE_TYPES:
+            raise PhotoDownloadError(f"Unsupported content type: {content_type or 'unknown'}")
+
+        declared = response.headers.get("content-length")
+        if declared is not None and declared.isdigit() and int(declared) > settings.MAX_FILE_SIZE:
+            raise PhotoDownloadError(f"Image larger than {settings.MAX_FILE_SIZE} bytes")
+
+        chunks = []
+        received = 0
+        async for chunk in response.aiter_bytes():
+            received += len(chunk)
+            if received > settings.MAX_FILE_SIZE:
+                raise PhotoDownloadError(f"Image larger than {settings.MAX_FILE_SIZE} bytes")
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+
+async def _download_with_slot(host: str, url: str) -> bytes:
+    async with _host_slot(host):
+        return await _stream_image(url)
+
+
+async def download_image(url: str) -> bytes:
+    """Download a photo through the shared client.
+
+    The body is streamed and the download aborted as soon as it exceeds
+    MAX_FILE_SIZE or turns out not to be one of ALLOWED_IMAGE_TYPES. Waiting
+    for a per-host slot plus the whole transfer is bounded by
+    PHOTO_DOWNLOAD_TIMEOUT so slow or busy hosts cannot hold a worker.
+    """
+    try:
+        host = httpx.URL(url).host
+    except Exception as e:
+        raise PhotoDownloadError(f"Invalid photo URL: {e}")
+    if not host:
+        raise PhotoDownloadError("Invalid photo URL: missing host")
+
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        try:
+            image_bytes = await asyncio.wait_for(_download_with_slot(host, url), settings.PHOTO_DOWNLOAD_TIMEOUT)
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            raise PhotoDownloadError(f"Timed out downloading image after {settings.PHOTO_DOWNLOAD_TIMEOUT}s")
+        outcome = "ok"
+        return image_bytes
+    finally:
+        PHOTO_DOWNLOAD_SECONDS.labels(outcome).observe(time.perf_counter() - started)
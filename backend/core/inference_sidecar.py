@@ -0,0 +1,224 @@
+"""Inference sidecar: one process owns the embedding models for every API worker.
+
+With ``INFERENCE_EXECUTOR=sidecar`` the API workers do not load any model;
+``inference_executor.run`` sends the encode call over a Unix socket to this
+process instead. Start it next to the workers, with the same environment
+(EMBEDDING_BACKEND, ONNX_* and INFERENCE_SOCKET_PATH), from backend/:
+
+    python -m core.inference_sidecar
+    INFERENCE_EXECUTOR=sidecar uvicorn main:app --workers 4
+
+Messages are length-prefixed: a JSON header followed by raw bytes (image
+bodies in requests, float32 rows in responses), so no pickling crosses the
+socket.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import struct
+from io import BytesIO
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import orjson
+from PIL import Image
+
+from core.config import settings
+
+_LENGTHS = struct.Struct(">II")  # header bytes, payload bytes
+
+
+class SidecarError(RuntimeError):
+    """Raised when the sidecar cannot be reached or rejects a request."""
+
+
+async def _write_message(writer: asyncio.StreamWriter, header: dict, payload: bytes = b""):
+    header_bytes = orjson.dumps(header)
+    writer.write(_LENGTHS.pack(len(header_bytes), len(payload)) + header_bytes + payload)
+    await writer.drain()
+
+
+async def _read_message(reader: asyncio.StreamReader) -> Tuple[dict, bytes]:
+    header_size, payload_size = _LENGTHS.unpack(await reader.readexactly(_LENGTHS.size))
+    header = orjson.loads(await reader.readexactly(header_size))
+    payload = await reader.readexactly(payload_size) if payload_size else b""
+    return header, payload
+
+
+def _encode_request(fn: Callable, args: tuple) -> Tuple[dict, bytes, bool]:
+    """(header, payload, single) for one of the embeddings module's encode functions."""
+    name = fn.__name__
+    if name in ("image_batch_to_embeddings", "image_bytes_to_embedding"):
+        single = name == "image_bytes_to_embedding"
+        images: List[bytes] = [args[0]] if single else list(args[0])
+        return {"op": "images", "sizes": [len(image) for image in images]}, b"".join(images), single
+    if name in ("text_batch_to_embeddings", "text_to_embedding"):
+        single = name == "text_to_embedding"
+        return {"op": "texts", "texts": [args[0]] if single else list(args[0])}, b"", single
+    raise ValueError(f"{name} cannot run in the inference sidecar")
+
+
+class SidecarClient:
+    """Pool of Unix socket connections to the sidecar, one request in flight per connection."""
+
+    def __init__(self, socket_path: str):
+        self.socket_path = socket_path
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self.requests = 0
+        self.reconnects = 0
+
+    async def _connect(self):
+        try:
+            return await asyncio.open_unix_connection(self.socket_path)
+        except OSError as e:
+            raise SidecarError(f"Inference sidecar unavailable at {self.socket_path}: {e}")
+
+    async def _request(self, connection, header: dict, payload: bytes) -> Tuple[dict, bytes]:
+        reader, writer = connection
+        try:
+            await _write_message(writer, header, payload)
+            return await _read_message(reader)
+        except BaseException:
+            # Failed, timed out or cancelled mid-request: the response would arrive out of step
+            writer.close()
+            raise
+
+    async def _exchange(self, header: dict, payload: bytes) -> Tuple[dict, bytes]:
+        connection = self._idle.pop() if self._idle else await self._connect()
+        try:
+            response, body = await self._request(connection, header, payload)
+        except (OSError, asyncio.IncompleteReadError) as e:
+            # Sidecar restarted since this connection was opened; retry once on a fresh one
+            self.reconnects += 1
+            connection = await self._connect()
+            try:
+                response, body = await self._request(connection, header, payload)
+            except (OSError, asyncio.IncompleteReadError) as retry_error:
+                raise SidecarError(f"Inference sidecar request failed: {retry_error}") from e
+        self._idle.append(connection)
+        return response, body
+
+    async def call(self, fn: Callable, *args) -> Any:
+        """Run an encode function in the sidecar; results match calling it locally."""
+        header, payload, single = _encode_request(fn, args)
+        try:
+            response, body = await asyncio.wait_for(self._exchange(header, payload), settings.INFERENCE_SIDECAR_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise SidecarError(f"Inference sidecar did not answer within {settings.INFERENCE_SIDECAR_TIMEOUT}s")
+        self.requests += 1
+
+        if "error" in response:
+            raise SidecarError(response["error"])
+        rows = np.frombuffer(body, dtype=np.float32).reshape(-1, response["dim"]) if body else []
+        errors: Dict[str, str] = response.get("errors", {})
+        results: List[Any] = []
+        row = 0
+        for i in range(response["count"]):
+            if str(i) in errors:
+                results.append(ValueError(errors[str(i)]))
+            else:
+                results.append(rows[row].astype(float).tolist())
+                row += 1
+        if single:
+            if isinstance(results[0], Exception):
+                raise results[0]
+            return results[0]
+        return results
+
+    def stats(self) -> dict:
+        return {
+            "socket": self.socket_path,
+            "requests": self.requests,
+            "reconnects": self.reconnects,
+            "idle_connections": len(self._idle),
+        }
+
+    def close(self):
+        for _, writer in self._idle:
+            writer.close()
+        self._idle.clear()
+
+
+async def _handle(executor, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    from core.embeddings import image_batch_to_embeddings, text_batch_to_embeddings
+
+    try:
+        while True:
+            try:
+                request, payload = await _read_message(reader)
+            except asyncio.IncompleteReadError:
+                return  # client closed the connection
+            try:
+                if request["op"] == "images":
+                    images, offset = [], 0
+                    for size in request["sizes"]:
+                        images.append(payload[offset:offset + size])
+                        offset += size
+                    results = await executor.run(image_batch_to_embeddings, images)
+                elif request["op"] == "texts":
+                    results = await executor.run(text_batch_to_embeddings, request["texts"])
+                else:
+                    raise ValueError(f"Unknown op: {request['op']}")
+            except Exception as e:
+                await _write_message(writer, {"error": f"{type(e).__name__}: {e}"})
+                continue
+
+            errors = {str(i): str(r) for i, r in enumerate(results) if isinstance(r, Exception)}
+            rows = [r for r in results if not isinstance(r, Exception)]
+            matrix = np.asarray(rows, dtype=np.float32)
+            await _write_message(
+                writer,
+                {"count": len(results), "dim": matrix.shape[1] if rows else 0, "errors": errors},
+                matrix.tobytes() if rows else b"",
+            )
+    finally:
+        writer.close()
+
+
+async def serve(socket_path: str, workers: int):
+    from core.embeddings import InferenceExecutor, image_batch_to_embeddings, text_batch_to_embeddings
+
+    # The sidecar encodes in its own threads; INFERENCE_EXECUTOR is for the API workers
+    executor = InferenceExecutor(workers, "thread")
+    # Load the models before accepting connections so the first request is not slow
+    blank = BytesIO()
+    Image.new("RGB", (32, 32)).save(blank, format="PNG")
+    await executor.run(text_batch_to_embeddings, ["warm up"])
+    await executor.run(image_batch_to_embeddings, [blank.getvalue()])
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    # Create the socket as 0600: only the user running the API may connect
+    previous_umask = os.umask(0o177)
+    try:
+        server = await asyncio.start_unix_server(lambda r, w: _handle(executor, r, w), path=socket_path)
+    finally:
+        os.umask(previous_umask)
+    # Stop cleanly (and remove the socket) when the process manager sends SIGTERM
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    print(f"✅ Inference sidecar ({settings.EMBEDDING_BACKEND}) listening on {socket_path}")
+    try:
+        async with server:
+            await server.serve_forever()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        executor.shutdown()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--socket", default=settings.INFERENCE_SOCKET_PATH)
+    parser.add_argument("--workers", type=int, default=settings.INFERENCE_WORKERS)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.socket, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
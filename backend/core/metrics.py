@@ -0,0 +1,140 @@
+import os
+import time
+from typing import Optional
+
+# First: loads .env, and prometheus_client picks its storage from
+# PROMETHEUS_MULTIPROC_DIR when it is imported
+from core.config import settings
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+from pymongo import monitoring
+from starlette.responses import Response
+
+# Prometheus metrics served at /metrics. Everything here is a plain counter
+# update on the request path; labels are bounded (route templates, not raw
+# paths; command names, not filters) so the series count stays fixed.
+#
+# With several uvicorn workers each process has its own registry, so a scrape
+# would only see whichever worker answered. Set PROMETHEUS_MULTIPROC_DIR to an
+# empty directory (cleared before every start) for all workers, the
+# INFERENCE_EXECUTOR=process pool and the inference sidecar; every process then
+# writes its samples there and /metrics serves the sum. Without it, inference
+# timings stay in the process that ran the model and are not exported.
+
+_FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+_SLOW_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+# By method only: the route is resolved during dispatch, after the request is counted
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled", ["method"],
+    multiprocess_mode="livesum",
+)
+MONGO_COMMAND_SECONDS = Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command latency as reported by the driver",
+    ["command", "outcome"], buckets=_FAST_BUCKETS,
+)
+PHOTO_DOWNLOAD_SECONDS = Histogram(
+    "photo_download_duration_seconds", "Photo download time including the per-host queue",
+    ["outcome"], buckets=_SLOW_BUCKETS,
+)
+IMAGE_DECODE_SECONDS = Histogram(
+    "image_decode_duration_seconds", "Time to decode a photo into an RGB image", buckets=_FAST_BUCKETS,
+)
+MODEL_ENCODE_SECONDS = Histogram(
+    "model_encode_duration_seconds", "Embedding model call time per batch",
+    ["modality", "backend"], buckets=_FAST_BUCKETS + (5.0, 10.0),
+)
+MODEL_ENCODE_BATCH_SIZE = Histogram(
+    "model_encode_batch_size", "Items per embedding model call",
+    ["modality"], buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+SIMILARITY_CANDIDATES = Histogram(
+    "similarity_candidates_scanned", "Alerts scored exactly per similarity query",
+    ["mode"], buckets=(0, 10, 100, 1_000, 10_000, 100_000, 1_000_000),
+)
+
+ALERT_STREAM_SUBSCRIBERS = Gauge(
+    "alert_stream_subscribers", "Live alert subscriptions (SSE and WebSocket)",
+    multiprocess_mode="livesum",
+)
+ALERT_STREAM_DROPPED = Counter(
+    "alert_stream_events_dropped", "Live alert events dropped because a subscriber fell behind",
+)
+
+
+def _route_template(scope) -> str:
+    """Path template of the route that handled a request ("/api/v1/reports/missing/{alert_id}").
+
+    Read after dispatch: the router records the matched route in the scope.
+    """
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    if "endpoint" in scope:
+        return scope.get("root_path") or "/"  # a mount (static files): its prefix
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording per-route latency and in-flight requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code: Optional[int] = None
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight = HTTP_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            HTTP_REQUEST_SECONDS.labels(method, _route_template(scope), str(status_code or 500)).observe(
+                time.perf_counter() - started
+            )
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """pymongo command listener feeding MONGO_COMMAND_SECONDS."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_COMMAND_SECONDS.labels(event.command_name, "succeeded").observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        MONGO_COMMAND_SECONDS.labels(event.command_name, "failed").observe(event.duration_micros / 1e6)
+
+
+def metrics_response() -> Response:
+    if settings.PROMETHEUS_MULTIPROC_DIR:
+        # Sum the samples every process wrote, not just this worker's
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+def mark_process_dead():
+    """Drop this process's live gauges from the shared directory on shutdown."""
+    if settings.PROMETHEUS_MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,245 @@
+"""ONNX Runtime inference for the CLIP vision tower and the MiniLM text model.
+
+Selected with ``EMBEDDING_BACKEND=onnx``. Models are exported once from the
+PyTorch sentence-transformers checkpoints (needs torch, sentence-transformers
+and onnxruntime), optionally with dynamic int8 weight quantization:
+
+    python -m core.onnx_backend export [--quantize]
+
+and compared against the PyTorch embeddings with:
+
+    python -m core.onnx_backend check [--quantize]
+"""
+import argparse
+import glob
+import inspect
+import json
+import os
+from typing import List, Optional
+
+import numpy as np
+
+from core.config import settings
+
+IMAGE_MODEL_FILE = "clip_vision.onnx"
+TEXT_MODEL_FILE = "minilm_text.onnx"
+PROCESSOR_DIR = "clip_processor"
+TOKENIZER_DIR = "minilm_tokenizer"
+CONFIG_FILE = "onnx_config.json"
+
+
+def _model_path(model_dir: str, filename: str, quantized: bool) -> str:
+    if quantized:
+        filename = filename.replace(".onnx", ".int8.onnx")
+    return os.path.join(model_dir, filename)
+
+
+def _l2_normalize(embeddings: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.maximum(norms, 1e-12)
+
+
+class OnnxEncoders:
+    """Lazily created ONNX Runtime sessions for both models."""
+
+    def __init__(self, model_dir: str, quantized: bool, intra_op_threads: int = 0):
+        self.model_dir = model_dir
+        self.quantized = quantized
+        self.intra_op_threads = intra_op_threads
+        self._image_session = None
+        self._text_session = None
+        self._processor = None
+        self._tokenizer = None
+        self._max_seq_length = 256
+
+    def _session(self, filename: str):
+        # Lazy import: onnxruntime is only needed when this backend is selected
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        if self.intra_op_threads:
+            options.intra_op_num_threads = self.intra_op_threads
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        return onnxruntime.InferenceSession(
+            _model_path(self.model_dir, filename, self.quantized),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+
+    def encode_images(self, images: list) -> np.ndarray:
+        """Normalized CLIP image embeddings for a list of RGB PIL images."""
+        if self._image_session is None:
+            from transformers import CLIPProcessor
+
+            self._processor = CLIPProcessor.from_pretrained(os.path.join(self.model_dir, PROCESSOR_DIR))
+            self._image_session = self._session(IMAGE_MODEL_FILE)
+
+        pixel_values = self._processor(images=images, return_tensors="np")["pixel_values"]
+        embeddings = self._image_session.run(None, {"pixel_values": pixel_values.astype(np.float32)})[0]
+        return _l2_normalize(embeddings)
+
+    def encode_texts(self, texts: List[str]) -> np.ndarray:
+        """Normalized mean-pooled MiniLM embeddings for a list of strings."""
+        if self._text_session is None:
+            from transformers import AutoTokenizer
+
+            self._tokenizer = AutoTokenizer.from_pretrained(os.path.join(self.model_dir, TOKENIZER_DIR))
+            config_path = os.path.join(self.model_dir, CONFIG_FILE)
+            if os.path.exists(config_path):
+                with open(config_path) as f:
+                    self._max_seq_length = json.load(f).get("max_seq_length", self._max_seq_length)
+            self._text_session = self._session(TEXT_MODEL_FILE)
+
+        tokens = self._tokenizer(
+            texts, padding=True, truncation=True, max_length=self._max_seq_length, return_tensors="np"
+        )
+        feeds = {
+            node.name: tokens[node.name].astype(np.int64)
+            for node in self._text_session.get_inputs()
+        }
+        hidden = self._text_session.run(None, feeds)[0]
+
+        # Mean pooling over real tokens, as sentence-transformers' Pooling layer does
+        mask = tokens["attention_mask"][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        return _l2_normalize(pooled)
+
+
+def _torch_onnx_export(module, args, path: str, **kwargs):
+    import torch
+
+    # torch>=2.9 defaults to the torch.export-based exporter, which needs
+    # onnxscript; the TorchScript exporter handles both models as-is
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        kwargs["dynamo"] = False
+    torch.onnx.export(module, args, path, **kwargs)
+
+
+def export_models(model_dir: str, quantize: bool):
+    """Export both models to ONNX (and int8 copies if requested)."""
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    from core.embeddings import IMAGE_MODEL_NAME, TEXT_MODEL_NAME
+
+    os.makedirs(model_dir, exist_ok=True)
+
+    # CLIP vision tower: pixel_values -> projected image features
+    clip = SentenceTransformer(IMAGE_MODEL_NAME, device="cpu")
+    clip_module = clip[0]
+    clip_module.processor.save_pretrained(os.path.join(model_dir, PROCESSOR_DIR))
+
+    class VisionTower(torch.nn.Module):
+        def __init__(self, clip_model):
+            super().__init__()
+            self.clip_model = clip_model
+
+        def forward(self, pixel_values):
+            features = self.clip_model.get_image_features(pixel_values=pixel_values)
+            # Newer transformers return a model output holding the projected features
+            return features if isinstance(features, torch.Tensor) else features.pooler_output
+
+    _torch_onnx_export(
+        VisionTower(clip_module.model).eval(),
+        (torch.zeros(1, 3, 224, 224),),
+        _model_path(model_dir, IMAGE_MODEL_FILE, False),
+        input_names=["pixel_values"],
+        output_names=["image_embeds"],
+        dynamic_axes={"pixel_values": {0: "batch"}, "image_embeds": {0: "batch"}},
+        opset_version=14,
+    )
+
+    # MiniLM transformer: token ids -> token embeddings (pooling happens in numpy)
+    text_model = SentenceTransformer(TEXT_MODEL_NAME, device="cpu")
+    transformer = text_model[0]
+    transformer.tokenizer.save_pretrained(os.path.join(model_dir, TOKENIZER_DIR))
+    with open(os.path.join(model_dir, CONFIG_FILE), "w") as f:
+        json.dump({"max_seq_length": text_model.max_seq_length}, f)
+
+    class TextEncoder(torch.nn.Module):
+        def __init__(self, auto_model):
+            super().__init__()
+            self.auto_model = auto_model
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            return self.auto_model(
+                input_ids=input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids
+            )[0]
+
+    sample = transformer.tokenizer(["a small brown dog"], return_tensors="pt")
+    _torch_onnx_export(
+        TextEncoder(transformer.auto_model).eval(),
+        (sample["input_ids"], sample["attention_mask"], sample["token_type_ids"]),
+        _model_path(model_dir, TEXT_MODEL_FILE, False),
+        input_names=["input_ids", "attention_mask", "token_type_ids"],
+        output_names=["token_embeddings"],
+        dynamic_axes={
+            name: {0: "batch", 1: "sequence"}
+            for name in ("input_ids", "attention_mask", "token_type_ids", "token_embeddings")
+        },
+        opset_version=14,
+    )
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        for filename in (IMAGE_MODEL_FILE, TEXT_MODEL_FILE):
+            quantize_dynamic(
+                _model_path(model_dir, filename, False),
+                _model_path(model_dir, filename, True),
+                weight_type=QuantType.QInt8,
+            )
+
+
+def check_parity(model_dir: str, quantized: bool, image_paths: Optional[List[str]] = None,
+                 texts: Optional[List[str]] = None) -> dict:
+    """Cosine drift between ONNX and PyTorch embeddings on sample inputs."""
+    from PIL import Image
+    from sentence_transformers import SentenceTransformer
+
+    from core.embeddings import IMAGE_MODEL_NAME, TEXT_MODEL_NAME
+
+    image_paths = image_paths or sorted(glob.glob(os.path.join("static", "images", "*")))
+    texts = texts or [
+        "dog brown friendly golden retriever with a white patch on chest",
+        "cat orange tabby, very shy",
+        "siberian husky blue eyes wearing a red collar",
+    ]
+    encoders = OnnxEncoders(model_dir, quantized, settings.ONNX_INTRA_OP_THREADS)
+    report = {"quantized": quantized}
+
+    if image_paths:
+        images = [Image.open(path).convert("RGB") for path in image_paths]
+        reference = SentenceTransformer(IMAGE_MODEL_NAME, device="cpu").encode(
+            images, convert_to_numpy=True, normalize_embeddings=True
+        )
+        cosines = np.sum(reference * encoders.encode_images(images), axis=1)
+        report["image"] = {"samples": len(images), "min_cosine": float(cosines.min()),
+                           "mean_cosine": float(cosines.mean()), "max_drift": float(1 - cosines.min())}
+
+    reference = SentenceTransformer(TEXT_MODEL_NAME, device="cpu").encode(
+        texts, convert_to_numpy=True, normalize_embeddings=True
+    )
+    cosines = np.sum(reference * encoders.encode_texts(texts), axis=1)
+    report["text"] = {"samples": len(texts), "min_cosine": float(cosines.min()),
+                      "mean_cosine": float(cosines.mean()), "max_drift": float(1 - cosines.min())}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["export", "check"])
+    parser.add_argument("--model-dir", default=settings.ONNX_MODEL_DIR)
+    parser.add_argument("--quantize", action="store_true", default=settings.ONNX_QUANTIZED,
+                        help="Export int8 copies / check the int8 models")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_models(args.model_dir, args.quantize)
+        print(f"✅ Exported ONNX models to {args.model_dir}")
+    else:
+        print(json.dumps(check_parity(args.model_dir, args.quantize), indent=2))
+
+
+if __name__ == "__main__":
+    main()
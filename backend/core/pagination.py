@@ -0,0 +1,62 @@
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+# Opaque keyset cursors. List endpoints page on (created_at, _id) descending;
+# geo endpoints page on (distance, _id) ascending. Clients should treat the
+# cursor string as opaque and pass back the ``next_cursor`` they received.
+
+
+def _encode(payload: dict) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_created_cursor(created_at: datetime, alert_id: ObjectId) -> str:
+    return _encode({"t": created_at.isoformat(), "id": str(alert_id)})
+
+
+def created_cursor_filter(cursor: Optional[str]) -> dict:
+    """Filter selecting documents after the cursor in (created_at, _id) descending order."""
+    if not cursor:
+        return {}
+    payload = _decode(cursor)
+    try:
+        created_at = datetime.fromisoformat(payload["t"])
+        alert_id = ObjectId(payload["id"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "_id": {"$lt": alert_id}},
+    ]}
+
+
+CREATED_SORT = [("created_at", -1), ("_id", -1)]
+
+
+def encode_distance_cursor(distance: float, ids_at_distance: List[ObjectId]) -> str:
+    return _encode({"d": distance, "ids": [str(i) for i in ids_at_distance]})
+
+
+def decode_distance_cursor(cursor: Optional[str]) -> Tuple[float, List[ObjectId]]:
+    """(min distance, ids already returned at exactly that distance)."""
+    if not cursor:
+        return 0.0, []
+    payload = _decode(cursor)
+    try:
+        return float(payload["d"]), [ObjectId(i) for i in payload["ids"]]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -0,0 +1,168 @@
+import argparse
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from core.config import settings
+from schemas.auth import UserResponse
+
+# Users whose outstanding tokens must stop working (deleted accounts, reset
+# credentials); every worker polls it, along with deactivated users
+REVOKED_USERS_COLLECTION = "revoked_users"
+
+
+class PrincipalCache:
+    """Bounded TTL cache of verified bearer token -> UserResponse.
+
+    Entries live for at most ``ttl_seconds`` and never past the token's own
+    ``exp``. ``invalidate_user`` drops a user's cached principals and rejects
+    tokens issued to them before the call, including tokens that carry their
+    user id and would otherwise be accepted without a database lookup.
+    ``invalidate_user`` is per process; ``sync_revocations`` applies
+    revocations made elsewhere (``revoke_user`` in any worker, or users
+    deactivated directly in the database) every AUTH_REVOCATION_SYNC_SECONDS.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, UserResponse]]" = OrderedDict()
+        self._revoked: Dict[str, float] = {}  # user id -> wall-clock revocation time
+        self.hits = 0
+        self.misses = 0
+        self.lookups = 0
+        self._lookup_seconds = 0.0
+        self._max_lookup_seconds = 0.0
+
+    @staticmethod
+    def _key(token: str) -> str:
+        # Keep digests rather than bearer tokens in memory
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[UserResponse]:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, principal = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return principal
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, token: str, principal: UserResponse, token_exp: Optional[float] = None):
+        """Cache a principal; ``token_exp`` is the token's epoch ``exp`` claim."""
+        ttl = self.ttl_seconds
+        if token_exp is not None:
+            ttl = min(ttl, token_exp - time.time())
+        if ttl <= 0:
+            return
+        key = self._key(token)
+        self._entries[key] = (time.monotonic() + ttl, principal)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: str, revoked_at: Optional[float] = None):
+        """Forget a deactivated (or otherwise changed) user's principals.
+
+        Tokens issued at or before ``revoked_at`` (default: now) are rejected.
+        """
+        self._entries = OrderedDict(
+            (key, entry) for key, entry in self._entries.items() if entry[1].id != user_id
+        )
+        now = time.time()
+        self._revoked[user_id] = max(self._revoked.get(user_id, 0.0), revoked_at or now)
+        # Tokens outlive a revocation by at most their lifetime
+        horizon = now - settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        self._revoked = {uid: at for uid, at in self._revoked.items() if at >= horizon}
+
+    async def sync_revocations(self, db):
+        """Apply revocations recorded by other workers and users deactivated in the database."""
+        horizon = datetime.now() - timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        async for revoked in db[REVOKED_USERS_COLLECTION].find({"revoked_at": {"$gte": horizon}}):
+            revoked_at = revoked["revoked_at"].timestamp()
+            if self._revoked.get(revoked["_id"], 0.0) < revoked_at:
+                self.invalidate_user(revoked["_id"], revoked_at)
+        # Inactive users cannot log in, so any token they hold predates this check
+        async for user in db.users.find({"is_active": False}, {"_id": 1}):
+            user_id = str(user["_id"])
+            if user_id not in self._revoked:
+                self.invalidate_user(user_id)
+
+    def is_revoked(self, user_id: str, issued_at: Optional[float]) -> bool:
+        revoked_at = self._revoked.get(user_id)
+        return revoked_at is not None and (issued_at is None or issued_at <= revoked_at)
+
+    def record_lookup(self, seconds: float):
+        self.lookups += 1
+        self._lookup_seconds += seconds
+        self._max_lookup_seconds = max(self._max_lookup_seconds, seconds)
+
+    def stats(self) -> dict:
+        requests = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests else 0.0,
+            "user_lookups": self.lookups,
+            "avg_lookup_ms": 1000 * self._lookup_seconds / self.lookups if self.lookups else 0.0,
+            "max_lookup_ms": 1000 * self._max_lookup_seconds,
+        }
+
+
+principal_cache = PrincipalCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+
+
+async def revoke_user(db, user_id: str):
+    """Reject every token issued to a user so far, in this and (after their next sync) every worker."""
+    await db[REVOKED_USERS_COLLECTION].replace_one(
+        {"_id": user_id}, {"_id": user_id, "revoked_at": datetime.now()}, upsert=True
+    )
+    principal_cache.invalidate_user(user_id)
+
+
+async def run_revocation_sync(get_db, interval_seconds: float):
+    while True:
+        db = get_db()
+        if db is not None:
+            try:
+                await principal_cache.sync_revocations(db)
+            except Exception as e:
+                print(f"Warning: token revocation sync failed: {e}")
+        await asyncio.sleep(interval_seconds)
+
+
+async def main():
+    """Operator commands; deactivating in the database is picked up without them."""
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    parser = argparse.ArgumentParser(description="Revoke or deactivate a user's access tokens")
+    parser.add_argument("action", choices=["revoke", "deactivate"],
+                        help="revoke: invalidate current tokens; deactivate: also block login")
+    parser.add_argument("email")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    try:
+        db = client[settings.DATABASE_NAME]
+        user = await db.users.find_one({"email": args.email}, {"_id": 1})
+        if user is None:
+            print(f"❌ No user with email {args.email}")
+            return
+        if args.action == "deactivate":
+            await db.users.update_one({"_id": user["_id"]}, {"$set": {"is_active": False}})
+        await revoke_user(db, str(user["_id"]))
+    finally:
+        client.close()
+    print(f"✅ Revoked tokens for {args.email}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
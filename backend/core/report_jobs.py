@@ -0,0 +1,161 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, List, Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from core.config import settings
+
+# Report processing jobs are stored in Mongo so queued work survives
+# restarts; in-process asyncio workers claim them with a lease, and a job
+# whose worker died is picked up again once its lease expires. Either way a
+# job runs at most REPORT_JOB_MAX_ATTEMPTS times, and a job that raised waits
+# REPORT_JOB_RETRY_BACKOFF_SECONDS (doubling per attempt) before its retry.
+JOBS_COLLECTION = "report_jobs"
+
+JobHandler = Callable[[object, dict], Awaitable[dict]]
+
+
+class ReportJobQueue:
+    """Mongo-backed job queue drained by in-process asyncio workers."""
+
+    def __init__(self):
+        self._wakeup: Optional[asyncio.Event] = None
+        self._workers: List[asyncio.Task] = []
+
+    def _notify(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def enqueue(self, db, payload: dict) -> ObjectId:
+        """Persist a new queued job and wake a worker"""
+        now = datetime.now()
+        job = {
+            **payload,
+            "status": "queued",
+            "attempts": 0,
+            "result": None,
+            "error": None,
+            "lease_expires_at": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        result = await db[JOBS_COLLECTION].insert_one(job)
+        self._notify()
+        return result.inserted_id
+
+    async def get(self, db, job_id: ObjectId) -> Optional[dict]:
+        return await db[JOBS_COLLECTION].find_one({"_id": job_id})
+
+    async def _fail_abandoned(self, db, now: datetime):
+        """Fail jobs whose lease expired on their last allowed attempt (e.g. the process crashed mid-job)"""
+        await db[JOBS_COLLECTION].update_many(
+            {
+                "status": "running",
+                "lease_expires_at": {"$lt": now},
+                "attempts": {"$gte": settings.REPORT_JOB_MAX_ATTEMPTS},
+            },
+            {"$set": {
+                "status": "failed",
+                "error": "Lease expired on the last attempt",
+                "lease_expires_at": None,
+                "updated_at": now,
+            }},
+        )
+
+    async def _claim(self, db) -> Optional[dict]:
+        now = datetime.now()
+        await self._fail_abandoned(db, now)
+        return await db[JOBS_COLLECTION].find_one_and_update(
+            {"$or": [
+                # retry_at is only set on jobs backing off after a failure
+                {"status": "queued", "retry_at": {"$not": {"$gt": now}}},
+                {
+                    "status": "running",
+                    "lease_expires_at": {"$lt": now},
+                    "attempts": {"$lt": settings.REPORT_JOB_MAX_ATTEMPTS},
+                },
+            ]},
+            {
+                "$set": {
+                    "status": "running",
+                    "lease_expires_at": now + timedelta(seconds=settings.REPORT_JOB_LEASE_SECONDS),
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _run_job(self, db, job: dict, handler: JobHandler):
+        try:
+            result = await handler(db, job)
+        except Exception as e:
+            print(f"Warning: report job {job['_id']} failed (attempt {job['attempts']}): {e}")
+            retry = job["attempts"] < settings.REPORT_JOB_MAX_ATTEMPTS
+            now = datetime.now()
+            # Back off exponentially so a failing job is not claimed again straight away
+            backoff = settings.REPORT_JOB_RETRY_BACKOFF_SECONDS * 2 ** (job["attempts"] - 1)
+            await db[JOBS_COLLECTION].update_one(
+                {"_id": job["_id"]},
+                {"$set": {
+                    "status": "queued" if retry else "failed",
+                    "error": str(e),
+                    "lease_expires_at": None,
+                    "retry_at": now + timedelta(seconds=backoff) if retry else None,
+                    "updated_at": now,
+                }},
+            )
+            return
+
+        await db[JOBS_COLLECTION].update_one(
+            {"_id": job["_id"]},
+            {"$set": {
+                "status": "completed",
+                "result": result,
+                "error": None,
+                "lease_expires_at": None,
+                "updated_at": datetime.now(),
+            }},
+        )
+
+    async def _worker(self, get_db: Callable, handler: JobHandler):
+        while True:
+            db = get_db()
+            job = None
+            if db is not None:
+                try:
+                    job = await self._claim(db)
+                except Exception as e:
+                    print(f"Warning: could not claim report job: {e}")
+
+            if job is None:
+                # Idle: wait for a local enqueue, or poll for jobs from other workers
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), settings.REPORT_JOB_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            try:
+                await self._run_job(db, job, handler)
+            except Exception as e:
+                # Recording the outcome failed; the lease expiring hands the job back
+                print(f"Warning: could not record report job {job['_id']}: {e}")
+
+    def start(self, get_db: Callable, handler: JobHandler, workers: int):
+        """Start ``workers`` background tasks processing jobs with ``handler``"""
+        self._wakeup = asyncio.Event()
+        self._workers = [asyncio.create_task(self._worker(get_db, handler)) for _ in range(workers)]
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+
+report_jobs = ReportJobQueue()
@@ -0,0 +1,30 @@
+import re
+import unicodedata
+from typing import List, Optional
+
+# Alerts carry normalized copies of the fields users filter on, so list
+# filters are exact matches served by an index instead of case-insensitive
+# regexes that scan every document.
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _fold(value: str) -> str:
+    """Lowercase and strip accents ("Café" -> "cafe")."""
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def normalize_term(value: Optional[str]) -> Optional[str]:
+    """Canonical form of a species/color value; None for blank input."""
+    if not value:
+        return None
+    term = " ".join(_fold(value).split())
+    return term or None
+
+
+def place_tokens(place_name: Optional[str]) -> List[str]:
+    """Distinct word tokens of a place name, in order of appearance."""
+    if not place_name:
+        return []
+    return list(dict.fromkeys(_TOKEN_RE.findall(_fold(place_name))))
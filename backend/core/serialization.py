@@ -0,0 +1,83 @@
+from typing import Any, Iterable, List, Optional
+
+from fastapi.responses import ORJSONResponse
+
+from schemas.pet import AlertResponse
+
+# Shared alert serialization. List endpoints read alerts with
+# ALERT_RESPONSE_PROJECTION and write them straight to JSON with orjson,
+# skipping the per-document AlertResponse construction and FastAPI's second
+# validation pass against response_model (the routes keep response_model for
+# the OpenAPI schema only). The output matches AlertResponse field for field.
+
+ALERT_RESPONSE_PROJECTION = {
+    "pet_id": 1,
+    "alert_type": 1,
+    "title": 1,
+    "description": 1,
+    "location": 1,
+    "contact_info": 1,
+    "photos": 1,
+    "is_active": 1,
+    "created_by": 1,
+    "created_at": 1,
+    "updated_at": 1,
+}
+
+# Fields a map client needs to draw a marker; only the first photo is read
+ALERT_MARKER_PROJECTION = {
+    "location.coordinates": 1,
+    "species": 1,
+    "title": 1,
+    "photos": {"$slice": 1},
+    "is_active": 1,
+    "created_at": 1,
+}
+
+
+def alert_to_dict(alert: dict) -> dict:
+    """JSON-ready AlertResponse fields for an alert document (datetimes left to orjson)."""
+    return {
+        "pet_id": str(alert["pet_id"]),
+        "alert_type": alert["alert_type"],
+        "title": alert["title"],
+        "description": alert["description"],
+        "location": str(alert.get("location")),  # Convert GeoJSON to string
+        "latitude": None,
+        "longitude": None,
+        "contact_info": alert["contact_info"],
+        "id": str(alert["_id"]),
+        "created_by": str(alert["created_by"]),
+        "photos": alert.get("photos", []),
+        "is_active": alert.get("is_active", True),
+        "created_at": alert["created_at"],
+        "updated_at": alert.get("updated_at"),
+    }
+
+
+def alert_marker(alert: dict) -> dict:
+    """Compact map marker fields for an alert (ALERT_MARKER_PROJECTION is enough)."""
+    photos = alert.get("photos") or []
+    return {
+        "id": str(alert["_id"]),
+        "coordinates": alert.get("location", {}).get("coordinates"),
+        "species": alert.get("species"),
+        "title": alert.get("title"),
+        "thumbnail": photos[0] if photos else None,
+        "created_at": alert.get("created_at"),
+        "active": alert.get("is_active", True),
+    }
+
+
+def alert_response(alert: dict) -> AlertResponse:
+    """AlertResponse model for responses that nest alerts in other models."""
+    return AlertResponse.model_construct(**alert_to_dict(alert))
+
+
+def alert_list_response(alerts: Iterable[dict]) -> ORJSONResponse:
+    return ORJSONResponse([alert_to_dict(alert) for alert in alerts])
+
+
+def alert_page_response(alerts: List[Any], next_cursor: Optional[str]) -> ORJSONResponse:
+    """Same shape as AlertPage."""
+    return ORJSONResponse({"items": [alert_to_dict(alert) for alert in alerts], "next_cursor": next_cursor})
@@ -0,0 +1,354 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.ann import ANNBackend, create_ann_backend
+from core.config import settings
+from core.metrics import SIMILARITY_CANDIDATES
+from core.search_terms import normalize_term
+from core.serialization import ALERT_RESPONSE_PROJECTION
+from db.embedding_store import embeddings_collection, iter_alert_embeddings
+
+# Only active "missing" alerts take part in similarity search
+INDEXED_ALERTS_QUERY = {"is_active": True, "alert_type": "missing"}
+
+# Found and sighting reports live in a separate index that new missing
+# reports are matched against (see api.routes.reports)
+REPORT_ALERT_TYPES = ["found", "sighting"]
+INDEXED_REPORTS_QUERY = {"is_active": True, "alert_type": {"$in": REPORT_ALERT_TYPES}}
+
+EARTH_RADIUS_M = 6378100.0
+
+# ANN backends return this many candidates per requested result, to leave
+# room for threshold filtering after exact rescoring
+ANN_CANDIDATE_FACTOR = 4
+
+
+def _normalize(vector: Optional[Sequence[float]], dim: int) -> Optional[np.ndarray]:
+    """Return a unit-length float32 copy of vector, or None if it is unusable."""
+    if vector is None or len(vector) == 0:
+        return None
+    arr = np.asarray(vector, dtype=np.float32).reshape(-1)
+    if arr.shape[0] != dim:
+        return None
+    norm = float(np.linalg.norm(arr))
+    if norm == 0.0 or not np.isfinite(norm):
+        return None
+    return arr / norm
+
+
+class EmbeddingIndex:
+    """Process-resident matrices of normalized alert embeddings.
+
+    Rows are kept contiguous: removing an alert moves the last row into the
+    freed slot, so scoring is always a single matrix-vector product over
+    ``[:size]``. An optional ANN backend narrows that product down to a
+    candidate subset of rows.
+    """
+
+    def __init__(self, image_dim: int = 512, text_dim: int = 384, initial_capacity: int = 1024,
+                 backend: Optional[ANNBackend] = None, query: Optional[dict] = None, name: str = "embedding index"):
+        self.backend = backend
+        self.query = query if query is not None else INDEXED_ALERTS_QUERY
+        self.name = name
+        self.image_dim = image_dim
+        self.text_dim = text_dim
+        self._ids: List[Any] = []
+        self._rows: Dict[Any, int] = {}
+        self._image = np.zeros((initial_capacity, image_dim), dtype=np.float32)
+        self._text = np.zeros((initial_capacity, text_dim), dtype=np.float32)
+        self._has_image = np.zeros(initial_capacity, dtype=bool)
+        self._has_text = np.zeros(initial_capacity, dtype=bool)
+        self.loaded = False
+        self.synced_at: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, alert_id: Any) -> bool:
+        return alert_id in self._rows
+
+    def _grow(self, needed: int):
+        capacity = self._image.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        for name in ("_image", "_text", "_has_image", "_has_text"):
+            old = getattr(self, name)
+            new = np.zeros((new_capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:capacity] = old
+            setattr(self, name, new)
+
+    def add(self, alert_id: Any, image_embedding: Optional[Sequence[float]],
+            text_embedding: Optional[Sequence[float]]) -> bool:
+        """Insert or replace an alert's vectors. Returns False if it has none usable."""
+        image_vec = _normalize(image_embedding, self.image_dim)
+        text_vec = _normalize(text_embedding, self.text_dim)
+        if image_vec is None and text_vec is None:
+            self.remove(alert_id)
+            return False
+
+        row = self._rows.get(alert_id)
+        if row is None:
+            row = len(self._ids)
+            self._grow(row + 1)
+            self._ids.append(alert_id)
+            self._rows[alert_id] = row
+
+        self._image[row] = image_vec if image_vec is not None else 0.0
+        self._has_image[row] = image_vec is not None
+        self._text[row] = text_vec if text_vec is not None else 0.0
+        self._has_text[row] = text_vec is not None
+        if self.backend is not None:
+            self.backend.add(alert_id, np.concatenate([self._image[row], self._text[row]]))
+        return True
+
+    def remove(self, alert_id: Any) -> bool:
+        """Drop an alert from the index. Returns False if it was not indexed."""
+        row = self._rows.pop(alert_id, None)
+        if row is None:
+            return False
+        if self.backend is not None:
+            self.backend.remove(alert_id)
+
+        last = len(self._ids) - 1
+        if row != last:
+            moved_id = self._ids[last]
+            self._ids[row] = moved_id
+            self._rows[moved_id] = row
+            self._image[row] = self._image[last]
+            self._text[row] = self._text[last]
+            self._has_image[row] = self._has_image[last]
+            self._has_text[row] = self._has_text[last]
+        self._ids.pop()
+        self._image[last] = 0.0
+        self._text[last] = 0.0
+        self._has_image[last] = False
+        self._has_text[last] = False
+        return True
+
+    def clear(self):
+        self._ids.clear()
+        self._rows.clear()
+        self._image[:] = 0.0
+        self._text[:] = 0.0
+        self._has_image[:] = False
+        self._has_text[:] = False
+
+    def rebuild_backend(self):
+        """Retrain the ANN backend on the current rows."""
+        if self.backend is None:
+            return
+        size = len(self._ids)
+        vectors = np.hstack([self._image[:size], self._text[:size]])
+        self.backend.rebuild(list(self._ids), vectors)
+
+    def _candidate_rows(self, query_image: Optional[np.ndarray], query_text: Optional[np.ndarray],
+                        image_weight: float, text_weight: float, k: int,
+                        search_params: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        query = np.concatenate([
+            image_weight * query_image if query_image is not None else np.zeros(self.image_dim, dtype=np.float32),
+            text_weight * query_text if query_text is not None else np.zeros(self.text_dim, dtype=np.float32),
+        ]).astype(np.float32)
+        alert_ids = self.backend.candidates(query, k, **(search_params or {}))
+        if alert_ids is None:
+            return None
+        rows = [self._rows[alert_id] for alert_id in alert_ids if alert_id in self._rows]
+        return np.asarray(rows, dtype=np.intp)
+
+    def scores(self, query_image: Optional[np.ndarray], query_text: Optional[np.ndarray],
+               image_weight: float, text_weight: float,
+               rows: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Combined similarity for the given rows (default: all), plus a mask of rows that were comparable.
+
+        Query vectors must already be normalized.
+        """
+        size = len(self._ids)
+        selector = slice(0, size) if rows is None else rows
+        count = size if rows is None else len(rows)
+        scores = np.zeros(count, dtype=np.float32)
+        matched = np.zeros(count, dtype=bool)
+
+        if query_image is not None:
+            if image_weight:
+                scores += image_weight * (self._image[selector] @ query_image)
+            matched |= self._has_image[selector]
+
+        if query_text is not None:
+            if text_weight:
+                scores += text_weight * (self._text[selector] @ query_text)
+            matched |= self._has_text[selector]
+
+        return scores, matched
+
+    def search(self, query_image_embedding: Optional[Sequence[float]],
+               query_text_embedding: Optional[Sequence[float]],
+               image_weight: float, text_weight: float,
+               similarity_threshold: float, limit: int,
+               exclude_ids: Sequence[Any] = (), exact: bool = False,
+               search_params: Optional[Dict[str, Any]] = None,
+               candidate_ids: Optional[Sequence[Any]] = None) -> List[Tuple[Any, float]]:
+        """Return up to ``limit`` (alert_id, score) pairs at or above the threshold, best first.
+
+        ``candidate_ids`` restricts scoring to a pre-filtered set of alerts
+        (see ``filtered_alert_ids``). Otherwise, with an ANN backend
+        configured only its candidate rows are scored, unless ``exact`` is set.
+        """
+        if limit <= 0:
+            return []
+        query_image = _normalize(query_image_embedding, self.image_dim)
+        query_text = _normalize(query_text_embedding, self.text_dim)
+
+        rows = None
+        mode = "exact"
+        if candidate_ids is not None:
+            mode = "filtered"
+            rows = np.asarray(
+                [self._rows[alert_id] for alert_id in candidate_ids if alert_id in self._rows], dtype=np.intp
+            )
+        elif self.backend is not None and not exact:
+            k = limit * ANN_CANDIDATE_FACTOR + len(exclude_ids)
+            rows = self._candidate_rows(query_image, query_text, image_weight, text_weight, k, search_params)
+            if rows is not None:
+                mode = self.backend.name
+        if rows is None:
+            rows = np.arange(len(self._ids))
+        SIMILARITY_CANDIDATES.labels(mode).observe(len(rows))
+
+        scores, matched = self.scores(query_image, query_text, image_weight, text_weight, rows)
+        candidates = matched & (scores >= similarity_threshold)
+        excluded_rows = [self._rows[alert_id] for alert_id in exclude_ids if alert_id in self._rows]
+        if excluded_rows:
+            candidates &= ~np.isin(rows, excluded_rows)
+
+        positions = np.flatnonzero(candidates)
+        if positions.size == 0:
+            return []
+        if positions.size > limit:
+            positions = positions[np.argpartition(-scores[positions], limit - 1)[:limit]]
+        positions = positions[np.argsort(-scores[positions], kind="stable")]
+        return [(self._ids[rows[p]], float(scores[p])) for p in positions]
+
+    async def load(self, db):
+        """Rebuild the index from every alert matching its query."""
+        started_at = datetime.now()
+        # Detach the backend while bulk loading, then train it once
+        backend, self.backend = self.backend, None
+        self.clear()
+        try:
+            async for alert in iter_alert_embeddings(db, self.query):
+                self.add(alert["_id"], alert.get("image_embedding"), alert.get("text_embedding"))
+        finally:
+            self.backend = backend
+        self.rebuild_backend()
+        self.loaded = True
+        self.synced_at = started_at
+        print(f"✅ Loaded {len(self)} alerts into the {self.name}")
+
+    async def sync(self, db):
+        """Apply alerts created, embedded or deactivated by other workers since the last sync."""
+        if not self.loaded:
+            await self.load(db)
+            return
+
+        since = self.synced_at
+        now = datetime.now()
+        # Background and bulk processing insert the alert before its vectors,
+        # so also pick up alerts whose embeddings were stored since the last sync
+        embedded_ids = [
+            doc["_id"] async for doc in embeddings_collection(db).find({"created_at": {"$gte": since}}, {"_id": 1})
+        ]
+        created = {**self.query, "$or": [{"created_at": {"$gte": since}}, {"_id": {"$in": embedded_ids}}]}
+        async for alert in iter_alert_embeddings(db, created):
+            self.add(alert["_id"], alert.get("image_embedding"), alert.get("text_embedding"))
+
+        deactivated = db.alerts.find({"is_active": False, "updated_at": {"$gte": since}}, {"_id": 1})
+        async for alert in deactivated:
+            self.remove(alert["_id"])
+        self.synced_at = now
+
+        if self.backend is not None and self.backend.needs_rebuild(len(self)):
+            self.rebuild_backend()
+
+
+embedding_index = EmbeddingIndex(
+    backend=create_ann_backend(settings.SIMILARITY_BACKEND, 512 + 384)
+)
+# Active found/sighting reports; missing reports are matched against the recent ones
+report_index = EmbeddingIndex(query=INDEXED_REPORTS_QUERY, name="found/sighting report index")
+
+
+async def get_embedding_index(db) -> EmbeddingIndex:
+    """Return the shared index, loading it on first use."""
+    if not embedding_index.loaded:
+        await embedding_index.load(db)
+    return embedding_index
+
+
+async def get_report_index(db) -> EmbeddingIndex:
+    if not report_index.loaded:
+        await report_index.load(db)
+    return report_index
+
+
+async def run_periodic_sync(get_db, interval_seconds: float):
+    """Keep the index in step with writes made by other workers."""
+    while True:
+        db = get_db()
+        if db is not None:
+            for index in (embedding_index, report_index):
+                try:
+                    await index.sync(db)
+                except Exception as e:
+                    print(f"Warning: {index.name} sync failed: {e}")
+        await asyncio.sleep(interval_seconds)
+
+
+def build_alert_filter(lon: Optional[float] = None, lat: Optional[float] = None,
+                       radius_m: Optional[float] = None, species: Optional[str] = None,
+                       last_seen_after: Optional[datetime] = None,
+                       last_seen_before: Optional[datetime] = None) -> Optional[dict]:
+    """Mongo filter narrowing indexed alerts by place, species and sighting date.
+
+    Returns None when no filter is given, meaning "search everything".
+    """
+    query: Dict[str, Any] = {}
+    if lon is not None and lat is not None and radius_m:
+        # $geoWithin/$centerSphere is served by the 2dsphere index and, unlike
+        # $near, does not sort, so it is cheap to use as a pure prefilter
+        query["location"] = {
+            "$geoWithin": {"$centerSphere": [[lon, lat], radius_m / EARTH_RADIUS_M]}
+        }
+    if species:
+        query["species"] = normalize_term(species)
+    if last_seen_after is not None or last_seen_before is not None:
+        window = {}
+        if last_seen_after is not None:
+            window["$gte"] = last_seen_after
+        if last_seen_before is not None:
+            window["$lte"] = last_seen_before
+        query["last_seen_date"] = window
+    if not query:
+        return None
+    return {**INDEXED_ALERTS_QUERY, **query}
+
+
+async def filtered_alert_ids(db, alert_filter: Optional[dict]) -> Optional[List[Any]]:
+    """Ids of alerts matching alert_filter, to prune candidates before vector scoring."""
+    if alert_filter is None:
+        return None
+    return [alert["_id"] async for alert in db.alerts.find(alert_filter, {"_id": 1})]
+
+
+async def fetch_ranked_alerts(db, matches: List[Tuple[Any, float]]) -> List[Tuple[dict, float]]:
+    """Load the alert documents for search results, keeping rank order."""
+    if not matches:
+        return []
+    cursor = db.alerts.find(
+        {"_id": {"$in": [alert_id for alert_id, _ in matches]}, "is_active": True},
+        ALERT_RESPONSE_PROJECTION
+    )
+    alerts_by_id = {alert["_id"]: alert async for alert in cursor}
+    return [(alerts_by_id[alert_id], score) for alert_id, score in matches if alert_id in alerts_by_id]
@@ -2,6 +2,8 @@ from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from typing import Optional
 import os
 from core.config import settings
+from core.metrics import MongoCommandMetrics
+from db.indexes import apply_index_migrations
 
 class Database:
     client: Optional[AsyncIOMotorClient] = None
@@ -16,7 +18,8 @@ def get_database() -> AsyncIOMotorDatabase:
 async def connect_to_mongo():
     """Create database connection"""
     try:
-        db.client = AsyncIOMotorClient(settings.MONGODB_URL)
+        # Command monitoring feeds the mongodb_command_duration_seconds metric
+        db.client = AsyncIOMotorClient(settings.MONGODB_URL, event_listeners=[MongoCommandMetrics()])
         db.db = db.client[settings.DATABASE_NAME]
         
         # Test the connection
@@ -39,23 +42,13 @@ async def create_indexes():
     """Create database indexes"""
     if db.db is not None:
         try:
-            # User collection indexes
-            await db.db.users.create_index("email", unique=True)
-            await db.db.users.create_index("created_at")
+            # Versioned compound/partial indexes (see db/indexes.py)
+            await apply_index_migrations(db.db)
             
-            # Pet collection indexes
-            await db.db.pets.create_index("owner_id")
-            await db.db.pets.create_index("is_missing")
-            await db.db.pets.create_index("species")
-            await db.db.pets.create_index("created_at")
-            
-            # Alert collection indexes
-            await db.db.alerts.create_index("pet_id")
-            await db.db.alerts.create_index("alert_type")
-            await db.db.alerts.create_index("is_active")
-            await db.db.alerts.create_index("created_at")
-            # Ensure GeoJSON 2dsphere index on location for $near queries
-            await db.db.alerts.create_index([("location", "2dsphere")])
+            # Embedding cache entries expire after EMBEDDING_CACHE_TTL_SECONDS
+            await db.db.embedding_cache.create_index(
+                "created_at", expireAfterSeconds=settings.EMBEDDING_CACHE_TTL_SECONDS
+            )
         except Exception as e:
             print(f"Warning: Could not create indexes: {e}")
             # Continue without indexes for now
@@ -0,0 +1,92 @@
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Optional, Tuple
+
+from pymongo import ReplaceOne
+
+from core.config import settings
+from core.embeddings import pack_embedding, unpack_embedding
+
+# Embeddings live in their own collection keyed by alert id, so that alert
+# reads never pull ~10 KB of vectors per document. Only the similarity
+# subsystem reads from here.
+EMBEDDINGS_COLLECTION = "alert_embeddings"
+
+_VECTOR_FIELDS = {"image_embedding": 1, "text_embedding": 1}
+
+
+def embeddings_collection(db):
+    return db[EMBEDDINGS_COLLECTION]
+
+
+async def save_alert_embeddings(db, alert_id: Any, image_embedding: Optional[List[float]],
+                                text_embedding: Optional[List[float]]):
+    """Store (or replace) the vectors for an alert, packed per EMBEDDING_STORAGE_FORMAT."""
+    if image_embedding is None and text_embedding is None:
+        return
+    await embeddings_collection(db).replace_one(
+        {"_id": alert_id}, _embedding_document(alert_id, image_embedding, text_embedding), upsert=True
+    )
+
+
+def _embedding_document(alert_id: Any, image_embedding: Optional[List[float]],
+                        text_embedding: Optional[List[float]]) -> dict:
+    storage_format = settings.EMBEDDING_STORAGE_FORMAT
+    return {
+        "_id": alert_id,
+        "image_embedding": pack_embedding(image_embedding, storage_format),
+        "text_embedding": pack_embedding(text_embedding, storage_format),
+        "created_at": datetime.now(),
+    }
+
+
+async def save_many_alert_embeddings(db, rows: List[Tuple[Any, Optional[List[float]], Optional[List[float]]]]):
+    """``save_alert_embeddings`` for many ``(alert_id, image, text)`` rows in one bulk write."""
+    updates = [
+        ReplaceOne({"_id": alert_id}, _embedding_document(alert_id, image_embedding, text_embedding), upsert=True)
+        for alert_id, image_embedding, text_embedding in rows
+        if image_embedding is not None or text_embedding is not None
+    ]
+    if updates:
+        await embeddings_collection(db).bulk_write(updates, ordered=False)
+
+
+async def find_alert_embeddings(db, alert_ids: List[Any]) -> List[dict]:
+    """Decoded float32 vectors for the given alert ids.
+
+    Accepts both packed and legacy list encodings, and falls back to inline
+    copies on alerts that have not been split out yet.
+    """
+    if not alert_ids:
+        return []
+    docs = await embeddings_collection(db).find(
+        {"_id": {"$in": alert_ids}}, _VECTOR_FIELDS
+    ).to_list(length=None)
+
+    found = {doc["_id"] for doc in docs}
+    missing = [alert_id for alert_id in alert_ids if alert_id not in found]
+    if missing:
+        legacy = await db.alerts.find(
+            {"_id": {"$in": missing}, "$or": [
+                {"image_embedding": {"$ne": None}}, {"text_embedding": {"$ne": None}}
+            ]},
+            _VECTOR_FIELDS,
+        ).to_list(length=None)
+        docs.extend(legacy)
+
+    for doc in docs:
+        doc["image_embedding"] = unpack_embedding(doc.get("image_embedding"))
+        doc["text_embedding"] = unpack_embedding(doc.get("text_embedding"))
+    return docs
+
+
+async def iter_alert_embeddings(db, alert_query: dict, batch_size: int = 1000) -> AsyncIterator[dict]:
+    """Yield ``{_id, image_embedding, text_embedding}`` for every alert matching alert_query."""
+    batch: List[Any] = []
+    async for alert in db.alerts.find(alert_query, {"_id": 1}).batch_size(batch_size):
+        batch.append(alert["_id"])
+        if len(batch) >= batch_size:
+            for doc in await find_alert_embeddings(db, batch):
+                yield doc
+            batch = []
+    for doc in await find_alert_embeddings(db, batch):
+        yield doc
@@ -0,0 +1,245 @@
+"""Explain-plan regression check for route queries.
+
+Runs ``explain()`` for the query shape behind every hot route against a local
+mongod and fails if any winning plan contains a COLLSCAN (no usable index) or
+SORT (in-memory sort) stage. Usage (from backend/):
+
+    python -m db.explain_check [--keep]
+
+It works on a scratch ``<DATABASE_NAME>_explain_check`` database: applies the
+index migrations from ``db/indexes.py``, seeds a few synthetic documents,
+explains every query and drops the database again (unless ``--keep``). The
+exit status is non-zero when any plan regresses, so it can gate CI.
+
+When a route gains a new query, add its shape to ``route_queries``.
+"""
+import argparse
+import asyncio
+import random
+import sys
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from core.config import settings
+from core.pagination import CREATED_SORT, created_cursor_filter, encode_created_cursor
+from core.vector_index import INDEXED_ALERTS_QUERY, INDEXED_REPORTS_QUERY, build_alert_filter
+from db.indexes import apply_index_migrations
+
+FORBIDDEN_STAGES = {"COLLSCAN", "SORT"}
+
+
+class RouteQuery(NamedTuple):
+    name: str
+    collection: str
+    filter: dict
+    sort: Optional[list] = None
+    limit: int = 0
+    pipeline: Optional[list] = None  # aggregate instead of find
+
+
+def route_queries(user_id: ObjectId, cursor_at: datetime, cursor_id: ObjectId) -> List[RouteQuery]:
+    missing = {"alert_type": "missing", "is_active": True}
+    keyset = created_cursor_filter(encode_created_cursor(cursor_at, cursor_id))
+    point = [-122.42, 37.77]
+    return [
+        RouteQuery("GET /reports/missing", "alerts", missing, [("created_at", -1)], 20),
+        RouteQuery("GET /reports/missing?species", "alerts",
+                   {**missing, "species": "dog"}, [("created_at", -1)], 20),
+        RouteQuery("GET /reports/missing?color", "alerts",
+                   {**missing, "color": "brown"}, [("created_at", -1)], 20),
+        RouteQuery("GET /reports/missing?location", "alerts",
+                   {**missing, "place_tokens": {"$all": ["mission", "district"]}}, [("created_at", -1)], 20),
+        RouteQuery("GET /reports/missing?paginate=cursor", "alerts",
+                   {"$and": [missing, keyset]}, CREATED_SORT, 21),
+        RouteQuery("GET /reports/my-reports", "alerts",
+                   {"created_by": user_id}, [("created_at", -1)], 20),
+        RouteQuery("GET /reports/my-reports?paginate=cursor", "alerts",
+                   {"$and": [{"created_by": user_id}, keyset]}, CREATED_SORT, 21),
+        RouteQuery("GET /alerts/near", "alerts", {**missing, "location": {"$near": {
+            "$geometry": {"type": "Point", "coordinates": point}, "$maxDistance": 5000,
+        }}}, limit=50),
+        RouteQuery("GET /alerts/near?paginate=cursor", "alerts", {}, pipeline=[
+            {"$geoNear": {
+                "near": {"type": "Point", "coordinates": point}, "key": "location",
+                "distanceField": "distance", "spherical": True, "maxDistance": 5000,
+                "query": missing,
+            }},
+            {"$limit": 51},
+        ]),
+        RouteQuery("GET /alerts/export", "alerts", missing),
+        RouteQuery("GET /alerts/export?bbox", "alerts", {**missing, "location": {"$geoWithin": {"$geometry": {
+            "type": "Polygon",
+            "coordinates": [[[-122.5, 37.7], [-122.3, 37.7], [-122.3, 37.85], [-122.5, 37.85], [-122.5, 37.7]]],
+        }}}}),
+        RouteQuery("GET /alerts/export?updated_since", "alerts", {"alert_type": "missing", "$or": [
+            {"created_at": {"$gte": cursor_at}}, {"updated_at": {"$gte": cursor_at}},
+        ]}),
+        RouteQuery("similarity index load", "alerts", INDEXED_ALERTS_QUERY),
+        RouteQuery("similarity index sync (embedded)", "alert_embeddings",
+                   {"created_at": {"$gte": cursor_at}}),
+        RouteQuery("similarity index sync (created)", "alerts", {**INDEXED_ALERTS_QUERY, "$or": [
+            {"created_at": {"$gte": cursor_at}}, {"_id": {"$in": [cursor_id]}},
+        ]}),
+        RouteQuery("similarity index sync (deactivated)", "alerts",
+                   {"is_active": False, "updated_at": {"$gte": cursor_at}}),
+        RouteQuery("similarity prefilter species", "alerts", build_alert_filter(species="dog")),
+        RouteQuery("similarity prefilter last seen", "alerts",
+                   build_alert_filter(last_seen_after=cursor_at - timedelta(days=7))),
+        RouteQuery("similarity prefilter place", "alerts",
+                   build_alert_filter(lon=point[0], lat=point[1], radius_m=5000)),
+        RouteQuery("report index load", "alerts", INDEXED_REPORTS_QUERY),
+        RouteQuery("recent found/sighting reports", "alerts",
+                   {**INDEXED_REPORTS_QUERY, "created_at": {"$gte": cursor_at}}),
+        RouteQuery("GET /reports/{id}/matches (missing)", "alert_matches",
+                   {"missing_alert_id": cursor_id}, [("score", -1)], 10),
+        RouteQuery("GET /reports/{id}/matches (found)", "alert_matches",
+                   {"report_alert_id": cursor_id}, [("score", -1)], 10),
+        RouteQuery("report job claim", "report_jobs", {"$or": [
+            {"status": "queued", "retry_at": {"$not": {"$gt": cursor_at}}},
+            {"status": "running", "lease_expires_at": {"$lt": cursor_at}, "attempts": {"$lt": 3}},
+        ]}, [("created_at", 1)], 1),
+        RouteQuery("report job abandoned", "report_jobs",
+                   {"status": "running", "lease_expires_at": {"$lt": cursor_at}, "attempts": {"$gte": 3}}),
+        RouteQuery("login", "users", {"email": "owner@example.com"}, limit=1),
+        RouteQuery("token revocation sync (revoked)", "revoked_users", {"revoked_at": {"$gte": cursor_at}}),
+        RouteQuery("token revocation sync (inactive)", "users", {"is_active": False}),
+    ]
+
+
+def winning_stages(explain: dict) -> List[str]:
+    """Every stage name in the winning plan(s) of an explain document."""
+    stages: List[str] = []
+
+    def collect(node):
+        if isinstance(node, dict):
+            if isinstance(node.get("stage"), str):
+                stages.append(node["stage"])
+            for value in node.values():
+                collect(value)
+        elif isinstance(node, list):
+            for value in node:
+                collect(value)
+
+    def find_plans(node):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key == "winningPlan":
+                    collect(value)
+                else:
+                    find_plans(value)
+        elif isinstance(node, list):
+            for value in node:
+                find_plans(value)
+
+    find_plans(explain)
+    return stages
+
+
+async def explain(db, query: RouteQuery) -> dict:
+    if query.pipeline is not None:
+        return await db.command("aggregate", query.collection, pipeline=query.pipeline,
+                                explain=True)
+    cursor = db[query.collection].find(query.filter)
+    if query.sort:
+        cursor = cursor.sort(query.sort)
+    if query.limit:
+        cursor = cursor.limit(query.limit)
+    return await cursor.explain()
+
+
+async def seed(db, user_id: ObjectId, count: int = 200):
+    """Enough varied documents that the planner has real choices to make."""
+    rng = random.Random(0)
+    now = datetime.now()
+    alerts = []
+    for i in range(count):
+        created_at = now - timedelta(minutes=i)
+        active = rng.random() < 0.8
+        alerts.append({
+            "pet_id": ObjectId(),
+            "alert_type": "missing" if rng.random() < 0.9 else "found",
+            "title": f"Missing pet {i}",
+            "description": "synthetic",
+            "location": {"type": "Point", "coordinates": [
+                -122.42 + rng.uniform(-0.1, 0.1), 37.77 + rng.uniform(-0.1, 0.1)
+            ]},
+            "species": rng.choice(["dog", "cat", "bird"]),
+            "color": rng.choice(["brown", "black", "white", None]),
+            "place_tokens": rng.choice([["mission", "district"], ["sunset"], ["noe", "valley"], []]),
+            "last_seen_date": created_at - timedelta(days=rng.randint(0, 30)),
+            "contact_info": "owner@example.com",
+            "photos": [],
+            "is_active": active,
+            "created_by": user_id if i % 10 == 0 else ObjectId(),
+            "created_at": created_at,
+            "updated_at": created_at if active else now,
+        })
+    await db.alerts.insert_many(alerts)
+    await db.report_jobs.insert_many([
+        {"status": rng.choice(["queued", "running", "completed"]), "lease_expires_at": now,
+         "created_at": now - timedelta(seconds=i)}
+        for i in range(50)
+    ])
+    await db.alert_matches.insert_many([
+        {"missing_alert_id": ObjectId(), "report_alert_id": ObjectId(), "score": rng.random(), "created_at": now}
+        for _ in range(50)
+    ])
+    await db.alert_embeddings.insert_many([
+        {"_id": alert["_id"], "image_embedding": None, "text_embedding": None, "created_at": alert["created_at"]}
+        for alert in alerts
+    ])
+    await db.users.insert_many([{"email": "owner@example.com", "created_at": now, "is_active": True}] + [
+        {"email": f"user{i}@example.com", "created_at": now, "is_active": i % 20 != 0} for i in range(100)
+    ])
+    await db.revoked_users.insert_many([
+        {"_id": str(ObjectId()), "revoked_at": now - timedelta(hours=i)} for i in range(20)
+    ])
+
+
+async def check(db) -> List[str]:
+    """Apply indexes, seed, explain; returns one failure message per bad plan."""
+    await apply_index_migrations(db)
+    user_id = ObjectId()
+    await seed(db, user_id)
+    last = await db.alerts.find({}, {"created_at": 1}).sort(CREATED_SORT).skip(50).limit(1).to_list(length=1)
+
+    failures = []
+    for query in route_queries(user_id, last[0]["created_at"], last[0]["_id"]):
+        stages = winning_stages(await explain(db, query))
+        bad = sorted(FORBIDDEN_STAGES.intersection(stages))
+        status = "❌" if bad else "✅"
+        print(f"{status} {query.name}: {' <- '.join(stages) or 'no plan'}")
+        if bad:
+            failures.append(f"{query.name} uses {', '.join(bad)}")
+    return failures
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch database afterwards")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    name = f"{settings.DATABASE_NAME}_explain_check"
+    try:
+        await client.drop_database(name)
+        failures = await check(client[name])
+        if not args.keep:
+            await client.drop_database(name)
+    finally:
+        client.close()
+
+    if failures:
+        print(f"❌ {len(failures)} route queries regressed:")
+        for failure in failures:
+            print(f"   - {failure}")
+        return 1
+    print("✅ All route queries are index-backed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
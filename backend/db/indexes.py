@@ -0,0 +1,172 @@
+"""Versioned index migrations.
+
+Each entry in ``INDEX_MIGRATIONS`` is applied once, in order, and recorded in
+the ``index_migrations`` collection, so a deployment only builds (or drops)
+what changed since it last started. Indexes are named explicitly so later
+versions can drop them. Usage (from backend/):
+
+    python -m db.indexes            # apply pending versions
+    python -m db.indexes --status   # list applied / pending versions
+
+Add a new version instead of editing an applied one. ``python -m
+db.explain_check`` verifies that every route query is served by these
+indexes.
+"""
+import argparse
+import asyncio
+from datetime import datetime
+from typing import List, NamedTuple, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from core.config import settings
+
+MIGRATIONS_COLLECTION = "index_migrations"
+
+# Partial filter shared by the indexes behind the public missing-pet listings
+# and the similarity index; inactive and found alerts never enter them.
+ACTIVE_MISSING = {"is_active": True, "alert_type": "missing"}
+
+
+class IndexSpec(NamedTuple):
+    collection: str
+    keys: List[Tuple[str, object]]
+    options: dict
+
+
+class IndexMigration(NamedTuple):
+    version: int
+    description: str
+    create: List[IndexSpec]
+    drop: List[Tuple[str, str]]  # (collection, index name)
+
+
+def _index(collection: str, keys, name: str, **options) -> IndexSpec:
+    if isinstance(keys, str):
+        keys = [(keys, 1)]
+    return IndexSpec(collection, keys, {"name": name, **options})
+
+
+INDEX_MIGRATIONS: List[IndexMigration] = [
+    IndexMigration(1, "Baseline single-field indexes", create=[
+        _index("users", "email", "email_1", unique=True),
+        _index("users", "created_at", "created_at_1"),
+        _index("pets", "owner_id", "owner_id_1"),
+        _index("pets", "is_missing", "is_missing_1"),
+        _index("pets", "species", "species_1"),
+        _index("pets", "created_at", "created_at_1"),
+        _index("alerts", "pet_id", "pet_id_1"),
+        _index("alerts", "alert_type", "alert_type_1"),
+        _index("alerts", "is_active", "is_active_1"),
+        _index("alerts", "created_at", "created_at_1"),
+        _index("alerts", [("location", "2dsphere")], "location_2dsphere"),
+        _index("alerts", "species", "species_1"),
+        _index("alerts", "last_seen_date", "last_seen_date_1"),
+        # Report jobs are claimed oldest-first by status
+        _index("report_jobs", [("status", 1), ("created_at", 1)], "status_1_created_at_1"),
+    ], drop=[]),
+    IndexMigration(2, "Compound and partial indexes shaped after route queries", create=[
+        # GET /reports/missing and index load/sync: equality on
+        # {alert_type, is_active}, newest first, (created_at, _id) keyset
+        _index("alerts", [("alert_type", 1), ("is_active", 1), ("created_at", -1), ("_id", -1)],
+               "alert_type_is_active_created_at_id"),
+        # GET /reports/my-reports: one owner's alerts, newest first
+        _index("alerts", [("created_by", 1), ("created_at", -1), ("_id", -1)],
+               "created_by_created_at_id"),
+        # Species-filtered listings and similarity prefilters only ever look
+        # at active missing alerts
+        _index("alerts", [("species", 1), ("created_at", -1), ("_id", -1)],
+               "active_missing_species_created_at_id", partialFilterExpression=ACTIVE_MISSING),
+        _index("alerts", [("last_seen_date", 1)],
+               "active_missing_last_seen_date", partialFilterExpression=ACTIVE_MISSING),
+        # Embedding index sync polls for recently deactivated alerts
+        _index("alerts", [("updated_at", 1)],
+               "inactive_updated_at", partialFilterExpression={"is_active": False}),
+    ], drop=[
+        # Superseded by the compound/partial indexes above; low-cardinality
+        # single-field indexes only led the planner into index intersections
+        ("alerts", "alert_type_1"),
+        ("alerts", "is_active_1"),
+        ("alerts", "created_at_1"),
+        ("alerts", "species_1"),
+        ("alerts", "last_seen_date_1"),
+    ]),
+    IndexMigration(3, "Normalized color and place-name token filters", create=[
+        # GET /reports/missing?color=...&location=...; place_tokens is multikey
+        _index("alerts", [("color", 1), ("created_at", -1), ("_id", -1)],
+               "active_missing_color_created_at_id", partialFilterExpression=ACTIVE_MISSING),
+        _index("alerts", [("place_tokens", 1), ("created_at", -1), ("_id", -1)],
+               "active_missing_place_tokens_created_at_id", partialFilterExpression=ACTIVE_MISSING),
+    ], drop=[]),
+    IndexMigration(4, "Incremental map export", create=[
+        # GET /alerts/export?updated_since=...: alerts changed since a sync point
+        _index("alerts", [("alert_type", 1), ("updated_at", 1)], "alert_type_updated_at"),
+    ], drop=[]),
+    IndexMigration(5, "Found/sighting match candidates", create=[
+        _index("alert_matches", [("missing_alert_id", 1), ("report_alert_id", 1)],
+               "missing_alert_id_report_alert_id", unique=True),
+        # GET /reports/{alert_id}/matches from either side, best first
+        _index("alert_matches", [("missing_alert_id", 1), ("score", -1)], "missing_alert_id_score"),
+        _index("alert_matches", [("report_alert_id", 1), ("score", -1)], "report_alert_id_score"),
+    ], drop=[]),
+    IndexMigration(6, "Embedding index sync by embedding time", create=[
+        # Index sync polls for vectors stored since the last sync
+        _index("alert_embeddings", "created_at", "created_at_1"),
+    ], drop=[]),
+    IndexMigration(7, "Token revocation sync", create=[
+        # Every worker polls recent revocations and deactivated users
+        _index("revoked_users", "revoked_at", "revoked_at_1"),
+        _index("users", [("is_active", 1)], "inactive_users", partialFilterExpression={"is_active": False}),
+    ], drop=[]),
+]
+
+
+async def applied_versions(db) -> List[int]:
+    return sorted([doc["_id"] async for doc in db[MIGRATIONS_COLLECTION].find({}, {"_id": 1})])
+
+
+async def apply_index_migrations(db) -> List[int]:
+    """Apply every pending version in order; returns the versions applied."""
+    done = set(await applied_versions(db))
+    applied = []
+    for migration in INDEX_MIGRATIONS:
+        if migration.version in done:
+            continue
+        for spec in migration.create:
+            await db[spec.collection].create_index(spec.keys, **spec.options)
+        for collection, name in migration.drop:
+            existing = await db[collection].index_information()
+            if name in existing:
+                await db[collection].drop_index(name)
+        # Upsert: several workers may start at once and race through the same version
+        await db[MIGRATIONS_COLLECTION].replace_one({"_id": migration.version}, {
+            "_id": migration.version,
+            "description": migration.description,
+            "applied_at": datetime.now(),
+        }, upsert=True)
+        applied.append(migration.version)
+    return applied
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--status", action="store_true", help="Show versions without applying")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    try:
+        db = client[settings.DATABASE_NAME]
+        if args.status:
+            done = set(await applied_versions(db))
+            for migration in INDEX_MIGRATIONS:
+                state = "applied" if migration.version in done else "pending"
+                print(f"{migration.version:>3}  {state:<8} {migration.description}")
+            return
+        applied = await apply_index_migrations(db)
+    finally:
+        client.close()
+    print(f"✅ Applied index versions: {applied or 'none (up to date)'}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
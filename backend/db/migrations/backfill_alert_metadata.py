@@ -0,0 +1,68 @@
+"""Copy species, color, place and last_seen_date from pets onto their alerts.
+
+List filters and similarity search filter on these normalized alert fields;
+alerts created before they were denormalized lack them. Usage (from backend/):
+
+    python -m db.migrations.backfill_alert_metadata [--batch-size 500]
+
+Only alerts without a ``species`` or ``color`` field are selected, so the
+command can be re-run safely.
+"""
+import argparse
+import asyncio
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+from core.config import settings
+from core.search_terms import normalize_term, place_tokens
+
+MISSING_METADATA_QUERY = {"$or": [{"species": {"$exists": False}}, {"color": {"$exists": False}}]}
+
+
+async def migrate(db, batch_size: int = 500) -> int:
+    """Backfill alerts in batches; returns the number of alerts updated."""
+    updated = 0
+    while True:
+        alerts = await db.alerts.find(MISSING_METADATA_QUERY, {"pet_id": 1}).limit(batch_size).to_list(length=batch_size)
+        if not alerts:
+            break
+
+        pets = await db.pets.find(
+            {"_id": {"$in": [alert["pet_id"] for alert in alerts]}},
+            {"species": 1, "color": 1, "last_seen_place": 1, "last_seen_date": 1},
+        ).to_list(length=None)
+        pets_by_id = {pet["_id"]: pet for pet in pets}
+
+        updates = []
+        for alert in alerts:
+            pet = pets_by_id.get(alert["pet_id"], {})
+            updates.append(UpdateOne({"_id": alert["_id"]}, {"$set": {
+                # Orphaned alerts get null fields so they are not selected again
+                "species": normalize_term(pet.get("species")),
+                "color": normalize_term(pet.get("color")),
+                "place_name": pet.get("last_seen_place"),
+                "place_tokens": place_tokens(pet.get("last_seen_place")),
+                "last_seen_date": pet.get("last_seen_date"),
+            }}))
+        await db.alerts.bulk_write(updates, ordered=False)
+        updated += len(updates)
+        print(f"Backfilled {updated} alerts...")
+    return updated
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    try:
+        updated = await migrate(client[settings.DATABASE_NAME], args.batch_size)
+    finally:
+        client.close()
+    print(f"✅ Backfilled species/color/place/last_seen_date on {updated} alerts")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
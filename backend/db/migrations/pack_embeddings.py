@@ -0,0 +1,141 @@
+"""Convert stored embeddings from BSON double arrays to packed Binary.
+
+Usage (from backend/):
+
+    python -m db.migrations.pack_embeddings [--format float16|int8] [--batch-size 500] [--dry-run]
+
+Only documents whose vectors are still arrays are selected, so the command
+is resumable: re-running it after an interruption picks up the remainder.
+At the end it reports the storage saved and how far similarity scores
+moved because of the lower precision. ``--dry-run`` computes the same
+report on the first batch without writing anything.
+"""
+import argparse
+import asyncio
+
+import numpy as np
+from bson import encode
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+from core.config import settings
+from core.embeddings import pack_embedding, unpack_embedding
+from db.embedding_store import EMBEDDINGS_COLLECTION
+
+UNPACKED_QUERY = {
+    "$or": [
+        {"image_embedding": {"$type": "array"}},
+        {"text_embedding": {"$type": "array"}},
+    ]
+}
+VECTOR_FIELDS = ("image_embedding", "text_embedding")
+
+
+class PackReport:
+    """Running totals for the storage and accuracy report."""
+
+    def __init__(self):
+        self.documents = 0
+        self.bytes_before = 0
+        self.bytes_after = 0
+        self.cosines = {field: [] for field in VECTOR_FIELDS}
+        self.score_deltas = {field: [] for field in VECTOR_FIELDS}
+
+    def add_batch(self, originals: dict, decoded: dict):
+        for field in VECTOR_FIELDS:
+            if not originals[field]:
+                continue
+            before = np.vstack(originals[field]).astype(np.float64)
+            after = np.vstack(decoded[field]).astype(np.float64)
+            before /= np.maximum(np.linalg.norm(before, axis=1, keepdims=True), 1e-12)
+            after /= np.maximum(np.linalg.norm(after, axis=1, keepdims=True), 1e-12)
+            self.cosines[field].extend(np.sum(before * after, axis=1).tolist())
+            # Pairwise similarity drift within the batch approximates the
+            # change in query-vs-alert scores
+            sample = slice(0, 64)
+            delta = np.abs(before[sample] @ before[sample].T - after[sample] @ after[sample].T)
+            self.score_deltas[field].extend(delta[np.triu_indices(len(delta), k=1)].tolist())
+
+    def summary(self) -> dict:
+        result = {
+            "documents": self.documents,
+            "bytes_before": self.bytes_before,
+            "bytes_after": self.bytes_after,
+            "saved_ratio": 1 - self.bytes_after / self.bytes_before if self.bytes_before else 0.0,
+        }
+        for field in VECTOR_FIELDS:
+            cosines = self.cosines[field]
+            deltas = self.score_deltas[field]
+            result[field] = {
+                "vectors": len(cosines),
+                "min_cosine_to_original": min(cosines) if cosines else None,
+                "mean_cosine_to_original": float(np.mean(cosines)) if cosines else None,
+                "mean_abs_score_delta": float(np.mean(deltas)) if deltas else None,
+                "max_abs_score_delta": max(deltas) if deltas else None,
+            }
+        return result
+
+
+async def migrate(db, storage_format: str, batch_size: int = 500, dry_run: bool = False) -> dict:
+    """Pack array-encoded vectors in batches and return the report summary."""
+    collection = db[EMBEDDINGS_COLLECTION]
+    report = PackReport()
+    while True:
+        docs = await collection.find(UNPACKED_QUERY).limit(batch_size).to_list(length=batch_size)
+        if not docs:
+            break
+
+        updates = []
+        originals = {field: [] for field in VECTOR_FIELDS}
+        decoded = {field: [] for field in VECTOR_FIELDS}
+        for doc in docs:
+            packed = dict(doc)
+            for field in VECTOR_FIELDS:
+                value = doc.get(field)
+                if isinstance(value, list):
+                    packed[field] = pack_embedding(value, storage_format)
+                    originals[field].append(np.asarray(value, dtype=np.float64))
+                    decoded[field].append(unpack_embedding(packed[field]))
+            report.bytes_before += len(encode(doc))
+            report.bytes_after += len(encode(packed))
+            updates.append(UpdateOne(
+                {"_id": doc["_id"]},
+                {"$set": {field: packed[field] for field in VECTOR_FIELDS if field in packed}},
+            ))
+        report.documents += len(docs)
+        report.add_batch(originals, decoded)
+
+        if dry_run:
+            break
+        await collection.bulk_write(updates, ordered=False)
+        print(f"Packed {report.documents} embedding documents...")
+    return report.summary()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--format", choices=["float16", "int8"], default=settings.EMBEDDING_STORAGE_FORMAT
+                        if settings.EMBEDDING_STORAGE_FORMAT in ("float16", "int8") else "float16")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true", help="Report on the first batch without writing")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    try:
+        summary = await migrate(client[settings.DATABASE_NAME], args.format, args.batch_size, args.dry_run)
+    finally:
+        client.close()
+
+    print(f"✅ {'Would pack' if args.dry_run else 'Packed'} {summary['documents']} documents as {args.format}")
+    print(f"   Storage: {summary['bytes_before']} -> {summary['bytes_after']} bytes "
+          f"({summary['saved_ratio']:.1%} saved)")
+    for field in VECTOR_FIELDS:
+        stats = summary[field]
+        if stats["vectors"]:
+            print(f"   {field}: min cosine {stats['min_cosine_to_original']:.6f}, "
+                  f"mean |score delta| {stats['mean_abs_score_delta']:.6f}, "
+                  f"max |score delta| {stats['max_abs_score_delta']:.6f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
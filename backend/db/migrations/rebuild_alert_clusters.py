@@ -0,0 +1,71 @@
+"""Rebuild the map cluster aggregates from the active missing alerts.
+
+``alert_clusters`` is kept current incrementally by the report and found
+routes; run this once after deploying the clusters endpoint, or whenever the
+counts may have drifted (e.g. alerts edited directly in the database).
+Usage (from backend/):
+
+    python -m db.migrations.rebuild_alert_clusters [--batch-size 1000]
+
+Cells are computed into a scratch collection that then replaces
+``alert_clusters``, so readers never see a half-built set.
+"""
+import argparse
+import asyncio
+from collections import Counter, defaultdict
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from core import geohash
+from core.clusters import ALERT_CLUSTERS_COLLECTION, species_key
+from core.config import settings
+
+
+async def rebuild(db, batch_size: int = 1000) -> int:
+    """Recompute every cell; returns the number of alerts counted."""
+    cells = defaultdict(lambda: {"count": 0, "lon_sum": 0.0, "lat_sum": 0.0, "species": Counter()})
+    counted = 0
+    cursor = db.alerts.find(
+        {"is_active": True, "alert_type": "missing"}, {"location": 1, "species": 1}
+    ).batch_size(batch_size)
+    async for alert in cursor:
+        if not alert.get("location"):
+            continue
+        lon, lat = alert["location"]["coordinates"]
+        cell = geohash.encode(lat, lon, settings.CLUSTER_MAX_PRECISION)
+        for precision in range(1, settings.CLUSTER_MAX_PRECISION + 1):
+            aggregate = cells[cell[:precision]]
+            aggregate["count"] += 1
+            aggregate["lon_sum"] += lon
+            aggregate["lat_sum"] += lat
+            aggregate["species"][species_key(alert.get("species"))] += 1
+        counted += 1
+
+    scratch = db[f"{ALERT_CLUSTERS_COLLECTION}_rebuild"]
+    await scratch.drop()
+    documents = [{"_id": cell_id, **aggregate, "species": dict(aggregate["species"])}
+                 for cell_id, aggregate in cells.items()]
+    for start in range(0, len(documents), batch_size):
+        await scratch.insert_many(documents[start:start + batch_size], ordered=False)
+    if documents:
+        await scratch.rename(ALERT_CLUSTERS_COLLECTION, dropTarget=True)
+    else:
+        await db[ALERT_CLUSTERS_COLLECTION].drop()
+    return counted
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    try:
+        counted = await rebuild(client[settings.DATABASE_NAME], args.batch_size)
+    finally:
+        client.close()
+    print(f"✅ Rebuilt alert clusters from {counted} active alerts")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""Move inline alert embeddings into the alert_embeddings collection.
+
+Usage (from backend/):
+
+    python -m db.migrations.split_embeddings [--batch-size 500] [--dry-run]
+
+Safe to re-run: each batch copies vectors into the embedding store before
+unsetting them on the alert, and only alerts that still carry vectors are
+selected, so an interrupted run resumes where it stopped.
+"""
+import argparse
+import asyncio
+from datetime import datetime
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReplaceOne, UpdateOne
+
+from core.config import settings
+from core.embeddings import pack_embedding
+from db.embedding_store import EMBEDDINGS_COLLECTION
+
+INLINE_EMBEDDINGS_QUERY = {
+    "$or": [
+        {"image_embedding": {"$exists": True}},
+        {"text_embedding": {"$exists": True}},
+    ]
+}
+
+
+async def migrate(db, batch_size: int = 500, dry_run: bool = False) -> int:
+    """Copy vectors out of alerts in batches; returns the number of alerts moved."""
+    if dry_run:
+        return await db.alerts.count_documents(INLINE_EMBEDDINGS_QUERY)
+
+    storage_format = settings.EMBEDDING_STORAGE_FORMAT
+    moved = 0
+    while True:
+        alerts = await db.alerts.find(
+            INLINE_EMBEDDINGS_QUERY,
+            {"image_embedding": 1, "text_embedding": 1, "created_at": 1},
+        ).limit(batch_size).to_list(length=batch_size)
+        if not alerts:
+            break
+
+        copies = [
+            ReplaceOne(
+                {"_id": alert["_id"]},
+                {
+                    "_id": alert["_id"],
+                    "image_embedding": pack_embedding(alert.get("image_embedding"), storage_format),
+                    "text_embedding": pack_embedding(alert.get("text_embedding"), storage_format),
+                    "created_at": alert.get("created_at") or datetime.now(),
+                },
+                upsert=True,
+            )
+            for alert in alerts
+            if alert.get("image_embedding") is not None or alert.get("text_embedding") is not None
+        ]
+        if copies:
+            await db[EMBEDDINGS_COLLECTION].bulk_write(copies, ordered=False)
+        await db.alerts.bulk_write(
+            [UpdateOne({"_id": alert["_id"]}, {"$unset": {"image_embedding": "", "text_embedding": ""}})
+             for alert in alerts],
+            ordered=False,
+        )
+        moved += len(copies)
+        print(f"Moved embeddings for {moved} alerts...")
+    return moved
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true", help="Only count the alerts that would be moved")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    try:
+        moved = await migrate(client[settings.DATABASE_NAME], args.batch_size, args.dry_run)
+    finally:
+        client.close()
+    print(f"✅ {'Would move' if args.dry_run else 'Moved'} embeddings for {moved} alerts")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
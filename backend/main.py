@@ -2,18 +2,46 @@ from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
+import os
 
+from core.alert_stream import alert_stream
 from core.config import settings
-from db.database import connect_to_mongo, close_mongo_connection
+from core.embeddings import inference_executor, inference_stats
+from core.http_client import start_http_client, close_http_client
+from core.metrics import MetricsMiddleware, mark_process_dead, metrics_response
+from core.principal_cache import principal_cache, run_revocation_sync
+from core.security import password_hasher
+from core.report_jobs import report_jobs
+from core.vector_index import run_periodic_sync
+from db.database import connect_to_mongo, close_mongo_connection, get_database
 from api import api_router
+from api.routes.reports import process_report_job
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await connect_to_mongo()
+    await start_http_client()
+    report_jobs.start(get_database, process_report_job, settings.REPORT_JOB_WORKERS)
+    await alert_stream.start(get_database())
+    index_sync = asyncio.create_task(
+        run_periodic_sync(get_database, settings.EMBEDDING_INDEX_SYNC_SECONDS)
+    )
+    revocation_sync = asyncio.create_task(
+        run_revocation_sync(get_database, settings.AUTH_REVOCATION_SYNC_SECONDS)
+    )
     yield
     # Shutdown
+    await report_jobs.stop()
+    await alert_stream.stop()
+    index_sync.cancel()
+    revocation_sync.cancel()
+    inference_executor.shutdown()
+    password_hasher.shutdown()
+    await close_http_client()
     close_mongo_connection()
+    mark_process_dead()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -30,16 +58,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency and in-flight metrics (served at /metrics)
+app.add_middleware(MetricsMiddleware)
+
 # Include API router
 app.include_router(api_router)
 
 # Serve static files (e.g., images for testing) from /static
 app.mount("/images", StaticFiles(directory="static/images"), name="images")
 
+# Photos uploaded through bulk intake
+os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
+
 @app.get("/")
 async def root():
     return {"message": "Pet Alert API", "version": "1.0.0"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics"""
+    return metrics_response()
+
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "inference": inference_stats(),
+        "auth": principal_cache.stats(),
+        "passwords": password_hasher.stats(),
+        "live_alerts": alert_stream.stats(),
+    }
@@ -1,8 +1,8 @@
 from .auth import UserCreate, UserResponse, Token, TokenData
-from .pet import PetCreate, PetUpdate, PetResponse, AlertCreate, AlertUpdate, AlertResponse
+from .pet import PetCreate, PetUpdate, PetResponse, AlertCreate, AlertUpdate, AlertResponse, AlertPage
 
 __all__ = [
     "UserCreate", "UserResponse", "Token", "TokenData",
     "PetCreate", "PetUpdate", "PetResponse", 
-    "AlertCreate", "AlertUpdate", "AlertResponse"
+    "AlertCreate", "AlertUpdate", "AlertResponse", "AlertPage"
 ]
@@ -9,6 +9,7 @@ class PetBase(BaseModel):
     description: Optional[str] = None # short free text
     photo_url: str                    # required: uploaded picture
     last_seen_location: dict          # geo point (lat, lon)
+    last_seen_place: Optional[str] = None  # place name, e.g. "Mission District, San Francisco"
     last_seen_date: datetime
 
 class PetCreate(PetBase):
@@ -71,3 +72,7 @@ class AlertResponse(AlertBase):
 
     class Config:
         from_attributes = True
+
+class AlertPage(BaseModel):
+    items: List[AlertResponse]
+    next_cursor: Optional[str] = None  # None on the last page
@@ -0,0 +1,5 @@
+import os
+
+# Deterministic stand-in vectors instead of loading CLIP/MiniLM; must be set
+# before core.config is imported
+os.environ.setdefault("EMBEDDING_BACKEND", "stub")
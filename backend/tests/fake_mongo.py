@@ -0,0 +1,183 @@
+"""Just enough of Motor's collection API to exercise the Mongo-backed helpers
+without a server: find/insert/replace/update/find_one_and_update/bulk_write
+with equality, $in, $not, $gte/$lt style comparisons and top-level $or/$and."""
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.results import InsertOneResult
+
+_COMPARISONS = {
+    "$gte": lambda a, b: a is not None and a >= b,
+    "$gt": lambda a, b: a is not None and a > b,
+    "$lte": lambda a, b: a is not None and a <= b,
+    "$lt": lambda a, b: a is not None and a < b,
+    "$ne": lambda a, b: a != b,
+    "$in": lambda a, b: a in b,
+    "$not": lambda a, b: not _compare(a, b),
+}
+
+
+def _compare(value: Any, condition: dict) -> bool:
+    return all(_COMPARISONS[op](value, operand) for op, operand in condition.items())
+
+
+def _get(document: dict, path: str) -> Any:
+    value: Any = document
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def matches(document: dict, query: dict) -> bool:
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(document, clause) for clause in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(document, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict) and condition and all(op.startswith("$") for op in condition):
+            if not _compare(_get(document, key), condition):
+                return False
+        elif _get(document, key) != condition:
+            return False
+    return True
+
+
+def _apply_update(document: dict, update: dict, inserting: bool):
+    for path, value in {**update.get("$set", {}), **(update.get("$setOnInsert", {}) if inserting else {})}.items():
+        _set(document, path, value)
+    for path, delta in update.get("$inc", {}).items():
+        _set(document, path, (_get(document, path) or 0) + delta)
+
+
+def _set(document: dict, path: str, value: Any):
+    *parents, last = path.split(".")
+    for part in parents:
+        document = document.setdefault(part, {})
+    document[last] = value
+
+
+def _project(document: dict, projection: Optional[dict]) -> dict:
+    if not projection:
+        return dict(document)
+    return {key: value for key, value in document.items() if key == "_id" or projection.get(key)}
+
+
+class FakeCursor:
+    def __init__(self, documents: List[dict]):
+        self._documents = documents
+
+    def batch_size(self, size: int) -> "FakeCursor":
+        return self
+
+    def sort(self, *args, **kwargs) -> "FakeCursor":
+        return self
+
+    def limit(self, count: int) -> "FakeCursor":
+        if count:
+            self._documents = self._documents[:count]
+        return self
+
+    async def to_list(self, length: Optional[int] = None) -> List[dict]:
+        return list(self._documents if length is None else self._documents[:length])
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self._documents:
+            yield document
+
+
+class UpdateResult:
+    def __init__(self, matched_count: int, modified_count: int):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+
+
+class FakeCollection:
+    def __init__(self):
+        self.documents: Dict[Any, dict] = {}
+
+    def find(self, query: Optional[dict] = None, projection: Optional[dict] = None) -> FakeCursor:
+        return FakeCursor([
+            _project(document, projection) for document in self.documents.values() if matches(document, query or {})
+        ])
+
+    async def find_one(self, query: dict, projection: Optional[dict] = None) -> Optional[dict]:
+        found = await self.find(query, projection).to_list(1)
+        return found[0] if found else None
+
+    async def insert_one(self, document: dict):
+        document.setdefault("_id", ObjectId())
+        self.documents[document["_id"]] = document
+        return InsertOneResult(document["_id"], acknowledged=True)
+
+    async def insert_many(self, documents: List[dict], ordered: bool = True):
+        for document in documents:
+            await self.insert_one(document)
+
+    async def replace_one(self, query: dict, document: dict, upsert: bool = False):
+        for key, existing in list(self.documents.items()):
+            if matches(existing, query):
+                self.documents[key] = {"_id": key, **document}
+                return
+        if upsert:
+            await self.insert_one(dict(document))
+
+    async def update_one(self, query: dict, update: dict, upsert: bool = False) -> UpdateResult:
+        for existing in self.documents.values():
+            if matches(existing, query):
+                _apply_update(existing, update, inserting=False)
+                return UpdateResult(1, 1)
+        if upsert:
+            document = {key: value for key, value in query.items() if not key.startswith("$")}
+            _apply_update(document, update, inserting=True)
+            await self.insert_one(document)
+        return UpdateResult(0, 0)
+
+    async def update_many(self, query: dict, update: dict) -> UpdateResult:
+        matched = [document for document in self.documents.values() if matches(document, query)]
+        for document in matched:
+            _apply_update(document, update, inserting=False)
+        return UpdateResult(len(matched), len(matched))
+
+    async def find_one_and_update(self, query: dict, update: dict, sort=None, return_document=None):
+        # Documents are kept in insertion order, which the tests use as created_at order
+        for document in self.documents.values():
+            if matches(document, query):
+                _apply_update(document, update, inserting=False)
+                return dict(document)
+        return None
+
+    async def delete_many(self, query: dict):
+        for key in [key for key, document in self.documents.items() if matches(document, query)]:
+            del self.documents[key]
+
+    async def bulk_write(self, requests: list, ordered: bool = True):
+        # pymongo keeps the operation's arguments in private attributes
+        for request in requests:
+            if isinstance(request, UpdateOne):
+                await self.update_one(request._filter, request._doc, upsert=request._upsert)
+            elif isinstance(request, ReplaceOne):
+                await self.replace_one(request._filter, request._doc, upsert=request._upsert)
+            else:
+                raise NotImplementedError(type(request).__name__)
+
+
+class FakeDatabase:
+    def __init__(self):
+        self._collections: Dict[str, FakeCollection] = defaultdict(FakeCollection)
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        return self._collections[name]
+
+    def __getattr__(self, name: str) -> FakeCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self._collections[name]
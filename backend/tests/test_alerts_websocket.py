@@ -0,0 +1,21 @@
+from fastapi.testclient import TestClient
+
+from core.alert_stream import alert_stream
+from main import app
+
+
+def test_websocket_answers_bad_frames_and_keeps_the_subscription(monkeypatch):
+    moves = []
+    monkeypatch.setattr(alert_stream, "move", lambda subscription, *region: moves.append(region))
+
+    with TestClient(app).websocket_connect("/api/v1/alerts/ws?lon=10&lat=20&radius_m=500") as websocket:
+        websocket.send_text("not json")
+        assert "error" in websocket.receive_json()
+        websocket.send_json({"lon": 500, "lat": 0})
+        assert "error" in websocket.receive_json()
+
+        # The connection survived both; a valid frame moves the region
+        websocket.send_json({"lon": 11, "lat": 21, "radius_m": 800})
+        websocket.send_text("[]")
+        assert "error" in websocket.receive_json()
+    assert moves == [(11, 21, 800)]
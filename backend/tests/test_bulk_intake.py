@@ -0,0 +1,100 @@
+import asyncio
+import json
+from io import BytesIO
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException, UploadFile
+from fastapi.testclient import TestClient
+from PIL import Image
+from starlette.datastructures import Headers
+
+import api.routes.reports as reports
+from api.routes.auth import get_current_user
+from api.routes.reports import _read_uploads
+from core.config import settings
+from core.embeddings import image_batch_to_embeddings
+from core.vector_index import INDEXED_REPORTS_QUERY, EmbeddingIndex
+from main import app
+from schemas.auth import UserResponse
+from tests.fake_mongo import FakeDatabase
+
+
+def _upload(name: str, data: bytes, content_type: str = "image/png") -> UploadFile:
+    return UploadFile(BytesIO(data), filename=name, headers=Headers({"content-type": content_type}))
+
+
+def test_read_uploads_reports_per_file_rejections():
+    uploads = asyncio.run(_read_uploads([
+        _upload("ok.png", b"png"),
+        _upload("doc.pdf", b"pdf", "application/pdf"),
+        _upload("huge.png", b"x" * (settings.MAX_FILE_SIZE + 1)),
+    ]))
+    assert uploads["ok.png"] == ("image/png", b"png")
+    assert isinstance(uploads["doc.pdf"], ValueError)
+    assert isinstance(uploads["huge.png"], ValueError)
+
+
+def test_read_uploads_limits_file_count_and_total_size(monkeypatch):
+    monkeypatch.setattr(settings, "BULK_INTAKE_MAX_FILES", 2)
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(_read_uploads([_upload(f"{i}.png", b"png") for i in range(3)]))
+    assert error.value.status_code == 413
+
+    monkeypatch.setattr(settings, "BULK_INTAKE_MAX_UPLOAD_BYTES", 5)
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(_read_uploads([_upload("a.png", b"abc"), _upload("b.png", b"def")]))
+    assert error.value.status_code == 413
+
+
+def test_bulk_found_records_are_filed_as_found_and_matched(monkeypatch, tmp_path):
+    db = FakeDatabase()
+    missing_index = EmbeddingIndex(initial_capacity=4)
+    found_index = EmbeddingIndex(query=INDEXED_REPORTS_QUERY, initial_capacity=4)
+    missing_index.loaded = found_index.loaded = True
+
+    async def get_missing_index(db):
+        return missing_index
+
+    async def get_found_index(db):
+        return found_index
+
+    monkeypatch.setattr(reports, "get_database", lambda: db)
+    monkeypatch.setattr(reports, "embedding_index", missing_index)
+    monkeypatch.setattr(reports, "report_index", found_index)
+    monkeypatch.setattr(reports, "get_embedding_index", get_missing_index)
+    monkeypatch.setattr(reports, "get_report_index", get_found_index)
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    app.dependency_overrides[get_current_user] = lambda: UserResponse(
+        id=str(ObjectId()), email="shelter@example.com", is_active=True
+    )
+
+    photo = BytesIO()
+    Image.new("RGB", (8, 8), (200, 120, 40)).save(photo, format="PNG")
+    photo = photo.getvalue()
+
+    # A missing dog whose photo is the one the shelter uploads
+    missing_id = ObjectId()
+    asyncio.run(db.alerts.insert_one({"_id": missing_id, "alert_type": "missing", "is_active": True}))
+    missing_index.add(missing_id, image_batch_to_embeddings([photo])[0], None)
+
+    record = {"species": "dog", "contact_info": "shelter@example.com", "photo_file": "rex.png",
+              "last_seen_location": {"lon": -122.4, "lat": 37.7}, "last_seen_date": "2026-10-01T12:00:00"}
+    try:
+        response = TestClient(app).post(
+            "/api/v1/reports/bulk",
+            data={"records": json.dumps([record]), "alert_type": "found"},
+            files=[("files", ("rex.png", photo, "image/png"))],
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200, response.text
+    item = response.json()["items"][0]
+    assert item["status"] == "created", item["error"]
+    alert = db.alerts.documents[ObjectId(item["alert_id"])]
+    assert alert["alert_type"] == "found" and alert["title"].startswith("Found")
+    assert db.pets.documents[alert["pet_id"]]["is_missing"] is False
+    assert alert["_id"] in found_index and alert["_id"] not in missing_index
+    [match] = db.alert_matches.documents.values()
+    assert match["missing_alert_id"] == missing_id and match["report_alert_id"] == alert["_id"]
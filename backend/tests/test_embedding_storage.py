@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from bson import BSON
+from bson.binary import Binary
+
+from core.embeddings import FLOAT16_SUBTYPE, INT8_SUBTYPE, pack_embedding, unpack_embedding
+
+
+def _vector(dim: int = 512, seed: int = 0) -> np.ndarray:
+    vector = np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def _cosine(a: np.ndarray, b: np.ndarray) -> float:
+    return float(a @ b / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+@pytest.mark.parametrize("storage_format, subtype, size, min_cosine", [
+    ("float16", FLOAT16_SUBTYPE, 512 * 2, 0.99999),
+    ("int8", INT8_SUBTYPE, 4 + 512, 0.999),
+])
+def test_packed_round_trip(storage_format, subtype, size, min_cosine):
+    vector = _vector()
+    packed = pack_embedding(vector.tolist(), storage_format)
+    assert isinstance(packed, Binary) and packed.subtype == subtype and len(packed) == size
+
+    # Survives a BSON round trip the way Mongo returns it
+    stored = BSON.encode({"v": packed}).decode()["v"]
+    unpacked = unpack_embedding(stored)
+    assert unpacked.dtype == np.float32 and unpacked.shape == vector.shape
+    assert _cosine(vector, unpacked) >= min_cosine
+
+
+def test_legacy_list_and_none():
+    vector = _vector(8)
+    assert pack_embedding(None) is None and unpack_embedding(None) is None
+    stored = pack_embedding(vector.tolist(), "list")
+    assert isinstance(stored, list)
+    np.testing.assert_allclose(unpack_embedding(stored), vector, rtol=1e-6)
+
+
+def test_int8_zero_vector_and_unknown_formats():
+    np.testing.assert_array_equal(unpack_embedding(pack_embedding([0.0] * 4, "int8")), np.zeros(4))
+    with pytest.raises(ValueError):
+        pack_embedding([1.0], "float64")
+    with pytest.raises(ValueError):
+        unpack_embedding(Binary(b"\x00\x00", 0x90))
@@ -0,0 +1,32 @@
+import asyncio
+
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import PyMongoError
+
+from core.config import settings
+from db.explain_check import check
+
+
+# Runs db.explain_check against a local mongod (MONGODB_URL); skipped when none is reachable
+def test_route_queries_are_index_backed():
+    async def scenario():
+        client = AsyncIOMotorClient(settings.MONGODB_URL, serverSelectionTimeoutMS=1000)
+        name = f"{settings.DATABASE_NAME}_explain_test"
+        try:
+            try:
+                await client.admin.command("ping")
+            except PyMongoError:
+                return f"No mongod reachable at {settings.MONGODB_URL}"
+            await client.drop_database(name)
+            try:
+                failures = await check(client[name])
+            finally:
+                await client.drop_database(name)
+        finally:
+            client.close()
+        assert failures == [], "Route queries use COLLSCAN or in-memory SORT: " + "; ".join(failures)
+
+    skipped = asyncio.run(scenario())
+    if skipped:
+        pytest.skip(skipped)
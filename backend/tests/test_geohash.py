@@ -0,0 +1,42 @@
+import pytest
+
+from core import geohash
+from core.clusters import cluster_updates, precision_for_zoom, species_key
+from core.config import settings
+
+
+@pytest.mark.parametrize("lat, lon, expected", [
+    (57.64911, 10.40744, "u4pruydqqvj"),   # geohash.org reference
+    (37.7749, -122.4194, "9q8yyk8yt"),
+    (42.6, -5.6, "ezs42"),                 # Wikipedia example
+])
+def test_encode_known_points(lat, lon, expected):
+    assert geohash.encode(lat, lon, len(expected)) == expected
+    assert geohash.encode(lat, lon, 3) == expected[:3]
+
+
+def test_cell_size_halves_alternately():
+    assert geohash.cell_size(1) == (45.0, 45.0)
+    assert geohash.cell_size(2) == (11.25, 5.625)
+
+
+def test_covering_cells_cover_the_box_and_match_the_count():
+    box = (-122.52, 37.70, -122.35, 37.83)
+    for precision in range(1, 6):
+        cells = geohash.covering_cells(*box, precision)
+        assert len(cells) == len(set(cells)) == geohash.count_cells(*box, precision)
+        for lon in (box[0], box[2]):
+            for lat in (box[1], box[3]):
+                assert geohash.encode(lat, lon, precision) in cells
+
+
+def test_cluster_updates_touch_one_cell_per_precision(monkeypatch):
+    monkeypatch.setattr(settings, "CLUSTER_MAX_PRECISION", 4)
+    alert = {"location": {"coordinates": [-122.4194, 37.7749]}, "species": "dog"}
+    updates = cluster_updates(alert, -1)
+    assert [update._filter["_id"] for update in updates] == ["9", "9q", "9q8", "9q8y"]
+    assert updates[0]._doc["$inc"] == {
+        "count": -1, "lon_sum": 122.4194, "lat_sum": -37.7749, "species.dog": -1,
+    }
+    assert precision_for_zoom(1) == 1 and precision_for_zoom(20) == 4
+    assert species_key("$weird.name") == "weird name" and species_key(None) == "unknown"
@@ -0,0 +1,20 @@
+import asyncio
+
+import pytest
+
+from core import http_client
+from core.config import settings
+from core.http_client import PhotoDownloadError, download_image
+
+
+def test_waiting_for_a_host_slot_counts_against_the_timeout(monkeypatch):
+    monkeypatch.setattr(settings, "HTTP_PER_HOST_CONCURRENCY", 1)
+    monkeypatch.setattr(settings, "PHOTO_DOWNLOAD_TIMEOUT", 0.1)
+
+    async def scenario():
+        async with http_client._host_slot("slow.example.com"):
+            with pytest.raises(PhotoDownloadError, match="Timed out"):
+                await download_image("https://slow.example.com/cat.jpg")
+        assert http_client._host_users == {}
+
+    asyncio.run(scenario())
@@ -0,0 +1,115 @@
+import asyncio
+import os
+import tempfile
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from core.config import settings
+from core.embeddings import (
+    InferenceExecutor, image_batch_to_embeddings, image_bytes_to_embedding, text_batch_to_embeddings,
+    text_to_embedding,
+)
+from core.inference_sidecar import (
+    SidecarClient, SidecarError, _encode_request, _handle, _read_message, _write_message,
+)
+
+
+class _BufferWriter:
+    """StreamWriter stand-in that feeds what is written into a StreamReader."""
+
+    def __init__(self, reader: asyncio.StreamReader):
+        self.reader = reader
+
+    def write(self, data: bytes):
+        self.reader.feed_data(data)
+
+    async def drain(self):
+        pass
+
+
+def _png(color) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (16, 16), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_message_framing_round_trip():
+    async def scenario():
+        reader = asyncio.StreamReader()
+        writer = _BufferWriter(reader)
+        await _write_message(writer, {"op": "images", "sizes": [3, 0, 2]}, b"abcde")
+        await _write_message(writer, {"op": "texts", "texts": ["ünïcode"]})
+        assert await _read_message(reader) == ({"op": "images", "sizes": [3, 0, 2]}, b"abcde")
+        assert await _read_message(reader) == ({"op": "texts", "texts": ["ünïcode"]}, b"")
+        reader.feed_eof()
+        with pytest.raises(asyncio.IncompleteReadError):
+            await _read_message(reader)
+
+    asyncio.run(scenario())
+
+
+def test_encode_request_maps_the_encode_functions():
+    header, payload, single = _encode_request(image_batch_to_embeddings, ([b"ab", b"c"],))
+    assert header == {"op": "images", "sizes": [2, 1]} and payload == b"abc" and not single
+    header, payload, single = _encode_request(image_bytes_to_embedding, (b"ab",))
+    assert header == {"op": "images", "sizes": [2]} and single
+    header, payload, single = _encode_request(text_to_embedding, ("dog",))
+    assert header == {"op": "texts", "texts": ["dog"]} and payload == b"" and single
+    with pytest.raises(ValueError):
+        _encode_request(np.dot, ())
+
+
+def test_client_results_match_local_encoding():
+    async def scenario(socket_path):
+        executor = InferenceExecutor(1, "thread")
+        server = await asyncio.start_unix_server(lambda r, w: _handle(executor, r, w), path=socket_path)
+        client = SidecarClient(socket_path)
+        try:
+            images = [_png((255, 0, 0)), b"not an image", _png((0, 0, 255))]
+            remote = await client.call(image_batch_to_embeddings, images)
+            local = image_batch_to_embeddings(images)
+            assert isinstance(remote[1], ValueError)
+            for i in (0, 2):
+                np.testing.assert_allclose(remote[i], local[i], rtol=1e-6)
+
+            np.testing.assert_allclose(await client.call(text_to_embedding, "brown dog"),
+                                       text_batch_to_embeddings(["brown dog"])[0], rtol=1e-6)
+            with pytest.raises(ValueError):
+                await client.call(image_bytes_to_embedding, b"not an image")
+            assert client.stats()["requests"] == 3 and client.stats()["idle_connections"] == 1
+        finally:
+            client.close()
+            server.close()
+            await server.wait_closed()
+            executor.shutdown()
+
+        with pytest.raises(SidecarError):
+            await SidecarClient(socket_path + ".missing").call(text_to_embedding, "dog")
+
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(scenario(os.path.join(directory, "inference.sock")))
+
+
+def test_client_times_out_and_drops_the_connection(monkeypatch):
+    monkeypatch.setattr(settings, "INFERENCE_SIDECAR_TIMEOUT", 0.1)
+
+    async def scenario(socket_path):
+        async def never_answer(reader, writer):
+            await reader.read()  # returns once the client hangs up
+
+        server = await asyncio.start_unix_server(never_answer, path=socket_path)
+        client = SidecarClient(socket_path)
+        try:
+            with pytest.raises(SidecarError, match="did not answer"):
+                await client.call(text_to_embedding, "dog")
+            assert client.stats()["idle_connections"] == 0
+        finally:
+            client.close()
+            server.close()
+            await server.wait_closed()
+
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(scenario(os.path.join(directory, "inference.sock")))
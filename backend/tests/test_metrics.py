@@ -0,0 +1,27 @@
+from fastapi.testclient import TestClient
+
+from core.metrics import HTTP_REQUEST_SECONDS
+from main import app
+
+
+def _count(route: str, status: str) -> float:
+    for metric in HTTP_REQUEST_SECONDS.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_count") and sample.labels == {"method": "GET", "route": route, "status": status}:
+                return sample.value
+    return 0.0
+
+
+def test_requests_are_labelled_with_the_matched_route_template():
+    client = TestClient(app)
+    before = _count("/api/v1/reports/{alert_id}/matches", "403")
+    client.get("/api/v1/reports/abc/matches")  # no bearer token
+    assert _count("/api/v1/reports/{alert_id}/matches", "403") == before + 1
+
+    before = _count("unmatched", "404")
+    client.get("/no/such/route")
+    assert _count("unmatched", "404") == before + 1
+
+    before = _count("/images", "404")
+    client.get("/images/missing.png")
+    assert _count("/images", "404") == before + 1
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from core.pagination import (
+    created_cursor_filter, decode_distance_cursor, encode_created_cursor, encode_distance_cursor,
+)
+from tests.fake_mongo import matches
+
+
+def test_created_cursor_selects_strictly_older_rows():
+    created_at = datetime(2026, 10, 1, 12, 30, 15, 123000)
+    cursor_id = ObjectId()
+    cursor = encode_created_cursor(created_at, cursor_id)
+    assert "=" not in cursor  # URL-safe, unpadded
+
+    keyset = created_cursor_filter(cursor)
+    older, newer = ObjectId.from_datetime(datetime(2020, 1, 1)), ObjectId()
+    assert matches({"created_at": created_at - timedelta(seconds=1), "_id": newer}, keyset)
+    assert matches({"created_at": created_at, "_id": older}, keyset)  # same instant, lower id
+    assert not matches({"created_at": created_at, "_id": cursor_id}, keyset)
+    assert not matches({"created_at": created_at + timedelta(microseconds=1), "_id": older}, keyset)
+
+
+def test_empty_cursors():
+    assert created_cursor_filter(None) == {}
+    assert created_cursor_filter("") == {}
+    assert decode_distance_cursor(None) == (0.0, [])
+
+
+def test_distance_cursor_round_trip():
+    ids = [ObjectId(), ObjectId()]
+    assert decode_distance_cursor(encode_distance_cursor(125.5, ids)) == (125.5, ids)
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", "e30", "eyJ0Ijoibm90IGEgZGF0ZSIsImlkIjoieCJ9"])
+def test_malformed_cursors_are_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        created_cursor_filter(cursor)
+    assert error.value.status_code == 400
+    with pytest.raises(HTTPException):
+        decode_distance_cursor(cursor)
@@ -0,0 +1,77 @@
+import asyncio
+import time
+from datetime import datetime
+
+from bson import ObjectId
+
+from core.principal_cache import REVOKED_USERS_COLLECTION, PrincipalCache
+from schemas.auth import UserResponse
+from tests.fake_mongo import FakeDatabase
+
+
+def _principal(user_id: str = "u1") -> UserResponse:
+    return UserResponse(id=user_id, email=f"{user_id}@example.com", is_active=True)
+
+
+def test_entries_expire_after_ttl_and_token_exp(monkeypatch):
+    cache = PrincipalCache(max_entries=10, ttl_seconds=60)
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+
+    cache.put("token", _principal())
+    assert cache.get("token").id == "u1"
+    now[0] += 61
+    assert cache.get("token") is None
+
+    # A token expiring sooner than the TTL is not cached past its exp
+    cache.put("short", _principal(), token_exp=time.time() + 5)
+    now[0] += 6
+    assert cache.get("short") is None
+    cache.put("expired", _principal(), token_exp=time.time() - 1)
+    assert cache.get("expired") is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_evicts_least_recently_used():
+    cache = PrincipalCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", _principal("a"))
+    cache.put("b", _principal("b"))
+    cache.get("a")
+    cache.put("c", _principal("c"))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_invalidate_user_drops_entries_and_rejects_older_tokens():
+    cache = PrincipalCache(max_entries=10, ttl_seconds=60)
+    cache.put("t1", _principal("u1"))
+    cache.put("t2", _principal("u2"))
+    issued_before = time.time() - 10
+
+    cache.invalidate_user("u1")
+    assert cache.get("t1") is None
+    assert cache.get("t2") is not None
+    assert cache.is_revoked("u1", issued_before)
+    assert not cache.is_revoked("u1", time.time() + 10)
+    assert not cache.is_revoked("u2", issued_before)
+
+
+def test_sync_revocations_applies_other_workers_and_deactivated_users():
+    async def scenario():
+        db = FakeDatabase()
+        revoked_id, inactive_id = ObjectId(), ObjectId()
+        await db[REVOKED_USERS_COLLECTION].insert_one({"_id": str(revoked_id), "revoked_at": datetime.now()})
+        await db.users.insert_one({"_id": inactive_id, "email": "gone@example.com", "is_active": False})
+        await db.users.insert_one({"_id": ObjectId(), "email": "ok@example.com", "is_active": True})
+
+        cache = PrincipalCache(max_entries=10, ttl_seconds=60)
+        cache.put("revoked", _principal(str(revoked_id)))
+        cache.put("inactive", _principal(str(inactive_id)))
+        await cache.sync_revocations(db)
+
+        issued_before = time.time() - 10
+        assert cache.get("revoked") is None and cache.get("inactive") is None
+        assert cache.is_revoked(str(revoked_id), issued_before)
+        assert cache.is_revoked(str(inactive_id), issued_before)
+
+    asyncio.run(scenario())
@@ -0,0 +1,81 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from core.config import settings
+from core.report_jobs import JOBS_COLLECTION, ReportJobQueue
+from tests.fake_mongo import FakeDatabase
+
+
+class FlakyJobs:
+    """Fake report_jobs collection whose first status update fails."""
+
+    def __init__(self, jobs):
+        self.jobs = jobs
+        self.failures = 1
+
+    async def find_one_and_update(self, *args, **kwargs):
+        return self.jobs.pop(0) if self.jobs else None
+
+    async def update_many(self, *args, **kwargs):
+        pass
+
+    async def update_one(self, *args, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("primary stepped down")
+
+
+def test_worker_survives_errors_recording_a_job(monkeypatch):
+    monkeypatch.setattr(settings, "REPORT_JOB_POLL_SECONDS", 0.01)
+
+    async def scenario():
+        db = FakeDatabase()
+        db._collections[JOBS_COLLECTION] = FlakyJobs([{"_id": 1, "attempts": 1}, {"_id": 2, "attempts": 1}])
+        handled = []
+
+        async def handler(db, job):
+            handled.append(job["_id"])
+            return {}
+
+        queue = ReportJobQueue()
+        queue.start(lambda: db, handler, 1)
+        for _ in range(100):
+            if len(handled) == 2:
+                break
+            await asyncio.sleep(0.01)
+        await queue.stop()
+        assert handled == [1, 2]
+
+    asyncio.run(scenario())
+
+
+def test_claim_limits_attempts_and_backs_off(monkeypatch):
+    monkeypatch.setattr(settings, "REPORT_JOB_MAX_ATTEMPTS", 2)
+    monkeypatch.setattr(settings, "REPORT_JOB_LEASE_SECONDS", 60)
+
+    async def failing(db, job):
+        raise RuntimeError("model crashed")
+
+    async def scenario():
+        db = FakeDatabase()
+        queue = ReportJobQueue()
+        jobs = db[JOBS_COLLECTION]
+        job_id = await queue.enqueue(db, {"alert_id": 1})
+
+        job = await queue._claim(db)
+        assert job["_id"] == job_id and job["attempts"] == 1
+        await queue._run_job(db, job, failing)
+        assert jobs.documents[job_id]["status"] == "queued"
+        # Backing off: not claimable until retry_at
+        assert await queue._claim(db) is None
+        jobs.documents[job_id]["retry_at"] = datetime.now() - timedelta(seconds=1)
+
+        # Second (last) attempt hangs and its lease runs out: failed, never claimed again
+        job = await queue._claim(db)
+        assert job["attempts"] == 2
+        jobs.documents[job_id]["lease_expires_at"] = datetime.now() - timedelta(seconds=1)
+        assert await queue._claim(db) is None
+        assert jobs.documents[job_id]["status"] == "failed"
+        assert jobs.documents[job_id]["attempts"] == 2
+
+    asyncio.run(scenario())
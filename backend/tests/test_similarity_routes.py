@@ -0,0 +1,33 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import api.routes.similarity as similarity
+from api.routes.auth import get_current_user
+from main import app
+from schemas.auth import UserResponse
+
+
+@pytest.fixture
+def client(monkeypatch):
+    embedded = []
+
+    async def fail_if_embedded(photo_url, text_description):
+        embedded.append(photo_url)
+        raise AssertionError("query embedded before filter validation")
+
+    monkeypatch.setattr(similarity, "_get_query_embeddings", fail_if_embedded)
+    app.dependency_overrides[get_current_user] = lambda: UserResponse(id="u1", email="u1@example.com", is_active=True)
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    assert not embedded
+
+
+@pytest.mark.parametrize("params", [
+    {"lon": -122.4, "lat": 37.7},                  # no radius: would silently search everywhere
+    {"lon": -122.4, "radius_m": 500},
+    {"radius_m": 500},
+    {"last_seen_after": "2026-10-02T00:00:00", "last_seen_before": "2026-10-01T00:00:00"},
+])
+def test_invalid_filters_fail_before_embedding(client, params):
+    response = client.get("/api/v1/similarity/find", params={"photo_url": "http://example.com/a.jpg", **params})
+    assert response.status_code == 400
@@ -0,0 +1,93 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from bson import ObjectId
+
+from core.ann import ANNBackend, IVFBackend
+from core.vector_index import INDEXED_ALERTS_QUERY, EmbeddingIndex
+from db.embedding_store import save_alert_embeddings
+from tests.fake_mongo import FakeDatabase
+
+
+def _unit(dim: int, hot: int) -> list:
+    vector = np.zeros(dim, dtype=np.float32)
+    vector[hot] = 1.0
+    return vector.tolist()
+
+
+def _index() -> EmbeddingIndex:
+    return EmbeddingIndex(image_dim=4, text_dim=3, initial_capacity=2)
+
+
+def test_add_search_remove_keeps_rows_contiguous():
+    index = _index()
+    assert index.add("a", _unit(4, 0), None)
+    assert index.add("b", _unit(4, 1), _unit(3, 0))
+    assert index.add("c", [0.6, 0.8, 0, 0], None)  # grows past the initial capacity
+    assert not index.add("d", None, [0, 0, 0])  # nothing usable
+    assert len(index) == 3 and "d" not in index
+
+    results = index.search(_unit(4, 0), None, 1.0, 0.0, similarity_threshold=0.5, limit=10)
+    assert [alert_id for alert_id, _ in results] == ["a", "c"]
+    assert results[0][1] == 1.0
+
+    assert index.remove("a")
+    assert not index.remove("a")
+    assert len(index) == 2 and "c" in index
+    results = index.search(_unit(4, 0), None, 1.0, 0.0, similarity_threshold=0.5, limit=10)
+    assert [alert_id for alert_id, _ in results] == ["c"]
+
+
+def test_search_respects_limit_exclusions_and_candidates():
+    index = _index()
+    for i in range(4):
+        index.add(i, _unit(4, 0) if i < 3 else _unit(4, 1), None)
+
+    assert len(index.search(_unit(4, 0), None, 1.0, 0.0, 0.0, limit=2)) == 2
+    results = index.search(_unit(4, 0), None, 1.0, 0.0, 0.5, limit=10, exclude_ids=[0])
+    assert sorted(alert_id for alert_id, _ in results) == [1, 2]
+    results = index.search(_unit(4, 0), None, 1.0, 0.0, 0.0, limit=10, candidate_ids=[2, 3, 99])
+    assert [alert_id for alert_id, _ in results] == [2, 3]
+    # Text-only alerts are not comparable with an image-only query
+    index.add("text", None, _unit(3, 0))
+    assert "text" not in [alert_id for alert_id, _ in index.search(_unit(4, 0), None, 1.0, 0.0, -1.0, 10)]
+
+
+def test_sync_picks_up_embeddings_written_after_the_alert():
+    async def scenario():
+        db = FakeDatabase()
+        index = _index()
+        await index.load(db)
+
+        # Background processing: the alert is inserted, a sync runs, and the
+        # vectors are only stored afterwards
+        alert_id = ObjectId()
+        await db.alerts.insert_one({
+            "_id": alert_id, **INDEXED_ALERTS_QUERY, "created_at": datetime.now() - timedelta(seconds=1),
+        })
+        await index.sync(db)
+        assert alert_id not in index
+
+        await save_alert_embeddings(db, alert_id, _unit(4, 2), None)
+        await index.sync(db)
+        assert alert_id in index
+
+        await db.alerts.update_one({"_id": alert_id}, {"$set": {"is_active": False, "updated_at": datetime.now()}})
+        await index.sync(db)
+        assert alert_id not in index
+
+    asyncio.run(scenario())
+
+
+def test_ann_backends_must_implement_the_whole_interface():
+    class PartialBackend(ANNBackend):
+        def candidates(self, query, k, **search_params):
+            return None
+
+    with pytest.raises(TypeError):
+        ANNBackend()
+    with pytest.raises(TypeError):
+        PartialBackend()
+    assert isinstance(IVFBackend(), ANNBackend)